@@ -3,19 +3,34 @@ API версия агентной системы для технических 
 Поддерживает пошаговое и автоматическое проведение интервью
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Optional, Any, List
+from typing import AsyncIterator, Dict, Optional, Any, List
 import uuid
-from datetime import datetime
+import asyncio
+import time
+import weakref
+from datetime import datetime, timedelta
 from ml_system.interview.interview_system import InterviewSystem
-from ml_system.job_matching import FlexibleResumeMatcher
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from ml_system.interview.src.llm import LLM_BACKEND, aclose_http_clients, get_llm_cache
+from ml_system.interview.src.metrics import HTTP_LATENCY, render_metrics
+from ml_system.interview.src.streaming import QuestionStream, bind_question_stream, current_question_stream, sse_event
+from ml_system.interview.src.timing import aprecompute_optimal_times, cached_optimal_time, heuristic_optimal_time
+from ml_system.interview.agents.planner import abuild_vacancy_plan_template, template_version
+from ml_system.interview.agents.selector import build_topic_shortlists
+from ml_system.interview.report_batch import agenerate_reports
+from ml_system.interview.turn_log import last_evaluation
+from ml_system.interview.state_store import STATE_COMPLETED_TTL_SECONDS, StateConflictError, create_state_store
+from ml_system.retrieva import get_embedding_cache_stats, get_knowledge_registry
+from ml_system.job_matching import MATCH_LLM_BAND, FlexibleResumeMatcher
+from langchain_core.messages import HumanMessage, AIMessage
 import os
+import json
 from dotenv import load_dotenv
 from pymongo import MongoClient
 from bson import ObjectId
-import re
 
 load_dotenv()
 
@@ -33,6 +48,7 @@ class InterviewRequest(BaseModel):
     resume: str
     job_description: Optional[str] = None
     vacancy_id: Optional[str] = None
+    external_id: Optional[str] = None
 
 class AnswerRequest(BaseModel):
     answer: str
@@ -48,6 +64,7 @@ class InterviewResponse(BaseModel):
     report: Optional[str] = None
     recommendation: Optional[str] = None
     error: Optional[str] = None
+    report_status: Optional[str] = None
     debug: Optional[Dict[str, Any]] = None
 
 class InterviewStatus(BaseModel):
@@ -60,6 +77,7 @@ class InterviewStatus(BaseModel):
     hints_given_count: int = 0
     total_topics: int = 8
     progress_percent: float = 0.0
+    report_status: Optional[str] = None
     created_at: Optional[str] = None
 
 class ResumeMatchRequest(BaseModel):
@@ -76,66 +94,192 @@ class ResumeMatchResponse(BaseModel):
     total_score_percent: int
     details: Dict[str, Any]
 
-active_interviews: Dict[str, Dict] = {}
+class ResumeMatchBatchResume(BaseModel):
+    id: Optional[str] = None
+    resume: str
+
+class ResumeMatchBatchRequest(BaseModel):
+    vacancy_id: str
+    resumes: List[ResumeMatchBatchResume]
+    weights: Optional[Dict[str, float]] = None
+    use_llm: bool = True
+    llm_band: Optional[List[float]] = None
+
+class ResumeMatchBatchItem(BaseModel):
+    id: Optional[str] = None
+    index: int
+    total_score_percent: int
+    details: Dict[str, Any]
+    method: str
+
+class ResumeMatchBatchResponse(BaseModel):
+    vacancy_id: str
+    results: List[ResumeMatchBatchItem]
+    llm_calls: int
+
+class KnowledgeSyncResponse(BaseModel):
+    vacancy_id: str
+    version: Optional[str] = None
+    documents: Optional[int] = None
+    added: int = 0
+    removed: int = 0
+
+class VacancyPlanResponse(BaseModel):
+    vacancy_id: str
+    version: str
+    topics: int
+    opening_question: bool = False
+    optimal_times: int = 0
+
+class ReportBatchRequest(BaseModel):
+    interview_ids: List[str]
+    force: bool = False
+    write_back: bool = True
+
+class ReportBatchResponse(BaseModel):
+    results: List[Dict[str, Any]]
+    interviews: int = 0
+    llm_calls: int = 0
+
+DEFAULT_KNOWLEDGE_FILE = "data/junior_ml_interview_questions_ru.json"
+DEFAULT_JOB_DESCRIPTION = "Ищем Middle ML разработчика для задач NLP и CV."
+DEFERRED_REPORTS = os.getenv("AI_HR_DEFERRED_REPORTS", "1").lower() in ("1", "true", "yes")
+REPORT_BATCH_SIZE = int(os.getenv("AI_HR_REPORT_BATCH_SIZE", "16"))
+REPORT_BATCH_WAIT_SECONDS = float(os.getenv("AI_HR_REPORT_BATCH_WAIT_SECONDS", "0.5"))
+REPORT_RECOVERY_INTERVAL_SECONDS = float(os.getenv("AI_HR_REPORT_RECOVERY_INTERVAL_SECONDS", "60"))
+REPORT_RECOVERY_STALE_SECONDS = float(os.getenv("AI_HR_REPORT_RECOVERY_STALE_SECONDS", "600"))
+MATCH_BATCH_MAX_RESUMES = int(os.getenv("AI_HR_MATCH_BATCH_MAX_RESUMES", "2000"))
+
+
+def build_vacancy_summary(vacancy: Optional[Dict[str, Any]], fallback_description: Optional[str] = None) -> tuple:
+    """Собирает текст описания вакансии для промптов.
+
+    Returns:
+        Кортеж (описание, роль, список вопросов вакансии); для отсутствующей
+        вакансии — резервное описание без роли и вопросов.
+    """
+    if vacancy is None:
+        return fallback_description or DEFAULT_JOB_DESCRIPTION, None, None
+
+    parts = []
+    if 'title' in vacancy and 'grade' in vacancy:
+        parts.append(f"Название вакансии: {vacancy['grade']} {vacancy['title']}")
+
+    if 'work_field' in vacancy:
+        parts.append(f"Направление: {vacancy['work_field']}")
+
+    if 'min_experience' in vacancy and 'max_experience' in vacancy:
+        parts.append(f"Опыт работы: от {vacancy['min_experience']} до {vacancy['max_experience']} лет.")
+
+    if vacancy.get('required_skills'):
+        skills_str = ", ".join(vacancy['required_skills'])
+        parts.append(f"\nОбязательные навыки:\n- {skills_str}")
+
+    if vacancy.get('optional_skills'):
+        skills_str = ", ".join(vacancy['optional_skills'])
+        parts.append(f"\nБудет плюсом:\n- {skills_str}")
+
+    if 'description' in vacancy:
+        parts.append(f"\nОписание вакансии:\n{vacancy['description']}")
+
+    if 'company_description' in vacancy:
+        parts.append(f"\nОписание компании:\n{vacancy['company_description']}")
+
+    return "\n".join(parts), vacancy.get('work_field'), vacancy.get('questions')
+
 
 class APIInterviewSystem:
     """API версия системы интервью"""
     
     def __init__(self, api_key: str):
-        self.interview_system = InterviewSystem(api_key)
-        self.interview_system.load_knowledge(knowledge_file="data/junior_ml_interview_questions_ru.json")
+        self.knowledge_registry = get_knowledge_registry()
+        self.default_knowledge = self.knowledge_registry.get(self._load_default_knowledge(), key="default")
+        self.interview_system = InterviewSystem(api_key, knowledge_system=self.default_knowledge)
+        self.interview_system.config.pipelined_submit = os.getenv("AI_HR_PIPELINED_SUBMIT", "1").lower() in ("1", "true", "yes")
+        self.state_store = create_state_store(mongo_db=db)
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._plan_tasks: Dict[str, asyncio.Task] = {}
+        self._report_queue: Optional[asyncio.Queue] = None
+        self._report_worker: Optional[asyncio.Task] = None
+        self._report_recovery: Optional[asyncio.Task] = None
+        self._report_inflight: List[str] = []
+
+    def _load_default_knowledge(self) -> List[Dict[str, Any]]:
+        """Читает стандартную базу вопросов из файла."""
+        try:
+            with open(DEFAULT_KNOWLEDGE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print(f"⚠️ Файл {DEFAULT_KNOWLEDGE_FILE} не найден. RAG-система будет пуста.")
+            return []
     
-    def _estimate_optimal_time(self, role: str, question_text: str) -> int:
-        """Оценивает оптимальное время в секундах для ответа на вопрос с учётом роли/грейда.
-        Обращается к LLM и ожидает ТОЛЬКО целое число секунд в ответе. Возвращает int.
-        При любой ошибке или отсутствии числа — использует резервную эвристику.
+    def sync_vacancy_knowledge(self, vacancy_id: str, questions: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Инкрементально обновляет индекс вопросов вакансии в общем реестре."""
+        if not questions or not isinstance(questions, list):
+            return {"vacancy_id": vacancy_id, "version": None, "documents": 0, "added": 0, "removed": 0}
+        _, version, stats = self.knowledge_registry.sync(questions, key=vacancy_id)
+        return {"vacancy_id": vacancy_id, "version": version, **stats}
+
+    async def build_vacancy_plan(self, vacancy_id: str, vacancy: Dict[str, Any]) -> Dict[str, Any]:
+        """Строит шаблон плана интервью вакансии и сохраняет его в документе вакансии.
+
+        Вместе с темами сохраняются время на ответ для шорт-листов тем и запасной
+        вводный вопрос по резюме, поэтому на старте интервью LLM вызывается только
+        для первого вопроса по резюме кандидата (он передаётся потоком).
         """
-        fallback = max(45, min(240, 60 + len((question_text or "").split()) // 3))
-        try:
-            system = getattr(self, "interview_system", None)
-            if not system or not getattr(system, "llm", None):
-                return fallback
-            llm = system.llm
-            messages = [
-                SystemMessage(content=(
-                    "Ты ассистент интервьюера. Оцени оптимальное время ответа на один конкретный вопрос "
-                    "с учётом роли/грейда. Ответь ТОЛЬКО одним целым числом в секундах, без слов и пояснений."
-                    "Времени должно хватить на подробный, равернутый ответ с примерами и пояснениями, обычно на ответ дается от 120 секунд до 600 секунд"
-                )),
-                HumanMessage(content=(
-                    f"Роль/грейд: {role or 'не указан'}\n"
-                    f"Вопрос: {question_text or ''}\n\n"
-                    "Выведи только одно целое число (секунды)."
-                )),
-            ]
-            response = llm.invoke(messages)
-            content = getattr(response, "content", "")
-            match = re.search(r"\b(\d{1,4})\b", str(content))
-            if match:
-                value = int(match.group(1))
-                if value < 15:
-                    return 15
-                if value > 600:
-                    return 600
-                return value
-            return fallback
-        except Exception:
-            return fallback
-        
-    def create_interview(self, resume: str, job_description: str, role: Optional[str] = None, knowledge: Optional[List[Dict[str, Any]]] = None) -> str:
-        """Создает новое интервью и возвращает ID"""
-        interview_id = str(uuid.uuid4())
-        
-        collection_name = f"interview_{interview_id}"
-        per_interview_system = InterviewSystem(
-            os.getenv("OPENROUTER_API_KEY", ""),
-            collection_name=collection_name
+        summary_text, role, knowledge = build_vacancy_summary(vacancy)
+        system = await run_in_threadpool(self._system_for_vacancy, vacancy_id, None, knowledge)
+        template = await abuild_vacancy_plan_template(role or "", summary_text, llm=system.llm, alignment=system.alignment)
+
+        shortlists = await asyncio.to_thread(
+            build_topic_shortlists, template["topics"], assistant=system.assistant, count=system.config.shortlist_size
+        )
+        questions = [question for questions in shortlists.values() for question in questions]
+        await aprecompute_optimal_times(system.llm, role, questions)
+        template["optimal_times"] = [[q["id"], cached_optimal_time(q["id"], role, q["content"])] for q in questions]
+        template["created_at"] = datetime.now().isoformat()
+
+        await run_in_threadpool(
+            vacancies_collection.update_one,
+            {'_id': ObjectId(vacancy_id)},
+            {'$set': {'interview_plan_template': template}},
         )
+        print(f"🗂️ Шаблон плана вакансии {vacancy_id} сохранён: {len(template['topics'])} тем")
+        return {
+            "vacancy_id": vacancy_id,
+            "version": template["version"],
+            "topics": len(template["topics"]),
+            "opening_question": "opening_question" in template,
+            "optimal_times": len(template["optimal_times"]),
+        }
+
+    def schedule_vacancy_plan(self, vacancy_id: str, vacancy: Dict[str, Any]) -> None:
+        """Запускает фоновую сборку шаблона плана вакансии (не более одной на вакансию)."""
+        if vacancy_id in self._plan_tasks:
+            return
+
+        async def _build() -> None:
+            try:
+                await self.build_vacancy_plan(vacancy_id, vacancy)
+            except Exception as e:
+                print(f"⚠️ Не удалось построить шаблон плана вакансии {vacancy_id}: {e}")
+            finally:
+                self._plan_tasks.pop(vacancy_id, None)
+
+        self._plan_tasks[vacancy_id] = asyncio.create_task(_build())
+
+    def create_interview(self, resume: str, job_description: str, role: Optional[str] = None, knowledge: Optional[List[Dict[str, Any]]] = None, vacancy_id: Optional[str] = None, plan_template: Optional[Dict[str, Any]] = None, external_id: Optional[str] = None) -> str:
+        """Создает новое интервью и возвращает ID.
+
+        Состояние интервью сохраняется в хранилище (`state_store`) без объектов
+        системы: LLM и модель эмбеддингов разделяются, а база знаний вакансии
+        берётся из реестра по `vacancy_id` при каждом обращении.
+        """
+        interview_id = str(uuid.uuid4())
         
+        knowledge_version = None
         if knowledge and isinstance(knowledge, list) and len(knowledge) > 0:
-            per_interview_system.load_knowledge(knowledge_json=knowledge)
-        else:
-            per_interview_system.load_knowledge(knowledge_file="data/junior_ml_interview_questions_ru.json")
+            _, knowledge_version, _ = self.knowledge_registry.sync(knowledge, key=vacancy_id)
         
         initial_state = {
             "resume": resume,
@@ -148,7 +292,12 @@ class APIInterviewSystem:
             "hints_given_count": 0,
             "current_topic_index": 0,
             "answer_evaluations": [],
+            "turn_log": [],
+            "report_notes": {},
+            "topic_stats": {},
             "asked_question_ids": set(),
+            "topic_shortlists": {},
+            "plan_template": plan_template,
             "interview_plan": None,
             "current_topic": None,
             "current_question": None,
@@ -163,38 +312,100 @@ class APIInterviewSystem:
             "last_question_type": None
         }
         
-        active_interviews[interview_id] = {
+        self.state_store.save(interview_id, {
             "state": initial_state,
             "status": "created",
             "created_at": datetime.now(),
             "current_step": "planner",
-            "system": per_interview_system
-        }
+            "vacancy_id": vacancy_id,
+            "knowledge_version": knowledge_version,
+            "external_id": external_id,
+        })
         
         return interview_id
+
+    def _vacancy_knowledge(self, vacancy_id: Optional[str], knowledge_version: Optional[str] = None, knowledge: Optional[List[Dict[str, Any]]] = None) -> tuple:
+        """База знаний вакансии и версия её содержимого.
+
+        Загруженная в реестр база используется, только если её версия совпадает
+        с `knowledge_version` (версией, с которой создано интервью). Иначе —
+        например, если вопросы вакансии обновили через другой воркер, — вопросы
+        берутся из `knowledge` или MongoDB и реестр синхронизируется с ними.
+        Для вакансии без вопросов возвращается стандартная база и версия None.
+        """
+        if not vacancy_id:
+            return self.default_knowledge, None
+        if knowledge is None and knowledge_version:
+            knowledge_system = self.knowledge_registry.cached(vacancy_id, version=knowledge_version)
+            if knowledge_system is not None:
+                return knowledge_system, knowledge_version
+        if knowledge is None and ObjectId.is_valid(vacancy_id):
+            vacancy = vacancies_collection.find_one({'_id': ObjectId(vacancy_id)}, {'questions': 1})
+            knowledge = (vacancy or {}).get('questions')
+        if knowledge and isinstance(knowledge, list):
+            knowledge_system, version, _ = self.knowledge_registry.sync(knowledge, key=vacancy_id)
+            return knowledge_system, version
+        return self.default_knowledge, None
+
+    def _system_for_vacancy(self, vacancy_id: Optional[str], knowledge_version: Optional[str] = None, knowledge: Optional[List[Dict[str, Any]]] = None) -> InterviewSystem:
+        """Восстанавливает систему интервью для вакансии (база знаний — см. `_vacancy_knowledge`)."""
+        knowledge_system, _ = self._vacancy_knowledge(vacancy_id, knowledge_version, knowledge)
+        return self.interview_system.with_knowledge(knowledge_system)
+
+    def _interview_lock(self, interview_id: str) -> asyncio.Lock:
+        """Процессная блокировка интервью; между воркерами запись защищена версией в хранилище."""
+        lock = self._locks.get(interview_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[interview_id] = lock
+        return lock
+
+    async def _load_interview(self, interview_id: str, with_system: bool = True) -> Dict:
+        interview_data = await run_in_threadpool(self.state_store.get, interview_id)
+        if interview_data is None:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        if with_system:
+            knowledge_system, knowledge_version = await run_in_threadpool(
+                self._vacancy_knowledge, interview_data.get("vacancy_id"), interview_data.get("knowledge_version")
+            )
+            # Вопросы вакансии могли обновиться после старта интервью: дальше оно идёт по актуальной версии
+            interview_data["knowledge_version"] = knowledge_version
+            interview_data["system"] = self.interview_system.with_knowledge(knowledge_system)
+        return interview_data
+
+    async def _save_interview(self, interview_id: str, interview_data: Dict) -> None:
+        ttl_seconds = STATE_COMPLETED_TTL_SECONDS if interview_data.get("status") == "completed" else None
+        try:
+            await run_in_threadpool(self.state_store.save, interview_id, interview_data, ttl_seconds)
+        except StateConflictError:
+            raise HTTPException(status_code=409, detail="Interview was updated concurrently, retry the request")
     
-    def get_next_question(self, interview_id: str) -> Dict:
+    async def get_next_question(self, interview_id: str) -> Dict:
         """Получает следующий вопрос для интервью (как в консольной версии)"""
-        if interview_id not in active_interviews:
-            raise HTTPException(status_code=404, detail="Interview not found")
-        
-        interview_data = active_interviews[interview_id]
+        async with self._interview_lock(interview_id):
+            interview_data = await self._load_interview(interview_id)
+            try:
+                return await self._next_question(interview_id, interview_data)
+            finally:
+                await self._save_interview(interview_id, interview_data)
+
+    async def _next_question(self, interview_id: str, interview_data: Dict) -> Dict:
         state = interview_data["state"]
         current_step = interview_data["current_step"]
-        system = interview_data.get("system", self.interview_system)
+        system = interview_data["system"]
         
         try:
             if current_step == "planner":
-                result = system._interview_planner(state)
+                result = await system._ainterview_planner(state)
                 state.update(result)
                 interview_data["current_step"] = "selector"
                 current_step = "selector"
                 
             if current_step == "selector":
-                result = system._question_selector(state)
+                result = await system._aquestion_selector(state)
                 if not result:
                     interview_data["status"] = "completed"
-                    return self._generate_final_report(interview_id)
+                    return await self._generate_final_report(interview_id, interview_data)
                 
                 state.update(result)
                 interview_data["current_step"] = "waiting_for_answer"
@@ -204,13 +415,9 @@ class APIInterviewSystem:
 
                 optimal_time = question.get("optimal_time")
                 if optimal_time is None:
-                    optimal_time = self._estimate_optimal_time(state.get("role", ""), question.get("content", ""))
-
-                    try:
-                        question["optimal_time"] = optimal_time
-                        state["current_question"] = question
-                    except Exception:
-                        pass
+                    optimal_time = heuristic_optimal_time(question.get("content", ""))
+                    question["optimal_time"] = optimal_time
+                    state["current_question"] = question
 
                 debug_info = {
                     "step": "selector",
@@ -219,8 +426,7 @@ class APIInterviewSystem:
                     "skip_topic": state.get("skip_topic"),
                     "question_type": state.get("question_type"),
                     "last_question_type": state.get("last_question_type"),
-                    "last_evaluation": (state.get("answer_evaluations", [])[-1]
-                                         if state.get("answer_evaluations") else None)
+                    "last_evaluation": last_evaluation(state)
                 }
                 return {
                     "interview_id": interview_id,
@@ -244,14 +450,18 @@ class APIInterviewSystem:
             interview_data["status"] = "error"
             raise HTTPException(status_code=500, detail=f"Error getting question: {str(e)}")
     
-    def submit_answer(self, interview_id: str, answer: str) -> Dict:
+    async def submit_answer(self, interview_id: str, answer: str) -> Dict:
         """Отправляет ответ кандидата и получает следующий вопрос (как в консольной версии)"""
-        if interview_id not in active_interviews:
-            raise HTTPException(status_code=404, detail="Interview not found")
-        
-        interview_data = active_interviews[interview_id]
+        async with self._interview_lock(interview_id):
+            interview_data = await self._load_interview(interview_id)
+            try:
+                return await self._submit_answer(interview_id, interview_data, answer)
+            finally:
+                await self._save_interview(interview_id, interview_data)
+
+    async def _submit_answer(self, interview_id: str, interview_data: Dict, answer: str) -> Dict:
         state = interview_data["state"]
-        system = interview_data.get("system", self.interview_system)
+        system = interview_data["system"]
         
         if interview_data["current_step"] != "waiting_for_answer":
             raise HTTPException(status_code=400, detail="Not waiting for answer")
@@ -268,17 +478,22 @@ class APIInterviewSystem:
                 "asked_question_ids": asked_ids
             })
             
-            evaluation_result = system._answer_evaluator(state)
-            state.update(evaluation_result)
-            
-            controller_result = system._adaptive_controller_node(state)
-            state.update(controller_result)
+            # Упреждающие ветви генерируются без потока: при потоковой отдаче токенов ход идёт последовательно
+            if system.config.pipelined_submit and current_question_stream() is None:
+                pipeline_info = await self._apipelined_evaluate_and_decide(system, state)
+            else:
+                pipeline_info = None
+                evaluation_result = await system._aanswer_evaluator(state)
+                state.update(evaluation_result)
+                
+                controller_result = await system._aadaptive_controller_node(state)
+                state.update(controller_result)
             
             next_step = self._determine_next_step(state)
             interview_data["current_step"] = next_step
             
             if next_step == "completed":
-                return self._generate_final_report(interview_id)
+                return await self._generate_final_report(interview_id, interview_data)
             elif next_step == "waiting_for_answer":
                 manager_result = system._conversation_manager(state)
                 state.update(manager_result)
@@ -286,7 +501,9 @@ class APIInterviewSystem:
                 
                 question = state.get("current_question", {})
                 source = question.get("source") or ("LLM-Generated" if state.get("generated_question") else "Selector")
-                optimal_time = self._estimate_optimal_time(state.get("role", ""), question.get("content", ""))
+                optimal_time = question.get("optimal_time")
+                if optimal_time is None:
+                    optimal_time = heuristic_optimal_time(question.get("content", ""))
                 debug_info = {
                     "step": "controller_waiting",
                     "controller_decision": state.get("controller_decision"),
@@ -294,8 +511,8 @@ class APIInterviewSystem:
                     "skip_topic": state.get("skip_topic"),
                     "question_type": state.get("question_type"),
                     "last_question_type": state.get("last_question_type"),
-                    "last_evaluation": (state.get("answer_evaluations", [])[-1]
-                                         if state.get("answer_evaluations") else None)
+                    "last_evaluation": last_evaluation(state),
+                    "pipeline": pipeline_info
                 }
 
                 return {
@@ -316,11 +533,93 @@ class APIInterviewSystem:
                     "debug": debug_info
                 }
             else:
-                return self.get_next_question(interview_id)
+                response = await self._next_question(interview_id, interview_data)
+                if pipeline_info is not None and isinstance(response.get("debug"), dict):
+                    response["debug"]["pipeline"] = pipeline_info
+                return response
                 
         except Exception as e:
             interview_data["status"] = "error"
             raise HTTPException(status_code=500, detail=f"Error processing answer: {str(e)}")
+
+    async def _apipelined_evaluate_and_decide(self, system: InterviewSystem, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Оценка ответа и решение контроллера с упреждающей генерацией следующего вопроса.
+
+        Параллельно с оценкой запускается генерация вопроса (вместе с оценкой
+        времени на ответ) для вероятных ветвей контроллера: если решение известно
+        заранее по лимитам — только для него, иначе для `speculative_actions`.
+        После оценки фиксируется ветвь, выбранная контроллером, остальные
+        отменяются. Если выбранная ветвь не готовилась, контроллер выполняется
+        как обычно. Ветви получают глубокую копию нужных им полей состояния
+        (`question_state_snapshot`), которое параллельно обновляет оценщик.
+
+        Returns:
+            Сводка конвейера для debug: ветви, время этапов и сэкономленная задержка.
+        """
+        controller = system.adaptive_controller
+        started = time.perf_counter()
+
+        predetermined = controller.predetermined_decision(state)
+        if predetermined is not None:
+            actions = [predetermined["action"]]
+        else:
+            actions = list(system.config.speculative_actions)
+        actions = [action for action in actions if controller.question_action(action)]
+
+        snapshot = controller.question_state_snapshot(state)
+
+        async def prepare(action: str) -> tuple:
+            bind_question_stream(None)
+            prepare_started = time.perf_counter()
+            question = await controller.agenerate_question(snapshot, action)
+            return question, time.perf_counter() - prepare_started
+
+        tasks = {action: asyncio.create_task(prepare(action)) for action in actions}
+        for task in tasks.values():
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        committed = None
+        try:
+            evaluation_started = time.perf_counter()
+            state.update(await system._aanswer_evaluator(state))
+            evaluation_seconds = time.perf_counter() - evaluation_started
+
+            decision = controller.analyze_and_decide(state)
+            action = decision["action"]
+            task = tasks.pop(action, None)
+            controller_result = None
+            if task is not None:
+                try:
+                    question, generation_seconds = await task
+                    controller_result = controller.question_result(action, question)
+                    committed = action
+                except Exception as e:
+                    print(f"⚠️ Упреждающая генерация '{action}' не удалась: {e}")
+
+            if controller_result is None:
+                generation_started = time.perf_counter()
+                controller_result = await controller.aexecute_decision(state, decision)
+                generation_seconds = time.perf_counter() - generation_started
+            state.update(controller_result)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        wall_seconds = time.perf_counter() - started
+        saved_seconds = max(0.0, evaluation_seconds + generation_seconds - wall_seconds)
+        info = {
+            "mode": "pipelined",
+            "speculated": actions,
+            "decision": action,
+            "committed": committed,
+            "cancelled": list(tasks.keys()),
+            "evaluation_ms": round(evaluation_seconds * 1000),
+            "generation_ms": round(generation_seconds * 1000),
+            "wall_ms": round(wall_seconds * 1000),
+            "saved_ms": round(saved_seconds * 1000),
+        }
+        print(f"⚡ Конвейер submit_answer: решение {action}, зафиксировано {committed}, сэкономлено {info['saved_ms']} мс")
+        return info
     
     def _determine_next_step(self, state: Dict) -> str:
         """Определяет следующий шаг на основе решения контроллера (как в консольной версии)"""
@@ -349,13 +648,25 @@ class APIInterviewSystem:
         else:
             return "selector"
     
-    def _generate_final_report(self, interview_id: str) -> Dict:
-        """Генерирует финальный отчет (как в консольной версии)"""
-        interview_data = active_interviews[interview_id]
+    async def _generate_final_report(self, interview_id: str, interview_data: Dict) -> Dict:
+        """Генерирует финальный отчет (как в консольной версии).
+
+        Если интервью привязано к собеседованию backend (`external_id`), отчёт
+        ставится в очередь пакетной генерации и записывается в MongoDB
+        позже, а последний ответ кандидата возвращается без ожидания LLM.
+        Отметка `report_status: pending` в `interviews` переживает перезапуск:
+        по ней `_run_report_recovery` возвращает отчёт в очередь.
+        """
         state = interview_data["state"]
         
-        report_result = self.interview_system._report_generator(state)
-        state.update(report_result)
+        if DEFERRED_REPORTS and interview_data.get("external_id") and self._report_queue is not None:
+            interview_data["report_status"] = "pending"
+            await self._mark_report_pending(interview_data["external_id"], interview_id)
+            self._report_queue.put_nowait(interview_id)
+        else:
+            report_result = await self.interview_system._areport_generator(state)
+            state.update(report_result)
+            interview_data["report_status"] = "ready"
         
         interview_data["status"] = "completed"
         
@@ -364,6 +675,7 @@ class APIInterviewSystem:
             "status": "completed",
             "report": state.get("report"),
             "recommendation": state.get("final_recommendation"),
+            "report_status": interview_data["report_status"],
             "progress": {
                 "questions_asked": state.get("questions_asked_count", 0),
                 "questions_in_current_topic": state.get("questions_in_current_topic", 0),
@@ -374,12 +686,9 @@ class APIInterviewSystem:
             }
         }
     
-    def get_interview_status(self, interview_id: str) -> Dict:
+    async def get_interview_status(self, interview_id: str) -> Dict:
         """Получает статус интервью (как в консольной версии)"""
-        if interview_id not in active_interviews:
-            raise HTTPException(status_code=404, detail="Interview not found")
-        
-        interview_data = active_interviews[interview_id]
+        interview_data = await self._load_interview(interview_id, with_system=False)
         state = interview_data["state"]
         
         total_topics = len(state.get("interview_plan", {}).get("topics", []))
@@ -396,99 +705,335 @@ class APIInterviewSystem:
             "hints_given_count": state.get("hints_given_count", 0),
             "total_topics": total_topics,
             "progress_percent": progress_percent,
+            "report_status": interview_data.get("report_status"),
             "created_at": interview_data["created_at"].isoformat()
         }
 
+    def start_report_worker(self) -> None:
+        """Запускает фоновую очередь отложенных отчётов и восстановление незавершённых (в event loop сервиса)."""
+        if self._report_worker is None:
+            self._report_queue = asyncio.Queue()
+            self._report_worker = asyncio.create_task(self._run_report_worker())
+            self._report_recovery = asyncio.create_task(self._run_report_recovery())
+
+    async def stop_report_worker(self) -> None:
+        """Останавливает очередь отчётов и освобождает невыполненные отчёты для другого воркера или следующего запуска."""
+        if self._report_worker is None:
+            return
+        for task in (self._report_worker, self._report_recovery):
+            task.cancel()
+        await asyncio.gather(self._report_worker, self._report_recovery, return_exceptions=True)
+        unfinished = list(self._report_inflight)
+        while not self._report_queue.empty():
+            unfinished.append(self._report_queue.get_nowait())
+        self._report_worker = self._report_recovery = self._report_queue = None
+        self._report_inflight = []
+        if unfinished:
+            try:
+                await run_in_threadpool(
+                    db.interviews.update_many,
+                    {'report_interview_id': {'$in': unfinished}, 'report_status': 'pending'},
+                    {'$unset': {'report_queued_at': ''}},
+                )
+                print(f"📝 Отложенные отчёты возвращены в очередь: {len(unfinished)}")
+            except Exception as e:
+                print(f"⚠️ Не удалось вернуть отложенные отчёты в очередь: {e}")
+
+    async def _mark_report_pending(self, external_id: str, interview_id: str) -> None:
+        """Отмечает отчёт собеседования backend как ожидающий; по отметке отчёт восстанавливается после перезапуска."""
+        if not ObjectId.is_valid(external_id):
+            return
+        try:
+            await run_in_threadpool(
+                db.interviews.update_one,
+                {'_id': ObjectId(external_id)},
+                {'$set': {'report_status': 'pending', 'report_interview_id': interview_id, 'report_queued_at': datetime.utcnow()}},
+            )
+        except Exception as e:
+            print(f"⚠️ Не удалось отметить отложенный отчёт интервью {interview_id}: {e}")
+
+    def _claim_pending_reports(self) -> List[str]:
+        """Забирает ожидающие отчёты, которые никто не обрабатывает (нет отметки постановки или она устарела)."""
+        stale_before = datetime.utcnow() - timedelta(seconds=REPORT_RECOVERY_STALE_SECONDS)
+        claimed = []
+        stale = {'report_status': 'pending', 'report_interview_id': {'$exists': True},
+                 '$or': [{'report_queued_at': {'$exists': False}}, {'report_queued_at': {'$lt': stale_before}}]}
+        for document in db.interviews.find(stale, {'report_interview_id': 1, 'report_queued_at': 1}):
+            result = db.interviews.update_one(
+                {'_id': document['_id'], 'report_status': 'pending', 'report_queued_at': document.get('report_queued_at')},
+                {'$set': {'report_queued_at': datetime.utcnow()}},
+            )
+            if result.modified_count:
+                claimed.append(document['report_interview_id'])
+        return claimed
+
+    async def _run_report_recovery(self) -> None:
+        """При запуске и затем периодически возвращает в очередь отчёты, потерянные при перезапуске или сбое воркера."""
+        while True:
+            try:
+                claimed = await run_in_threadpool(self._claim_pending_reports)
+                for interview_id in claimed:
+                    self._report_queue.put_nowait(interview_id)
+                if claimed:
+                    print(f"📝 Восстановлены отложенные отчёты: {len(claimed)}")
+            except Exception as e:
+                print(f"⚠️ Ошибка восстановления отложенных отчётов: {e}")
+            await asyncio.sleep(REPORT_RECOVERY_INTERVAL_SECONDS)
+
+    async def _run_report_worker(self) -> None:
+        """Собирает ID завершённых интервью в пакеты и генерирует по ним отчёты."""
+        while True:
+            batch = [await self._report_queue.get()]
+            self._report_inflight = batch
+            deadline = time.monotonic() + REPORT_BATCH_WAIT_SECONDS
+            while len(batch) < REPORT_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._report_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                result = await self.generate_reports(batch)
+                lost = [item["interview_id"] for item in result["results"] if item["status"] == "not_found"]
+                if lost:
+                    # Состояние интервью истекло или потеряно: отчёт уже не построить
+                    await run_in_threadpool(
+                        db.interviews.update_many,
+                        {'report_interview_id': {'$in': lost}, 'report_status': 'pending'},
+                        {'$set': {'report_status': 'failed'}},
+                    )
+            except Exception as e:
+                print(f"⚠️ Ошибка пакетной генерации отчётов: {e}")
+            self._report_inflight = []
+
+    async def _write_back_report(self, external_id: Optional[str], report_result: Dict[str, Any]) -> None:
+        """Записывает отчёт в `interviews` собеседования backend."""
+        if not external_id or not ObjectId.is_valid(external_id):
+            return
+        await run_in_threadpool(
+            db.interviews.update_one,
+            {'_id': ObjectId(external_id)},
+            {'$set': {
+                'interview_analysis': report_result.get("report"),
+                'recommendation': report_result.get("final_recommendation"),
+                'report_status': 'ready',
+            }, '$unset': {'report_queued_at': ''}},
+        )
+
+    async def generate_reports(self, interview_ids: List[str], force: bool = False, write_back: bool = True) -> Dict[str, Any]:
+        """Генерирует отчёты по завершённым интервью пакетом.
+
+        Записи читаются под блокировкой интервью (после сохранения последнего
+        ответа), вызовы LLM выполняются без неё; результат сохраняется
+        под блокировкой поверх свежей версии записи и (при `write_back`)
+        записывается в `interviews.interview_analysis` собеседования backend.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        states: Dict[str, Dict[str, Any]] = {}
+        for interview_id in dict.fromkeys(interview_ids):
+            async with self._interview_lock(interview_id):
+                interview_data = await run_in_threadpool(self.state_store.get, interview_id)
+            if interview_data is None:
+                results[interview_id] = {"interview_id": interview_id, "status": "not_found"}
+            elif interview_data.get("status") != "completed":
+                results[interview_id] = {"interview_id": interview_id, "status": "not_completed"}
+            elif interview_data.get("report_status") == "ready" and not force:
+                if write_back:
+                    # Отчёт готов, но запись в backend могла не дойти (сбой между сохранением и записью)
+                    await self._write_back_report(interview_data.get("external_id"), interview_data["state"])
+                results[interview_id] = {
+                    "interview_id": interview_id,
+                    "status": "ready",
+                    "recommendation": interview_data["state"].get("final_recommendation"),
+                }
+            else:
+                states[interview_id] = interview_data["state"]
+
+        reports, counters = await agenerate_reports(self.interview_system, states)
+        for interview_id, report_result in reports.items():
+            async with self._interview_lock(interview_id):
+                interview_data = await run_in_threadpool(self.state_store.get, interview_id)
+                if interview_data is None:
+                    results[interview_id] = {"interview_id": interview_id, "status": "not_found"}
+                    continue
+                interview_data["state"].update(report_result)
+                interview_data["report_status"] = "ready"
+                try:
+                    await self._save_interview(interview_id, interview_data)
+                except HTTPException:
+                    results[interview_id] = {"interview_id": interview_id, "status": "conflict"}
+                    continue
+            if write_back:
+                await self._write_back_report(interview_data.get("external_id"), report_result)
+            results[interview_id] = {
+                "interview_id": interview_id,
+                "status": "generated",
+                "recommendation": report_result.get("final_recommendation"),
+            }
+        print(f"📝 Отчёты: {counters['interviews']} интервью, {counters['llm_calls']} вызовов LLM")
+        return {"results": [results[i] for i in dict.fromkeys(interview_ids)], **counters}
+
 
 app = FastAPI(title="AI Interview System API", version="1.0.0")
 
 api_system = None
 
+@app.middleware("http")
+async def http_metrics_middleware(request: Request, call_next):
+    """Записывает длительность обработки запроса по шаблону маршрута"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_LATENCY.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
 @app.on_event("startup")
 async def startup_event():
     """Инициализация системы при запуске"""
     global api_system
     api_key = os.getenv("OPENROUTER_API_KEY", "").strip()
+    if not api_key and LLM_BACKEND == "fake":
+        api_key = "offline-fake-llm"
     if not api_key:
         raise RuntimeError("OPENROUTER_API_KEY не задан. Установите переменную окружения с вашим OpenRouter API ключом.")
     api_system = APIInterviewSystem(api_key)
+    api_system.start_report_worker()
     print("✅ API Interview System initialized")
 
-@app.post("/interviews", response_model=InterviewResponse)
-async def create_interview(request: InterviewRequest):
-    """Создает новое интервью"""
-    try:
-        vacancy_id = request.vacancy_id
-        print(f"📋 vacancy_id: {vacancy_id}")
-        vacancy = vacancies_collection.find_one({'_id': ObjectId(vacancy_id)})
-        print(f"📊 Найдена вакансия: {vacancy is not None}")
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Останавливает очередь отчётов и закрывает общие пулы HTTP-соединений LLM"""
+    if api_system is not None:
+        await api_system.stop_report_worker()
+    await aclose_http_clients()
 
-        parts = []
-        
-        if vacancy is None:
-            print(f"⚠️ Вакансия с ID {vacancy_id} не найдена, используем стандартное описание")
-            summary_text = request.job_description or "Ищем Middle ML разработчика для задач NLP и CV."
+async def start_interview(request: InterviewRequest) -> str:
+    """Находит вакансию, создаёт интервью и возвращает его ID."""
+    vacancy_id = request.vacancy_id
+    print(f"📋 vacancy_id: {vacancy_id}")
+    vacancy = None
+    if vacancy_id and ObjectId.is_valid(vacancy_id):
+        vacancy = await run_in_threadpool(vacancies_collection.find_one, {'_id': ObjectId(vacancy_id)})
+    print(f"📊 Найдена вакансия: {vacancy is not None}")
+    if vacancy is None:
+        print(f"⚠️ Вакансия с ID {vacancy_id} не найдена, используем стандартное описание")
+
+    summary_text, role, knowledge = build_vacancy_summary(vacancy, request.job_description)
+
+    plan_template = None
+    if vacancy is not None:
+        template = vacancy.get('interview_plan_template')
+        if template and template.get('version') == template_version(role or "", summary_text):
+            plan_template = template
         else:
-            if 'title' in vacancy and 'grade' in vacancy:
-                parts.append(f"Название вакансии: {vacancy['grade']} {vacancy['title']}")
-            
-            if 'work_field' in vacancy:
-                parts.append(f"Направление: {vacancy['work_field']}")
-        
-        if 'min_experience' in vacancy and 'max_experience' in vacancy:
-            parts.append(f"Опыт работы: от {vacancy['min_experience']} до {vacancy['max_experience']} лет.")
-            
-        if vacancy.get('required_skills'):
-            skills_str = ", ".join(vacancy['required_skills'])
-            parts.append(f"\nОбязательные навыки:\n- {skills_str}")
-        
-        if vacancy.get('optional_skills'):
-            skills_str = ", ".join(vacancy['optional_skills'])
-            parts.append(f"\nБудет плюсом:\n- {skills_str}")
-        
-        if 'description' in vacancy:
-            parts.append(f"\nОписание вакансии:\n{vacancy['description']}")
-        
-        if 'company_description' in vacancy:
-            parts.append(f"\nОписание компании:\n{vacancy['company_description']}")
-        knowledge = vacancy.get('questions')
-        role = vacancy.get('work_field')
-        
-        summary_text = "\n".join(parts) 
+            api_system.schedule_vacancy_plan(vacancy_id, vacancy)
+
+    try:
+        interview_id = await run_in_threadpool(
+            api_system.create_interview,
+            resume=request.resume,
+            job_description=summary_text,
+            role=role,
+            knowledge=knowledge,
+            vacancy_id=vacancy_id,
+            plan_template=plan_template,
+            external_id=request.external_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    print(f"✅ Интервью создано: {interview_id}")
+    return interview_id
+
+
+async def stream_turn(run) -> AsyncIterator[str]:
+    """SSE-поток одного хода интервью.
 
+    События: `created` (ID нового интервью), `meta` (время на ответ), `token`
+    (фрагменты текста генерируемого вопроса), затем `done` с полным ответом
+    как у обычного endpoint или `error`. Если вопрос не генерировался LLM
+    (RAG, кэш), токенов нет и вопрос приходит в `done`.
+    Отключение клиента не прерывает ход: состояние интервью сохраняется.
+    """
+    stream = QuestionStream()
+
+    async def runner() -> Dict:
+        bind_question_stream(stream)
         try:
-            interview_id = api_system.create_interview(
-                resume=request.resume,
-                job_description=summary_text,
-                role=role,
-                knowledge=knowledge
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        print(f"✅ Интервью создано: {interview_id}")
-        
-        response = api_system.get_next_question(interview_id)
+            return await run(stream)
+        finally:
+            stream.close()
+
+    task = asyncio.create_task(runner())
+    async for event, data in stream.events():
+        yield sse_event(event, data)
+    try:
+        result = await task
+        yield sse_event("done", InterviewResponse(**result).model_dump())
+    except HTTPException as e:
+        yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+    except Exception as e:
+        yield sse_event("error", {"status_code": 500, "detail": str(e)})
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@app.post("/interviews", response_model=InterviewResponse)
+async def create_interview(request: InterviewRequest):
+    """Создает новое интервью"""
+    try:
+        interview_id = await start_interview(request)
+        response = await api_system.get_next_question(interview_id)
         return InterviewResponse(**response)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/interviews/stream")
+async def create_interview_stream(request: InterviewRequest):
+    """Создает новое интервью и выдаёт первый вопрос потоком SSE"""
+    async def run(stream: QuestionStream) -> Dict:
+        interview_id = await start_interview(request)
+        stream.emit("created", {"interview_id": interview_id})
+        return await api_system.get_next_question(interview_id)
+
+    return StreamingResponse(stream_turn(run), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.post("/interviews/{interview_id}/answer", response_model=InterviewResponse)
 async def submit_answer(interview_id: str, request: AnswerRequest):
     """Отправляет ответ кандидата"""
     try:
-        response = api_system.submit_answer(interview_id, request.answer)
+        response = await api_system.submit_answer(interview_id, request.answer)
         return InterviewResponse(**response)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/interviews/{interview_id}/answer/stream")
+async def submit_answer_stream(interview_id: str, request: AnswerRequest):
+    """Отправляет ответ кандидата и выдаёт следующий вопрос потоком SSE"""
+    async def run(stream: QuestionStream) -> Dict:
+        return await api_system.submit_answer(interview_id, request.answer)
+
+    return StreamingResponse(stream_turn(run), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.get("/interviews/{interview_id}/status", response_model=InterviewStatus)
 async def get_interview_status(interview_id: str):
     """Получает статус интервью"""
     try:
-        status = api_system.get_interview_status(interview_id)
+        status = await api_system.get_interview_status(interview_id)
         return InterviewStatus(**status)
     except HTTPException:
         raise
@@ -499,70 +1044,177 @@ async def get_interview_status(interview_id: str):
 async def get_next_question(interview_id: str):
     """Получает следующий вопрос (если интервью не завершено)"""
     try:
-        response = api_system.get_next_question(interview_id)
+        response = await api_system.get_next_question(interview_id)
         return InterviewResponse(**response)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _vacancy_matcher(vacancy_id: Optional[str], weights: Optional[Dict[str, float]]) -> FlexibleResumeMatcher:
+    """Матчер резюме для вакансии из MongoDB (HTTPException 400/404, если вакансии нет)."""
+    try:
+        oid = ObjectId(vacancy_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Некорректный ID вакансии")
+
+    vacancy = await run_in_threadpool(vacancies_collection.find_one, {'_id': oid})
+    print(f"📊 Найдена вакансия: {vacancy is not None}")
+
+    if vacancy is None:
+        raise HTTPException(status_code=404, detail="Вакансия не найдена")
+
+    required_skills = vacancy.get('required_skills') or []
+    optional_skills = vacancy.get('optional_skills') or []
+    try:
+        min_experience = float(vacancy.get('min_experience', 0))
+        max_experience = float(vacancy.get('max_experience', 100))
+    except Exception:
+        min_experience, max_experience = 0.0, 100.0
+    education_required = vacancy.get('education_required', '') or ' '
+    try:
+        description = vacancy.get('description', '')
+    except Exception:
+        description = ''
+
+    return FlexibleResumeMatcher(
+        required_skills=required_skills,
+        optional_skills=optional_skills,
+        min_experience=min_experience,
+        job_description=description,
+        max_experience=max_experience,
+        education_required=education_required,
+        weights=weights or {
+            "required_skills": 0.5,
+            "optional_skills": 0.15,
+            "experience": 0.25,
+            "education": 0.1
+        }
+    )
+
+
 @app.post("/resume-match", response_model=ResumeMatchResponse)
 async def match_resume(request: ResumeMatchRequest):
     try:
         vacancy_id = request.vacancy_id
         print(f"📋 vacancy_id: {vacancy_id}")
+        matcher = await _vacancy_matcher(vacancy_id, request.weights)
+
+        resume_text = request.resume or ""
+        if not isinstance(resume_text, str):
+            resume_text = str(resume_text)
+
+        result = await run_in_threadpool(matcher.evaluate, resume_text)
+        return ResumeMatchResponse(**result)
+        
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=500, detail=f"Error matching resume: {str(e)}")
+
+
+@app.post("/resume-match/batch", response_model=ResumeMatchBatchResponse)
+async def match_resumes_batch(request: ResumeMatchBatchRequest):
+    """
+    Оценивает пакет резюме против одной вакансии и возвращает их по убыванию оценки.
+    Эвристика считается для всего пакета сразу, LLM дооценивает только пограничных кандидатов.
+    """
+    if len(request.resumes) > MATCH_BATCH_MAX_RESUMES:
+        raise HTTPException(status_code=413, detail=f"Не более {MATCH_BATCH_MAX_RESUMES} резюме в пакете")
+    try:
+        matcher = await _vacancy_matcher(request.vacancy_id, request.weights)
+        texts = [item.resume or "" for item in request.resumes]
+        if request.use_llm:
+            llm_band = tuple(request.llm_band) if request.llm_band else MATCH_LLM_BAND
+        else:
+            llm_band = None
+
+        started = time.perf_counter()
+        rule_results = await run_in_threadpool(matcher.score_rule_based, texts)
+        results, llm_calls = await matcher.arefine_borderline(texts, rule_results, llm_band)
+        print(f"📊 Пакет резюме: {len(texts)} шт., вызовов LLM: {llm_calls}, {time.perf_counter() - started:.2f} с")
 
+        items = [
+            ResumeMatchBatchItem(id=item.id, index=i, **result)
+            for i, (item, result) in enumerate(zip(request.resumes, results))
+        ]
+        items.sort(key=lambda item: item.total_score_percent, reverse=True)
+        return ResumeMatchBatchResponse(vacancy_id=request.vacancy_id, results=items, llm_calls=llm_calls)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error matching resumes: {str(e)}")
+
+
+
+@app.post("/vacancies/{vacancy_id}/knowledge", response_model=KnowledgeSyncResponse)
+async def sync_vacancy_knowledge(vacancy_id: str):
+    """Обновляет индекс вопросов вакансии (вызывается backend при изменении списка вопросов)"""
+    try:
         try:
             oid = ObjectId(vacancy_id)
         except Exception:
             raise HTTPException(status_code=400, detail="Некорректный ID вакансии")
 
-        vacancy = vacancies_collection.find_one({'_id': oid})
-        print(f"📊 Найдена вакансия: {vacancy is not None}")
+        vacancy = await run_in_threadpool(vacancies_collection.find_one, {'_id': oid}, {'questions': 1})
+        if vacancy is None:
+            raise HTTPException(status_code=404, detail="Вакансия не найдена")
+
+        result = await run_in_threadpool(api_system.sync_vacancy_knowledge, vacancy_id, vacancy.get('questions'))
+        return KnowledgeSyncResponse(**result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error syncing knowledge: {str(e)}")
+
 
+@app.post("/vacancies/{vacancy_id}/plan", response_model=VacancyPlanResponse)
+async def build_vacancy_plan(vacancy_id: str):
+    """Строит шаблон плана интервью вакансии (вызывается backend при создании/изменении вакансии)"""
+    try:
+        if not ObjectId.is_valid(vacancy_id):
+            raise HTTPException(status_code=400, detail="Некорректный ID вакансии")
+
+        vacancy = await run_in_threadpool(vacancies_collection.find_one, {'_id': ObjectId(vacancy_id)})
         if vacancy is None:
             raise HTTPException(status_code=404, detail="Вакансия не найдена")
 
-        required_skills = vacancy.get('required_skills') or []
-        optional_skills = vacancy.get('optional_skills') or []
-        try:
-            min_experience = float(vacancy.get('min_experience', 0))
-            max_experience = float(vacancy.get('max_experience', 100))
-        except Exception:
-            min_experience, max_experience = 0.0, 100.0
-        education_required = vacancy.get('education_required', '') or ' '
-        try:
-            description = vacancy.get('description', '')
-        except Exception:
-            description = ''
-
-        matcher = FlexibleResumeMatcher(
-            required_skills=required_skills,
-            optional_skills=optional_skills,
-            min_experience=min_experience,
-            job_description=description,
-            max_experience=max_experience,
-            education_required=education_required,
-            weights=request.weights or {
-                "required_skills": 0.5,
-                "optional_skills": 0.15,
-                "experience": 0.25,
-                "education": 0.1
-            }
-        )
+        result = await api_system.build_vacancy_plan(vacancy_id, vacancy)
+        return VacancyPlanResponse(**result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building vacancy plan: {str(e)}")
 
-        resume_text = request.resume or ""
-        if not isinstance(resume_text, str):
-            resume_text = str(resume_text)
 
-        result = matcher.evaluate(resume_text)
-        return ResumeMatchResponse(**result)
-        
+@app.post("/reports/batch", response_model=ReportBatchResponse)
+async def generate_reports_batch(request: ReportBatchRequest):
+    """Генерирует отчёты по завершённым интервью пакетом (с ограничением параллелизма)"""
+    try:
+        result = await api_system.generate_reports(request.interview_ids, force=request.force, write_back=request.write_back)
+        return ReportBatchResponse(**result)
+    except HTTPException:
+        raise
     except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
-        raise HTTPException(status_code=500, detail=f"Error matching resume: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating reports: {str(e)}")
+
+
+@app.get("/embedding-cache/stats")
+async def embedding_cache_stats():
+    """Счётчики попаданий/промахов кэша эмбеддингов"""
+    return {"caches": get_embedding_cache_stats()}
+
+
+@app.get("/llm-cache/stats")
+async def llm_cache_stats():
+    """Счётчики попаданий кэша ответов LLM по агентам"""
+    return get_llm_cache().stats()
+
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Метрики вызовов LLM и HTTP-запросов в формате Prometheus (по текущему воркеру)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
@@ -574,13 +1226,26 @@ async def root():
         "endpoints": {
             "create_interview": "POST /interviews",
             "submit_answer": "POST /interviews/{interview_id}/answer",
+            "create_interview_stream": "POST /interviews/stream (SSE)",
+            "submit_answer_stream": "POST /interviews/{interview_id}/answer/stream (SSE)",
             "get_status": "GET /interviews/{interview_id}/status",
             "get_next_question": "GET /interviews/{interview_id}/next-question",
-            "match_resume": "POST /resume-match"
+            "match_resume": "POST /resume-match",
+            "match_resumes_batch": "POST /resume-match/batch",
+            "sync_vacancy_knowledge": "POST /vacancies/{vacancy_id}/knowledge",
+            "build_vacancy_plan": "POST /vacancies/{vacancy_id}/plan",
+            "generate_reports_batch": "POST /reports/batch",
+            "embedding_cache_stats": "GET /embedding-cache/stats",
+            "llm_cache_stats": "GET /llm-cache/stats",
+            "metrics": "GET /metrics"
         }
     }
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    workers = int(os.getenv("AI_HR_WORKERS", "1"))
+    if workers > 1 and os.getenv("AI_HR_STATE_STORE", "auto").lower() == "memory":
+        raise RuntimeError("AI_HR_WORKERS > 1 требует общего хранилища состояния (AI_HR_STATE_STORE=mongo или sqlite)")
+    print(f"🚀 Запуск AI-HR API: {workers} воркер(ов)")
+    uvicorn.run("api:app", host="0.0.0.0", port=int(os.getenv("AI_HR_PORT", "8002")), workers=workers)
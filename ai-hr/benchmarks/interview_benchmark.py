@@ -0,0 +1,154 @@
+"""
+Сквозной бенчмарк интервью на офлайн-модели (без OpenRouter).
+
+Сервис `api.py` поднимается в этом же процессе (ASGI-транспорт httpx) с
+`AI_HR_LLM_BACKEND=fake` и хранилищем состояния в памяти; N кандидатов
+одновременно проходят цикл создание → ответ × k → статус с отчётом.
+Выводятся p50/p95/p99 по endpoint'ам, интервью в секунду и память на интервью
+(прирост RSS процесса и размер сериализованного состояния).
+
+    python -m benchmarks.interview_benchmark --interviews 200 --concurrency 32 --latency-ms 300
+
+Против уже запущенного сервиса (память на интервью не измеряется):
+
+    python -m benchmarks.interview_benchmark --url http://localhost:8002 --interviews 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.load_benchmark import ANSWERS, percentile
+
+ENDPOINTS = ("create", "answer", "report")
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS текущего процесса (Linux), иначе None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+async def run_interview(client: httpx.AsyncClient, answers: int, latencies: Dict[str, List[float]]) -> bool:
+    async def call(kind: str, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        started = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        latencies[kind].append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        return response.json()
+
+    try:
+        data = await call("create", "POST", "/interviews", json={
+            "resume": "Python, pandas, scikit-learn, PyTorch; 2 года в NLP-проектах.",
+            "job_description": "Junior ML Engineer: Python, классическое ML, базовый NLP.",
+        })
+        interview_id = data["interview_id"]
+        for i in range(answers):
+            if data.get("status") == "completed":
+                break
+            data = await call("answer", "POST", f"/interviews/{interview_id}/answer", json={"answer": ANSWERS[i % len(ANSWERS)]})
+        await call("report", "GET", f"/interviews/{interview_id}/status")
+        return True
+    except Exception as e:
+        print(f"⚠️ Ошибка интервью: {e}")
+        return False
+
+
+async def run_benchmark(client: httpx.AsyncClient, interviews: int, concurrency: int, answers: int) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {kind: [] for kind in ENDPOINTS}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker() -> bool:
+        async with semaphore:
+            return await run_interview(client, answers, latencies)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(worker() for _ in range(interviews)))
+    elapsed = time.perf_counter() - started
+    return {"ok": sum(results), "interviews": interviews, "seconds": elapsed, "latencies": latencies}
+
+
+def state_bytes(store: Any) -> Optional[float]:
+    """Средний размер сериализованной записи интервью в хранилище в памяти."""
+    items = getattr(store, "_items", None)
+    if not items:
+        return None
+    return statistics.mean(len(text.encode("utf-8")) for _, text, _ in items.values())
+
+
+async def run_in_process(args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ["AI_HR_LLM_BACKEND"] = "fake"
+    os.environ["AI_HR_FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["AI_HR_FAKE_LLM_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["AI_HR_STATE_STORE"] = "memory"
+    os.environ.setdefault("AI_HR_STATE_MAX_INTERVIEWS", str(max(1000, args.interviews)))
+
+    import api
+
+    await api.startup_event()
+    transport = httpx.ASGITransport(app=api.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://ai-hr", timeout=args.timeout) as client:
+            await run_benchmark(client, min(args.warmup, args.interviews), args.concurrency, args.answers)
+            rss_before = rss_bytes()
+            result = await run_benchmark(client, args.interviews, args.concurrency, args.answers)
+            rss_after = rss_bytes()
+    finally:
+        await api.shutdown_event()
+
+    if rss_before is not None and rss_after is not None:
+        result["rss_per_interview"] = max(0, rss_after - rss_before) / max(1, result["ok"])
+    result["state_bytes"] = state_bytes(api.api_system.state_store)
+    return result
+
+
+async def run_remote(args: argparse.Namespace) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await run_benchmark(client, args.interviews, args.concurrency, args.answers)
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    seconds = result["seconds"]
+    print(f"Интервью: {result['ok']}/{result['interviews']} за {seconds:.1f} с "
+          f"({result['ok'] / seconds if seconds else 0.0:.2f} интервью/с)")
+    header = f"{'endpoint':>10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for kind, values in result["latencies"].items():
+        if not values:
+            continue
+        print(f"{kind:>10}{len(values):>8}{statistics.median(values):>10.1f}"
+              f"{percentile(values, 0.95):>10.1f}{percentile(values, 0.99):>10.1f}")
+    if result.get("rss_per_interview") is not None:
+        print(f"Прирост RSS на интервью: {result['rss_per_interview'] / 1024:.1f} КиБ")
+    if result.get("state_bytes") is not None:
+        print(f"Размер состояния интервью: {result['state_bytes'] / 1024:.1f} КиБ")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сквозной бенчмарк интервью AI-HR на офлайн-модели")
+    parser.add_argument("--url", help="Адрес запущенного сервиса (по умолчанию — сервис в этом процессе)")
+    parser.add_argument("--interviews", type=int, default=100, help="Число интервью")
+    parser.add_argument("--concurrency", type=int, default=16, help="Число одновременных интервью")
+    parser.add_argument("--answers", type=int, default=6, help="Ответов в одном интервью (k)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Задержка офлайн-модели, мс")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Разброс задержки офлайн-модели, мс")
+    parser.add_argument("--warmup", type=int, default=4, help="Интервью для прогрева (не учитываются)")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Таймаут запроса, с")
+    args = parser.parse_args()
+
+    runner = run_remote if args.url else run_in_process
+    print_result(asyncio.run(runner(args)))
+
+
+if __name__ == "__main__":
+    main()
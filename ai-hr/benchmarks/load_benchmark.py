@@ -0,0 +1,165 @@
+"""
+Нагрузочный тест AI-HR API: цикл создание интервью → ответы → отчёт.
+
+Каждый виртуальный кандидат создаёт интервью, отвечает на вопросы до
+завершения (или до лимита ответов) и запрашивает статус с отчётом. Интервью
+не привязаны к воркеру: состояние хранится во внешнем хранилище
+(`AI_HR_STATE_STORE`), поэтому запросы одного интервью могут обслуживать
+разные процессы.
+
+Нагрузка на уже запущенный сервис:
+
+    python -m benchmarks.load_benchmark --url http://localhost:8002 --vacancy-id <id> --concurrency 16
+
+Масштабирование по числу воркеров (сервис поднимается тестом на каждое значение):
+
+    python -m benchmarks.load_benchmark --vacancy-id <id> --spawn-workers 1 2 4 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ANSWERS = [
+    "Я бы начал с анализа данных и постановки метрики, затем построил бейзлайн и итеративно улучшал модель.",
+    "Использую кросс-валидацию, слежу за переобучением по кривым обучения и применяю регуляризацию.",
+    "Не уверен, но думаю, что здесь важно учитывать распределение данных и выбросы.",
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run_candidate(client: httpx.AsyncClient, vacancy_id: str, max_answers: int, latencies: Dict[str, List[float]]) -> bool:
+    """Проходит одно интервью; возвращает True, если цикл завершился без ошибок."""
+
+    async def call(kind: str, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        started = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        latencies.setdefault(kind, []).append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        return response.json()
+
+    try:
+        data = await call("create", "POST", "/interviews", json={
+            "resume": "Python, pandas, scikit-learn, PyTorch; 2 года в NLP-проектах.",
+            "vacancy_id": vacancy_id,
+        })
+        interview_id = data["interview_id"]
+        for i in range(max_answers):
+            if data.get("status") == "completed":
+                break
+            data = await call("answer", "POST", f"/interviews/{interview_id}/answer", json={"answer": ANSWERS[i % len(ANSWERS)]})
+        await call("report", "GET", f"/interviews/{interview_id}/status")
+        return True
+    except Exception as e:
+        print(f"⚠️ Ошибка интервью: {e}")
+        return False
+
+
+async def run_load(url: str, vacancy_id: str, interviews: int, concurrency: int, max_answers: int, timeout: float) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        async def worker() -> bool:
+            async with semaphore:
+                return await run_candidate(client, vacancy_id, max_answers, latencies)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(worker() for _ in range(interviews)))
+        elapsed = time.perf_counter() - started
+
+    requests_total = sum(len(values) for values in latencies.values())
+    answer_latencies = latencies.get("answer", [])
+    return {
+        "interviews": interviews,
+        "ok": sum(results),
+        "seconds": elapsed,
+        "interviews_per_min": sum(results) / elapsed * 60 if elapsed else 0.0,
+        "requests_per_s": requests_total / elapsed if elapsed else 0.0,
+        "answer_p50_ms": statistics.median(answer_latencies) if answer_latencies else None,
+        "answer_p95_ms": percentile(answer_latencies, 0.95) if answer_latencies else None,
+    }
+
+
+def spawn_service(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, AI_HR_WORKERS=str(workers), AI_HR_PORT=str(port))
+    if env.get("AI_HR_STATE_STORE", "auto").lower() == "memory":
+        env["AI_HR_STATE_STORE"] = "sqlite"
+    service_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen([sys.executable, "api.py"], cwd=service_dir, env=env)
+
+
+def wait_ready(url: str, timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(1)
+    raise RuntimeError(f"Сервис {url} не поднялся за {timeout:.0f} с")
+
+
+def print_rows(rows: List[Dict[str, Any]]) -> None:
+    header = f"{'workers':>8}{'ok/total':>11}{'seconds':>10}{'int/min':>10}{'req/s':>9}{'ans p50':>10}{'ans p95':>10}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    base = rows[0]["interviews_per_min"] if rows and rows[0]["interviews_per_min"] else None
+    for row in rows:
+        p50 = f"{row['answer_p50_ms']:.0f}" if row["answer_p50_ms"] is not None else "n/a"
+        p95 = f"{row['answer_p95_ms']:.0f}" if row["answer_p95_ms"] is not None else "n/a"
+        speedup = f"{row['interviews_per_min'] / base:.2f}x" if base else "n/a"
+        print(
+            f"{str(row.get('workers', '-')):>8}{row['ok']:>6}/{row['interviews']:<4}{row['seconds']:>10.1f}"
+            f"{row['interviews_per_min']:>10.1f}{row['requests_per_s']:>9.2f}{p50:>10}{p95:>10}{speedup:>9}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест AI-HR API")
+    parser.add_argument("--url", default="http://localhost:8002", help="Адрес уже запущенного сервиса")
+    parser.add_argument("--vacancy-id", required=True, help="ID вакансии в MongoDB")
+    parser.add_argument("--interviews", type=int, default=32, help="Число интервью на прогон")
+    parser.add_argument("--concurrency", type=int, default=8, help="Число одновременных кандидатов")
+    parser.add_argument("--max-answers", type=int, default=6, help="Лимит ответов в одном интервью")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Таймаут запроса, с")
+    parser.add_argument("--spawn-workers", type=int, nargs="*", help="Поднять сервис с указанным числом воркеров и замерить каждое")
+    parser.add_argument("--port", type=int, default=8802, help="Порт для поднимаемого сервиса")
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    if not args.spawn_workers:
+        row = asyncio.run(run_load(args.url, args.vacancy_id, args.interviews, args.concurrency, args.max_answers, args.timeout))
+        print_rows([row])
+        return
+
+    rows = []
+    url = f"http://localhost:{args.port}"
+    for workers in args.spawn_workers:
+        process: Optional[subprocess.Popen] = spawn_service(workers, args.port)
+        try:
+            wait_ready(url, args.startup_timeout)
+            row = asyncio.run(run_load(url, args.vacancy_id, args.interviews, args.concurrency, args.max_answers, args.timeout))
+            row["workers"] = workers
+            rows.append(row)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    print_rows(rows)
+
+
+if __name__ == "__main__":
+    main()
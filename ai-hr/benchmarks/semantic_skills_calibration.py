@@ -0,0 +1,133 @@
+"""
+Калибровка порога семантического сопоставления навыков (`AI_HR_SEMANTIC_SKILL_THRESHOLD`).
+
+Считает косинусную близость размеченных пар «навык вакансии — фраза резюме»
+на русском и английском, печатает точность/полноту при заданном пороге и
+порог с лучшим F1 отдельно для кириллицы и латиницы. Перед включением
+`AI_HR_SEMANTIC_SKILLS` или сменой модели порог нужно проверить на этой
+выборке (и дополнить её парами из своих вакансий). Запуск из каталога ai-hr:
+
+    python -m benchmarks.semantic_skills_calibration --threshold 0.6
+"""
+
+import argparse
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ml_system.retrieva import get_shared_embeddings
+from ml_system.semantic_skills import SEMANTIC_SKILL_MODEL, SEMANTIC_SKILL_THRESHOLD
+
+POSITIVE_PAIRS: List[Tuple[str, str]] = [
+    ("PyTorch", "обучал нейросети на torch"),
+    ("Машинное обучение", "строил ML-модели для скоринга"),
+    ("SQL", "писал запросы к PostgreSQL"),
+    ("Docker", "контейнеризация сервисов"),
+    ("Kubernetes", "деплой в k8s"),
+    ("Git", "система контроля версий"),
+    ("Английский язык", "English B2"),
+    ("Python", "разработка на питоне"),
+    ("Работа в команде", "взаимодействовал с командой из пяти человек"),
+    ("CI/CD", "настроил пайплайны GitLab CI"),
+    ("REST API", "проектировал HTTP API сервисов"),
+    ("Linux", "администрирование серверов Ubuntu"),
+    ("Анализ данных", "data analysis в pandas"),
+    ("NLP", "обработка естественного языка"),
+    ("Computer Vision", "распознавание объектов на изображениях"),
+    ("Agile", "работа по Scrum"),
+    ("Machine learning", "built ML models for churn prediction"),
+    ("Deep learning", "trained neural networks with torch"),
+    ("Relational databases", "wrote queries for PostgreSQL"),
+    ("Containerization", "packaged services with Docker"),
+    ("Version control", "daily work with git"),
+    ("Cloud platforms", "deployed services to AWS"),
+    ("Data visualization", "built dashboards in Tableau"),
+    ("Team leadership", "managed a team of six engineers"),
+]
+
+NEGATIVE_PAIRS: List[Tuple[str, str]] = [
+    ("PyTorch", "бухгалтерский учёт в 1С"),
+    ("SQL", "вёрстка макетов в Figma"),
+    ("Docker", "продажи B2B клиентам"),
+    ("Kubernetes", "преподавание математики в школе"),
+    ("Python", "водительские права категории B"),
+    ("Машинное обучение", "организация корпоративных мероприятий"),
+    ("Английский язык", "немецкий язык"),
+    ("Java", "JavaScript разработка фронтенда"),
+    ("PostgreSQL", "опыт работы с MongoDB"),
+    ("React", "разработка интерфейсов на Vue.js"),
+    ("Работа в команде", "ремонт автомобилей"),
+    ("Linux", "дизайн логотипов"),
+    ("CI/CD", "ведение социальных сетей"),
+    ("Анализ данных", "приём звонков клиентов"),
+    ("NLP", "сварочные работы"),
+    ("Computer Vision", "управление складом"),
+    ("Machine learning", "organized corporate events"),
+    ("Deep learning", "accounting in SAP"),
+    ("Relational databases", "designed logos in Illustrator"),
+    ("Containerization", "B2B sales and cold calls"),
+    ("Version control", "taught high school math"),
+    ("Cloud platforms", "warehouse inventory management"),
+    ("Data visualization", "customer support over the phone"),
+    ("Team leadership", "intern without direct reports"),
+]
+
+_CYRILLIC = re.compile(r"[а-яё]", re.IGNORECASE)
+
+
+def similarities(embeddings, pairs: List[Tuple[str, str]]) -> np.ndarray:
+    """Косинусная близость навыка и фразы для каждой пары."""
+    skills = np.asarray(embeddings.embed_documents([skill for skill, _ in pairs]), dtype=np.float32)
+    phrases = np.asarray(embeddings.embed_documents([phrase for _, phrase in pairs]), dtype=np.float32)
+    skills /= np.maximum(np.linalg.norm(skills, axis=1, keepdims=True), 1e-12)
+    phrases /= np.maximum(np.linalg.norm(phrases, axis=1, keepdims=True), 1e-12)
+    return np.einsum("ij,ij->i", skills, phrases)
+
+
+def metrics_at(positive: np.ndarray, negative: np.ndarray, threshold: float) -> Dict[str, float]:
+    true_positive = int((positive >= threshold).sum())
+    false_positive = int((negative >= threshold).sum())
+    precision = true_positive / (true_positive + false_positive) if true_positive + false_positive else 1.0
+    recall = true_positive / len(positive) if len(positive) else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"threshold": threshold, "precision": precision, "recall": recall, "f1": f1}
+
+
+def best_threshold(positive: np.ndarray, negative: np.ndarray) -> Dict[str, float]:
+    candidates = np.round(np.arange(0.2, 0.951, 0.01), 2)
+    return max((metrics_at(positive, negative, float(t)) for t in candidates), key=lambda m: (m["f1"], m["threshold"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Калибровка порога семантического сопоставления навыков")
+    parser.add_argument("--model", default=SEMANTIC_SKILL_MODEL)
+    parser.add_argument("--threshold", type=float, default=SEMANTIC_SKILL_THRESHOLD)
+    args = parser.parse_args()
+
+    embeddings = get_shared_embeddings(args.model)
+    positive = similarities(embeddings, POSITIVE_PAIRS)
+    negative = similarities(embeddings, NEGATIVE_PAIRS)
+    is_cyrillic_positive = np.array([bool(_CYRILLIC.search(skill + phrase)) for skill, phrase in POSITIVE_PAIRS])
+    is_cyrillic_negative = np.array([bool(_CYRILLIC.search(skill + phrase)) for skill, phrase in NEGATIVE_PAIRS])
+
+    print(f"Модель: {args.model}")
+    header = f"{'выборка':<12}{'pos mean':>10}{'neg mean':>10}{'neg max':>9}{'P@thr':>8}{'R@thr':>8}{'best thr':>10}{'best F1':>9}"
+    print(header)
+    print("-" * len(header))
+    subsets = {
+        "кириллица": (positive[is_cyrillic_positive], negative[is_cyrillic_negative]),
+        "латиница": (positive[~is_cyrillic_positive], negative[~is_cyrillic_negative]),
+        "все": (positive, negative),
+    }
+    for name, (pos, neg) in subsets.items():
+        at = metrics_at(pos, neg, args.threshold)
+        best = best_threshold(pos, neg)
+        print(
+            f"{name:<12}{pos.mean():>10.3f}{neg.mean():>10.3f}{neg.max():>9.3f}"
+            f"{at['precision']:>8.2f}{at['recall']:>8.2f}{best['threshold']:>10.2f}{best['f1']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
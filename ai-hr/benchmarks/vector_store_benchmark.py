@@ -0,0 +1,141 @@
+"""
+Сравнение бэкендов векторного поиска: NumpyVectorStore против ChromaDB.
+
+Эмбеддинги синтетические (детерминированные по тексту), чтобы измерять только
+сам индекс, без энкодера. Запуск из каталога ai-hr:
+
+    python -m benchmarks.vector_store_benchmark --sizes 100 1000 10000
+"""
+
+import argparse
+import gc
+import hashlib
+import statistics
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ml_system.numpy_index import NumpyVectorStore
+from ml_system.retrieva import ChromaDBVectorStore
+
+SECTIONS = ["Python", "ML", "Statistics", "SQL", "Deep Learning", "MLOps", "Algorithms", "NLP"]
+
+
+class SyntheticEmbeddingFunction:
+    """Детерминированные нормированные эмбеддинги по sha1 текста."""
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in input:
+            seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+def rss_mb() -> Optional[float]:
+    """Текущий RSS процесса в МБ (только Linux)."""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def make_corpus(size: int) -> tuple:
+    documents, metadatas, ids = [], [], []
+    for i in range(size):
+        section = SECTIONS[i % len(SECTIONS)]
+        question = f"Вопрос {i} по теме {section}"
+        documents.append(f"Секция: {section}\nВопрос: {question}")
+        metadatas.append({"section": section, "question": question})
+        ids.append(f"q_{i}")
+    return documents, metadatas, ids
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def timed(fn: Callable[[], Any], repeats: int) -> List[float]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run_backend(name: str, factory: Callable[[], Any], size: int, embedding_function: SyntheticEmbeddingFunction, repeats: int, batch: int) -> Dict[str, Any]:
+    documents, metadatas, ids = make_corpus(size)
+    queries = embedding_function([f"запрос {i}" for i in range(batch)])
+
+    gc.collect()
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    store = factory()
+    store.add_documents(documents, metadatas, ids)
+    build_ms = (time.perf_counter() - started) * 1000
+    rss_after = rss_mb()
+
+    single = timed(lambda: store.query_batch(queries[:1], n_results=5), repeats)
+    filtered = timed(lambda: store.query_batch(queries[:1], n_results=5, where_filter={"section": "ML"}), repeats)
+    batched = timed(lambda: store.query_batch(queries, n_results=5), repeats)
+
+    return {
+        "backend": name,
+        "size": size,
+        "build_ms": build_ms,
+        "p50_ms": statistics.median(single),
+        "p95_ms": percentile(single, 0.95),
+        "filtered_p50_ms": statistics.median(filtered),
+        "batch_p50_ms": statistics.median(batched),
+        "rss_mb": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк NumpyVectorStore vs ChromaDB")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--dim", type=int, default=384, help="Размерность эмбеддингов (all-MiniLM-L6-v2: 384)")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=8, help="Число запросов в пакетном поиске")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    args = parser.parse_args()
+
+    embedding_function = SyntheticEmbeddingFunction(args.dim)
+    rows = []
+    for size in args.sizes:
+        rows.append(run_backend(
+            f"numpy[{args.dtype}]",
+            lambda: NumpyVectorStore(f"bench_{uuid.uuid4().hex[:8]}", embedding_function, dtype=args.dtype),
+            size, embedding_function, args.repeats, args.batch,
+        ))
+        rows.append(run_backend(
+            "chroma",
+            lambda: ChromaDBVectorStore(collection_name=f"bench_{uuid.uuid4().hex[:8]}", embedding_function=embedding_function),
+            size, embedding_function, args.repeats, args.batch,
+        ))
+
+    header = f"{'backend':<16}{'size':>8}{'build ms':>12}{'p50 ms':>10}{'p95 ms':>10}{'filt p50':>10}{'batch p50':>11}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        rss = f"{row['rss_mb']:.1f}" if row["rss_mb"] is not None else "n/a"
+        print(
+            f"{row['backend']:<16}{row['size']:>8}{row['build_ms']:>12.1f}{row['p50_ms']:>10.3f}"
+            f"{row['p95_ms']:>10.3f}{row['filtered_p50_ms']:>10.3f}{row['batch_p50_ms']:>11.3f}{rss:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Контентно-адресуемый дисковый кэш эмбеддингов."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("AI_HR_EMBEDDING_CACHE_DIR", "./cache/embeddings")
+
+
+class EmbeddingCache:
+    """
+    Дисковый кэш эмбеддингов, адресуемый по (модель, sha256 текста).
+
+    Для каждой модели хранит два файла: `vectors.f32` — непрерывная float32-матрица,
+    открываемая через `np.memmap`, и `index.json` — соответствие хэша текста номеру
+    строки. Новые векторы дописываются в конец файла под файловой блокировкой,
+    поэтому кэш можно разделять между процессами.
+
+    Attributes:
+        model_name: Имя модели, для которой хранятся векторы.
+        directory: Каталог кэша этой модели.
+        hits: Количество текстов, найденных в кэше.
+        misses: Количество текстов, потребовавших вызова энкодера.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+        self.model_name = model_name
+        self.directory = os.path.join(cache_dir, re.sub(r'[^a-zA-Z0-9._-]', '_', model_name))
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.lock_path = os.path.join(self.directory, ".lock")
+
+        self.hits = 0
+        self.misses = 0
+        self.encode_seconds = 0.0
+
+        self._lock = threading.Lock()
+        self._dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._reload()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        """Возвращает ключ кэша для текста (sha256 от UTF-8 представления)."""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _reload(self) -> None:
+        """Перечитывает индекс и заново отображает файл векторов в память."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+
+        self._dim = index.get("dim")
+        self._rows = index.get("rows", {})
+        count = int(index.get("count", len(self._rows)))
+
+        if self._dim and count and os.path.exists(self.vectors_path):
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(count, self._dim))
+        else:
+            self._vectors = None
+
+    def _acquire_file_lock(self):
+        handle = open(self.lock_path, 'a')
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def lookup(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Ищет векторы для текстов и обновляет счётчики попаданий/промахов.
+
+        Args:
+            texts: Тексты документов.
+
+        Returns:
+            Список той же длины: вектор из кэша либо None при промахе.
+        """
+        with self._lock:
+            found: List[Optional[np.ndarray]] = []
+            for text in texts:
+                row = self._rows.get(self.text_key(text))
+                if row is not None and self._vectors is not None and row < self._vectors.shape[0]:
+                    found.append(self._vectors[row])
+                    self.hits += 1
+                else:
+                    found.append(None)
+                    self.misses += 1
+            return found
+
+    def add(self, texts: List[str], vectors: List[List[float]]) -> None:
+        """Дописывает векторы в кэш (уже сохранённые тексты пропускаются).
+
+        Args:
+            texts: Тексты документов.
+            vectors: Эмбеддинги тех же документов.
+        """
+        if not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            handle = self._acquire_file_lock()
+            try:
+                self._reload()
+                if self._dim is None:
+                    self._dim = int(matrix.shape[1])
+                elif self._dim != matrix.shape[1]:
+                    logger.warning(
+                        f"Размерность эмбеддингов изменилась ({self._dim} -> {matrix.shape[1]}), кэш не обновлён"
+                    )
+                    return
+
+                count = len(self._rows)
+                new_rows: List[int] = []
+                for i, text in enumerate(texts):
+                    key = self.text_key(text)
+                    if key in self._rows:
+                        continue
+                    self._rows[key] = count
+                    count += 1
+                    new_rows.append(i)
+                if not new_rows:
+                    return
+
+                with open(self.vectors_path, 'ab') as f:
+                    f.truncate((count - len(new_rows)) * self._dim * 4)
+                    f.write(np.ascontiguousarray(matrix[new_rows]).tobytes())
+
+                tmp_path = f"{self.index_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"model": self.model_name, "dim": self._dim, "count": count, "rows": self._rows}, f)
+                os.replace(tmp_path, self.index_path)
+
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(count, self._dim))
+            finally:
+                handle.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Возвращает счётчики кэша и оценку сэкономленного времени энкодера."""
+        encoded = self.misses
+        per_text = self.encode_seconds / encoded if encoded else 0.0
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "size": len(self._rows),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "encode_seconds": round(self.encode_seconds, 3),
+            "estimated_seconds_saved": round(self.hits * per_text, 3),
+        }
+
+
+class CachedEmbeddings:
+    """
+    Обёртка над моделью эмбеддингов LangChain, обращающаяся к энкодеру только при промахах кэша.
+
+    Совместима по интерфейсу (`embed_documents`, `embed_query`) с `HuggingFaceEmbeddings`.
+    """
+
+    def __init__(self, embeddings: Any, cache: EmbeddingCache) -> None:
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Возвращает эмбеддинги документов, кодируя одним батчем только отсутствующие в кэше."""
+        texts = list(texts)
+        cached = self.cache.lookup(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+
+        if missing:
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            started = time.perf_counter()
+            encoded = self.embeddings.embed_documents(unique_texts)
+            self.cache.encode_seconds += time.perf_counter() - started
+            self.cache.add(unique_texts, encoded)
+            by_text = dict(zip(unique_texts, encoded))
+            for i in missing:
+                cached[i] = by_text[texts[i]]
+
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in cached]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Возвращает эмбеддинг запроса (через тот же кэш)."""
+        return self.embed_documents([text])[0]
@@ -1,10 +1,24 @@
+import copy
 import logging
 from typing import List, Dict, Any, Optional
 
+from ..src.llm import ainvoke_llm, invoke_llm, render_prompt, response_text
+from ..src.metrics import record_fallback
 from ..src.prompts import get_hint_promt, llm_question_prompt
+from ..src.timing import heuristic_optimal_time, parse_question_payload
+from ..turn_log import get_topic_stats, last_evaluation
 
 logger = logging.getLogger(__name__)
 
+QUESTION_ACTIONS = {
+    "increase_difficulty": ("продвинутый и повышенной сложности", "harder"),
+    "deepen_topic": ("детализированный и углубляющийся в нюансы", "deepening"),
+    "same_level_question": ("сопоставимой сложности", "same_level"),
+}
+
+# Поля состояния, которые читает генерация вопроса (`_llm_question_messages`, `_parse_llm_question`)
+QUESTION_STATE_FIELDS = ("current_topic", "current_question", "last_candidate_answer", "questions_asked_count", "role")
+
 
 class AdaptiveInterviewControllerAgent:
     """
@@ -51,64 +65,32 @@ class AdaptiveInterviewControllerAgent:
         decision = self.analyze_and_decide(state)
         return self.execute_decision(state, decision)
 
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Асинхронная версия `execute`: вопросы генерируются через `ainvoke`."""
+        logger.debug("--- Агент: Адаптивный контроллер интервью (async) ---")
+        decision = self.analyze_and_decide(state)
+        return await self.aexecute_decision(state, decision)
+
     def analyze_and_decide(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        recent_scores = self._get_topic_scores(state)
+        topic_stats = self._get_topic_stats(state)
         last_evaluation = self._get_last_evaluation(state)
 
-        if not recent_scores:
+        if not topic_stats["count"]:
             return {"action": "continue", "reason": "Первый вопрос по теме"}
 
-        poor_streak = self._count_poor_streak(recent_scores)
-        good_streak = self._count_good_streak(recent_scores)
-        medium_streak = self._count_medium_streak(recent_scores)
-        last_score = recent_scores[-1]
+        poor_streak = topic_stats["poor_streak"]
+        good_streak = topic_stats["good_streak"]
+        medium_streak = topic_stats["medium_streak"]
+        last_score = topic_stats["recent_scores"][-1]
 
-        logger.debug(f"Последние оценки: {recent_scores}")
+        logger.debug(f"Последние оценки: {topic_stats['recent_scores']}")
         logger.debug(
             f"Серии подряд — плохие: {poor_streak}, хорошие: {good_streak}, средние: {medium_streak}"
         )
 
-        questions_in_topic = state.get("questions_in_current_topic", 0)
-        interview_plan = state.get("interview_plan", {})
-        topics = interview_plan.get("topics", [])
-        current_topic_index = state.get("current_topic_index", 0)
-        if current_topic_index < len(topics):
-            current_topic_obj = (
-                topics[current_topic_index] if isinstance(topics[current_topic_index], dict) else {}
-            )
-            topic_max_questions = current_topic_obj.get("max_questions")
-            if not isinstance(topic_max_questions, int) or topic_max_questions <= 0:
-                topic_max_questions = 2
-            if questions_in_topic >= topic_max_questions:
-                logger.info(
-                    f"Достигнут лимит вопросов в теме ({questions_in_topic}/{topic_max_questions})"
-                )
-                return {
-                    "action": "skip_topic",
-                    "reason": f"Достигнут лимит вопросов в теме ({questions_in_topic}/{topic_max_questions})",
-                }
-
-        deepening_count = state.get("deepening_questions_count", 0)
-        if deepening_count >= self.max_deepening_questions:
-            logger.info(
-                f"Достигнут лимит уточняющих вопросов ({deepening_count}/{self.max_deepening_questions}), сбрасываем счетчик и задаем новый вопрос"
-            )
-            return {
-                "action": "same_level_question",
-                "reason": f"Достигнут лимит уточняющих вопросов ({deepening_count}/{self.max_deepening_questions}), сбрасываем счетчик",
-                "deepening_questions_count": 0,
-            }
-
-        hints_count = state.get("hints_given_count", 0)
-        if hints_count >= self.max_hints:
-            logger.info(
-                f"Достигнут лимит подсказок ({hints_count}/{self.max_hints}), сбрасываем счетчик и задаем новый вопрос"
-            )
-            return {
-                "action": "same_level_question",
-                "reason": f"Достигнут лимит подсказок ({hints_count}/{self.max_hints}), сбрасываем счетчик",
-                "hints_given_count": 0,
-            }
+        limit_decision = self._limit_decision(state)
+        if limit_decision is not None:
+            return limit_decision
 
         if last_evaluation and self._is_unknown_response(last_evaluation):
             hints_count = state.get("hints_given_count", 0)
@@ -156,6 +138,89 @@ class AdaptiveInterviewControllerAgent:
                 "reason": f"Слабый результат ({last_score}%) - даем подсказку",
             }
 
+    def _limit_decision(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Решения, определяемые только лимитами темы, уточнений и подсказок (без оценки ответа)."""
+        questions_in_topic = state.get("questions_in_current_topic", 0)
+        interview_plan = state.get("interview_plan", {})
+        topics = interview_plan.get("topics", [])
+        current_topic_index = state.get("current_topic_index", 0)
+        if current_topic_index < len(topics):
+            current_topic_obj = (
+                topics[current_topic_index] if isinstance(topics[current_topic_index], dict) else {}
+            )
+            topic_max_questions = current_topic_obj.get("max_questions")
+            if not isinstance(topic_max_questions, int) or topic_max_questions <= 0:
+                topic_max_questions = 2
+            if questions_in_topic >= topic_max_questions:
+                logger.info(
+                    f"Достигнут лимит вопросов в теме ({questions_in_topic}/{topic_max_questions})"
+                )
+                return {
+                    "action": "skip_topic",
+                    "reason": f"Достигнут лимит вопросов в теме ({questions_in_topic}/{topic_max_questions})",
+                }
+
+        deepening_count = state.get("deepening_questions_count", 0)
+        if deepening_count >= self.max_deepening_questions:
+            logger.info(
+                f"Достигнут лимит уточняющих вопросов ({deepening_count}/{self.max_deepening_questions}), сбрасываем счетчик и задаем новый вопрос"
+            )
+            return {
+                "action": "same_level_question",
+                "reason": f"Достигнут лимит уточняющих вопросов ({deepening_count}/{self.max_deepening_questions}), сбрасываем счетчик",
+                "deepening_questions_count": 0,
+            }
+
+        hints_count = state.get("hints_given_count", 0)
+        if hints_count >= self.max_hints:
+            logger.info(
+                f"Достигнут лимит подсказок ({hints_count}/{self.max_hints}), сбрасываем счетчик и задаем новый вопрос"
+            )
+            return {
+                "action": "same_level_question",
+                "reason": f"Достигнут лимит подсказок ({hints_count}/{self.max_hints}), сбрасываем счетчик",
+                "hints_given_count": 0,
+            }
+
+        return None
+
+    def predetermined_decision(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Возвращает решение, известное до оценки текущего ответа, либо None.
+
+        Оценка добавляет балл по текущей теме, поэтому после неё первыми
+        проверяются лимиты темы/уточнений/подсказок — их можно вычислить заранее.
+        """
+        return self._limit_decision(state)
+
+    @staticmethod
+    def question_action(action: str) -> Optional[tuple]:
+        """Для действий с генерацией вопроса возвращает (сложность, тип вопроса), иначе None."""
+        return QUESTION_ACTIONS.get(action)
+
+    async def agenerate_question(self, state: Dict[str, Any], action: str) -> Dict[str, Any]:
+        """Генерирует вопрос для действия с генерацией (см. `question_action`).
+
+        Промпт зависит только от темы, текущего вопроса и ответа кандидата,
+        поэтому вопрос можно готовить параллельно с оценкой ответа.
+        """
+        difficulty, _ = QUESTION_ACTIONS[action]
+        return await self._acreate_llm_question(state, difficulty)
+
+    @staticmethod
+    def question_state_snapshot(state: Dict[str, Any]) -> Dict[str, Any]:
+        """Независимая копия полей состояния для `agenerate_question`, не разделяющая объекты с `state`."""
+        return {field: copy.deepcopy(state[field]) for field in QUESTION_STATE_FIELDS if field in state}
+
+    def question_result(self, action: str, question: Dict[str, Any]) -> Dict[str, Any]:
+        """Формирует результат контроллера для уже сгенерированного вопроса действия `action`."""
+        _, question_type = QUESTION_ACTIONS[action]
+        logger.debug(f"Сгенерирован вопрос ({question_type}): '{question['content'][:60]}...'")
+        return {
+            "controller_decision": "continue_topic",
+            "generated_question": question,
+            "question_type": question_type,
+        }
+
     def execute_decision(self, state: Dict[str, Any], decision: Dict[str, Any]) -> Dict[str, Any]:
         action = decision["action"]
         reason = decision["reason"]
@@ -183,50 +248,30 @@ class AdaptiveInterviewControllerAgent:
         else:
             return self._continue_standard_flow(state)
 
-    def _get_topic_scores(self, state: Dict[str, Any]) -> List[float]:
-        current_topic = state.get("current_topic")
-        evaluations = state.get("answer_evaluations", [])
-
-        scores = []
-        for eval_item in evaluations:
-            if eval_item.get("topic") == current_topic:
-                scores.append(eval_item.get("score_percent", 0))
+    async def aexecute_decision(self, state: Dict[str, Any], decision: Dict[str, Any]) -> Dict[str, Any]:
+        """Асинхронная версия `execute_decision`."""
+        action = decision["action"]
+        reason = decision["reason"]
 
-        return scores
+        logger.debug(f"Решение контроллера: {action} - {reason}")
 
-    def _count_poor_streak(self, scores: List[float]) -> int:
-        streak = 0
-        for score in reversed(scores):
-            if score < 40:
-                streak += 1
-            else:
-                break
-        logger.debug(
-            f"Подсчет плохих ответов: {scores[-5:] if len(scores) >= 5 else scores} -> streak: {streak}"
-        )
-        return streak
+        if action == "skip_topic":
+            return self._skip_topic(state)
+        elif action == "provide_hint":
+            question = await self._agenerate_guided_reformulated_question(state, self._last_weaknesses(state))
+            return self._hint_result(question)
+        elif action in QUESTION_ACTIONS:
+            difficulty, _ = QUESTION_ACTIONS[action]
+            question = await self._acreate_llm_question(state, difficulty)
+            return self.question_result(action, question)
+        else:
+            return self._continue_standard_flow(state)
 
-    def _count_good_streak(self, scores: List[float]) -> int:
-        streak = 0
-        for score in reversed(scores):
-            if score >= 80:
-                streak += 1
-            else:
-                break
-        return streak
-
-    def _count_medium_streak(self, scores: List[float]) -> int:
-        streak = 0
-        for score in reversed(scores):
-            if 40 <= score < 80:
-                streak += 1
-            else:
-                break
-        return streak
+    def _get_topic_stats(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return get_topic_stats(state, state.get("current_topic"))
 
     def _get_last_evaluation(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        evaluations = state.get("answer_evaluations", [])
-        return evaluations[-1] if evaluations else None
+        return last_evaluation(state)
 
     def _is_unknown_response(self, evaluation: Dict[str, Any]) -> bool:
         analysis = evaluation.get("analysis", {}) or {}
@@ -320,14 +365,11 @@ class AdaptiveInterviewControllerAgent:
             "question_type": "same_level",
         }
 
-    def _provide_hint_and_question(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _last_weaknesses(self, state: Dict[str, Any]) -> List[str]:
         last_evaluation = self._get_last_evaluation(state)
-        weaknesses = (
-            last_evaluation.get("analysis", {}).get("weaknesses", []) if last_evaluation else []
-        )
-
-        question = self._generate_guided_reformulated_question(state, weaknesses)
+        return last_evaluation.get("analysis", {}).get("weaknesses", []) if last_evaluation else []
 
+    def _hint_result(self, question: Dict[str, Any]) -> Dict[str, Any]:
         logger.debug(
             f"Переформулированный вопрос с ненавязчивой подсказкой: '{question['content'][:100]}...'"
         )
@@ -338,10 +380,14 @@ class AdaptiveInterviewControllerAgent:
             "question_type": "hint",
         }
 
+    def _provide_hint_and_question(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        question = self._generate_guided_reformulated_question(state, self._last_weaknesses(state))
+        return self._hint_result(question)
+
     def _continue_standard_flow(self, state: Dict[str, Any]) -> Dict[str, Any]:
         return {"controller_decision": "continue_standard"}
 
-    def _create_llm_question(self, state: Dict[str, Any], difficulty: str) -> Dict[str, Any]:
+    def _llm_question_messages(self, state: Dict[str, Any], difficulty: str) -> List[Any]:
         topic = state.get("current_topic", "Programming")
         last_answer = state.get("last_candidate_answer", "")
         current_question = state.get("current_question", {}).get("content", "")
@@ -356,22 +402,26 @@ class AdaptiveInterviewControllerAgent:
         ]
         question_type = question_types[questions_asked % len(question_types)]
 
-        prompt = llm_question_prompt()
-
-        chain = prompt | self.llm
-        response = chain.invoke(
+        return render_prompt(
+            llm_question_prompt(),
             {
                 "alignment": self.alignment,
+                "role": state.get("role", "") or "не указана",
                 "difficulty": difficulty,
                 "question_type": question_type,
                 "topic": topic,
                 "current_question": current_question,
                 "last_answer": last_answer[:200],
                 "question_number": questions_asked,
-            }
+            },
         )
 
-        question_text = response.content.strip()
+    def _parse_llm_question(self, state: Dict[str, Any], difficulty: str, response: Any) -> Dict[str, Any]:
+        current_question = state.get("current_question", {}).get("content", "")
+        questions_asked = state.get("questions_asked_count", 0)
+
+        question_text, optimal_time = parse_question_payload(response_text(response))
+        question_text = question_text.strip()
         question_text = question_text.replace("\n", " ").strip()
         if (question_text.startswith('"') and question_text.endswith('"')) or (
             question_text.startswith("'") and question_text.endswith("'")
@@ -394,17 +444,26 @@ class AdaptiveInterviewControllerAgent:
                 "Опишите ситуацию, когда возникла сложность: что сделали, к какому выводу пришли?",
             ]
             question_text = fallback_questions[questions_asked % len(fallback_questions)]
+            optimal_time = None
+            record_fallback("question", "invalid_response")
 
         return {
             "id": f"llm_{difficulty}_{state.get('questions_asked_count', 0)}",
             "content": question_text,
             "source": "LLM",
             "difficulty": difficulty,
+            "optimal_time": optimal_time or heuristic_optimal_time(question_text),
         }
 
-    def _generate_guided_reformulated_question(
-        self, state: Dict[str, Any], weaknesses: List[str]
-    ) -> Dict[str, Any]:
+    def _create_llm_question(self, state: Dict[str, Any], difficulty: str) -> Dict[str, Any]:
+        response = invoke_llm(self.llm, self._llm_question_messages(state, difficulty), agent="question")
+        return self._parse_llm_question(state, difficulty, response)
+
+    async def _acreate_llm_question(self, state: Dict[str, Any], difficulty: str) -> Dict[str, Any]:
+        response = await ainvoke_llm(self.llm, self._llm_question_messages(state, difficulty), agent="question")
+        return self._parse_llm_question(state, difficulty, response)
+
+    def _hint_messages(self, state: Dict[str, Any], weaknesses: List[str]) -> List[Any]:
         topic = state.get("current_topic", "Programming")
         last_answer = state.get("last_candidate_answer", "")
         prev_question = state.get("current_question", {}).get("content", "")
@@ -416,21 +475,22 @@ class AdaptiveInterviewControllerAgent:
             else "ключевой аспект, который вы не раскрыли достаточно конкретно"
         )
 
-        prompt = get_hint_promt()
-
-        chain = prompt | self.llm
-        response = chain.invoke(
+        return render_prompt(
+            get_hint_promt(),
             {
                 "alignment": self.alignment,
+                "role": state.get("role", "") or "не указана",
                 "topic": topic,
                 "prev_question": prev_question,
                 "last_answer": last_answer[:300],
                 "improvement_hint": improvement_hint,
                 "question_number": questions_asked,
-            }
+            },
         )
 
-        question_text = (getattr(response, "content", None) or str(response)).strip()
+    def _parse_hint_question(self, state: Dict[str, Any], weaknesses: List[str], response: Any) -> Dict[str, Any]:
+        question_text, optimal_time = parse_question_payload(response_text(response) or str(response))
+        question_text = question_text.strip()
 
         if len(question_text) > 500:
             question_text = question_text.split("\n")[0].strip()
@@ -443,10 +503,25 @@ class AdaptiveInterviewControllerAgent:
             question_text = (
                 f"Уточните, пожалуйста, {base}: как именно вы это делаете на практике?"
             )
+            optimal_time = None
+            record_fallback("hint", "invalid_response")
 
         return {
             "id": f"llm_guided_{state.get('questions_asked_count', 0)}",
             "content": question_text,
             "source": "LLM",
             "difficulty": "guided",
+            "optimal_time": optimal_time or heuristic_optimal_time(question_text),
         }
+
+    def _generate_guided_reformulated_question(
+        self, state: Dict[str, Any], weaknesses: List[str]
+    ) -> Dict[str, Any]:
+        response = invoke_llm(self.llm, self._hint_messages(state, weaknesses), agent="hint")
+        return self._parse_hint_question(state, weaknesses, response)
+
+    async def _agenerate_guided_reformulated_question(
+        self, state: Dict[str, Any], weaknesses: List[str]
+    ) -> Dict[str, Any]:
+        response = await ainvoke_llm(self.llm, self._hint_messages(state, weaknesses), agent="hint")
+        return self._parse_hint_question(state, weaknesses, response)
@@ -24,12 +24,18 @@ def conversation_turn(state: Dict[str, Any], *, input_provider=default_input_pro
         question_id = generated_question.get(
             "id", f"generated_{state.get('questions_asked_count', 0)}"
         )
+        optimal_time = generated_question.get("optimal_time")
         logger.debug("Используем сгенерированный контроллером вопрос")
     else:
         question_content = current_question.get("content", "Вопрос не найден")
         question_id = current_question.get("id", "current_question")
+        optimal_time = current_question.get("optimal_time")
         logger.debug("Используем вопрос из селектора")
 
+    next_question = {"id": question_id, "content": question_content}
+    if optimal_time is not None:
+        next_question["optimal_time"] = optimal_time
+
     logger.info(f"Вопрос: {question_content}")
 
     asked_ids = state.get("asked_question_ids", set())
@@ -51,7 +57,7 @@ def conversation_turn(state: Dict[str, Any], *, input_provider=default_input_pro
         new_questions = state.get("questions_asked_count", 0) + 1
         new_topic_questions = state.get("questions_in_current_topic", 0) + 1
         return {
-            "current_question": {"id": question_id, "content": question_content},
+            "current_question": next_question,
             "messages": [AIMessage(content=question_content), HumanMessage(content=answer)],
             "last_candidate_answer": answer,
             "questions_asked_count": new_questions,
@@ -69,7 +75,7 @@ def conversation_turn(state: Dict[str, Any], *, input_provider=default_input_pro
         new_questions = state.get("questions_asked_count", 0) + 1
         new_topic_questions = state.get("questions_in_current_topic", 0) + 1
         return {
-            "current_question": {"id": question_id, "content": question_content},
+            "current_question": next_question,
             "messages": [AIMessage(content=question_content), HumanMessage(content=answer)],
             "last_candidate_answer": answer,
             "questions_asked_count": new_questions,
@@ -89,7 +95,7 @@ def conversation_turn(state: Dict[str, Any], *, input_provider=default_input_pro
             f"  📊 Обычный вопрос - увеличиваем questions_asked_count -> {new_questions} и questions_in_current_topic -> {new_topic_questions}"
         )
         return {
-            "current_question": {"id": question_id, "content": question_content},
+            "current_question": next_question,
             "messages": [AIMessage(content=question_content), HumanMessage(content=answer)],
             "last_candidate_answer": answer,
             "questions_asked_count": new_questions,
@@ -1,36 +1,66 @@
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
+from ..src.llm import ainvoke_llm, invoke_llm, render_prompt, response_text
+from ..src.metrics import record_fallback
 from ..src.prompts import evaluator_prompt
 from ..src.utils import parse_llm_json, safe_truncate
+from ..turn_log import record_evaluation
 
 logger = logging.getLogger(__name__)
 
 
+def _evaluator_messages(state: Dict[str, Any], alignment: str) -> List[Any]:
+    current_question = state.get("current_question", {})
+    return render_prompt(
+        evaluator_prompt(),
+        {
+            "alignment": alignment,
+            "role": state.get("role", ""),
+            "topic": state.get("current_topic", ""),
+            "question": current_question.get("content", ""),
+            "answer": state.get("last_candidate_answer", ""),
+        },
+    )
+
+
 def evaluate_answer(state: Dict[str, Any], *, llm: Any, alignment: str) -> Dict[str, Any]:
-    """Оценщик ответов: возвращает {"answer_evaluations": [...]} (добавляет новую оценку)."""
+    """Оценщик ответов: добавляет оценку в журнал ходов (см. `turn_log.record_evaluation`)."""
     logger.debug("--- Агент: Оценщик ответов ---")
 
-    current_question = state.get("current_question", {})
-    question = current_question.get("content", "")
+    question = state.get("current_question", {}).get("content", "")
     answer = state.get("last_candidate_answer", "")
 
-    prompt = evaluator_prompt()
     try:
-        chain = prompt | llm
-        response_content = chain.invoke(
-            {
-                "alignment": alignment,
-                "role": state.get("role", ""),
-                "topic": state.get("current_topic", ""),
-                "question": question,
-                "answer": answer,
-            }
-        ).content
+        response_content = response_text(
+            invoke_llm(llm, _evaluator_messages(state, alignment), agent="evaluator")
+        )
     except Exception as e:
         logger.exception(f"Ошибка LLM в оценщике: {e}")
-        return _fallback_evaluation(state, question, answer)
+        return _fallback_evaluation(state, question, answer, "llm_error")
+
+    return _build_evaluation(state, question, answer, response_content)
+
+
+async def aevaluate_answer(state: Dict[str, Any], *, llm: Any, alignment: str) -> Dict[str, Any]:
+    """Асинхронная версия `evaluate_answer`."""
+    logger.debug("--- Агент: Оценщик ответов (async) ---")
+
+    question = state.get("current_question", {}).get("content", "")
+    answer = state.get("last_candidate_answer", "")
+
+    try:
+        response_content = response_text(
+            await ainvoke_llm(llm, _evaluator_messages(state, alignment), agent="evaluator")
+        )
+    except Exception as e:
+        logger.exception(f"Ошибка LLM в оценщике: {e}")
+        return _fallback_evaluation(state, question, answer, "llm_error")
+
+    return _build_evaluation(state, question, answer, response_content)
+
 
+def _build_evaluation(state: Dict[str, Any], question: str, answer: str, response_content: str) -> Dict[str, Any]:
     logger.debug(f"Сырой ответ LLM (первые 100 симв.): {safe_truncate(response_content, 100)}...")
 
     try:
@@ -43,7 +73,7 @@ def evaluate_answer(state: Dict[str, Any], *, llm: Any, alignment: str) -> Dict[
         examples_score = int(max(0, min(10, scores.get("examples_and_use_cases", 5))))
     except Exception as e:
         logger.exception(f"Ошибка парсинга JSON из ответа LLM: {e}")
-        return _fallback_evaluation(state, question, answer)
+        return _fallback_evaluation(state, question, answer, "parse_error")
 
     weights = {
         "technical_accuracy": 0.25,
@@ -89,11 +119,11 @@ def evaluate_answer(state: Dict[str, Any], *, llm: Any, alignment: str) -> Dict[
         f"  - 📈 Итоговая оценка темы '{evaluation['topic']}': {final_score_percent:.1f}%"
     )
 
-    evaluations = state.get("answer_evaluations", []) + [evaluation]
-    return {"answer_evaluations": evaluations}
+    return record_evaluation(state, evaluation)
 
 
-def _fallback_evaluation(state: Dict[str, Any], question: str, answer: str) -> Dict[str, Any]:
+def _fallback_evaluation(state: Dict[str, Any], question: str, answer: str, reason: str) -> Dict[str, Any]:
+    record_fallback("evaluator", reason)
     tech_score = 3
     depth_score = 3
     practical_score = 2
@@ -145,5 +175,4 @@ def _fallback_evaluation(state: Dict[str, Any], question: str, answer: str) -> D
         f"Fallback оценка темы '{evaluation['topic']}': {final_score_percent:.1f}%"
     )
 
-    evaluations = state.get("answer_evaluations", []) + [evaluation]
-    return {"answer_evaluations": evaluations}
+    return record_evaluation(state, evaluation)
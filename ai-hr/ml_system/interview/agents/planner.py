@@ -1,66 +1,60 @@
+import copy
+import hashlib
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from ..src.prompts import planner_prompt
+from ..src.llm import ainvoke_llm, invoke_llm, render_prompt, response_text
+from ..src.metrics import record_fallback
+from ..src.prompts import planner_prompt, vacancy_plan_prompt
+from ..src.timing import clamp_optimal_time, heuristic_optimal_time
 
-from ..src.utils import strip_md_fences
+from ..src.utils import parse_llm_json, strip_md_fences
 
 logger = logging.getLogger(__name__)
 
 
-def plan_interview(
-    state: Dict[str, Any],
-    *,
-    llm: Any,
-    alignment: str,
-    max_total_questions: int,
-    max_questions_per_topic: int,
-) -> Dict[str, Any]:
-    """Планировщик интервью: формирует interview_plan.
-    Возвращает словарь {"interview_plan": plan}.
-    """
-    logger.debug("--- Агент: Планировщик ---")
-
+def _planner_messages(state: Dict[str, Any], alignment: str) -> List[Any]:
     resume = state.get("resume", "")
     job_desc = state.get("job_description", "")
     role = state.get("role", "")
+    return render_prompt(
+        planner_prompt(),
+        {
+            "alignment": alignment,
+            "role": role[:100],
+            "resume": resume[:400],
+            "job_description": job_desc[:400],
+        },
+    )
 
-    planning_prompt = planner_prompt()
 
-    try:
-        planning_chain = planning_prompt | llm
-        response = planning_chain.invoke(
-            {
-                "alignment": alignment,
-                "role": role[:100],
-                "resume": resume[:400],
-                "job_description": job_desc[:400],
-            }
-        )
-    except Exception as e:
-        logger.exception(f"Ошибка LLM в планировщике: {e}")
-        logger.warning("Используем нейтральный резервный план")
-        fallback_plan = {
-            "topics": [
-                {"name": "Resume Discussion", "description": "Обсуждение опыта и проектов из резюме", "max_questions": 1},
-                {"name": "Problem Solving", "description": "Подходы к решению задач и анализу требований", "max_questions": 1},
-                {"name": "Tools and Practices", "description": "Инструменты, процессы и практики качества", "max_questions": 1},
-                {"name": "Data Handling", "description": "Работа с данными, форматами и проверками", "max_questions": 1},
-                {"name": "Collaboration", "description": "Взаимодействие, коммуникация, договоренности", "max_questions": 1},
-                {"name": "Reliability & Testing", "description": "Надежность, тестирование и контроль изменений", "max_questions": 1},
-                {"name": "Delivery", "description": "Планирование, сроки, итерации и выпуск", "max_questions": 1},
-                {"name": "Learning & Growth", "description": "Самообучение, обратная связь и развитие", "max_questions": 1},
-            ],
-            "max_total_questions": max_total_questions,
-            "interview_style": "conversational",
-        }
-        return {"interview_plan": fallback_plan}
+def _neutral_plan(max_total_questions: int, questions_per_topic: int) -> Dict[str, Any]:
+    return {
+        "topics": [
+            {"name": "Resume Discussion", "description": "Обсуждение опыта и проектов из резюме", "max_questions": questions_per_topic},
+            {"name": "Problem Solving", "description": "Подходы к решению задач и анализу требований", "max_questions": questions_per_topic},
+            {"name": "Tools and Practices", "description": "Инструменты, процессы и практики качества", "max_questions": questions_per_topic},
+            {"name": "Data Handling", "description": "Работа с данными, форматами и проверками", "max_questions": questions_per_topic},
+            {"name": "Collaboration", "description": "Взаимодействие, коммуникация, договоренности", "max_questions": questions_per_topic},
+            {"name": "Reliability & Testing", "description": "Надежность, тестирование и контроль изменений", "max_questions": questions_per_topic},
+            {"name": "Delivery", "description": "Планирование, сроки, итерации и выпуск", "max_questions": questions_per_topic},
+            {"name": "Learning & Growth", "description": "Самообучение, обратная связь и развитие", "max_questions": questions_per_topic},
+        ],
+        "max_total_questions": max_total_questions,
+        "interview_style": "conversational",
+    }
+
+
+def _llm_error_plan(error: Exception, max_total_questions: int) -> Dict[str, Any]:
+    logger.exception(f"Ошибка LLM в планировщике: {error}")
+    logger.warning("Используем нейтральный резервный план")
+    record_fallback("planner", "llm_error")
+    return {"interview_plan": _neutral_plan(max_total_questions, 1)}
 
-    content = response.content
-    if isinstance(content, list):
-        content = "".join(str(item) for item in content)
-    content = strip_md_fences(content)
+
+def _parse_plan(response: Any, *, max_total_questions: int, max_questions_per_topic: int) -> Dict[str, Any]:
+    content = strip_md_fences(response_text(response))
 
     try:
         if "{" in content:
@@ -81,19 +75,160 @@ def plan_interview(
 
     except Exception as e:
         logger.exception(f"Ошибка создания плана: {e}")
-        fallback_plan = {
-            "topics": [
-                {"name": "Resume Discussion", "description": "Обсуждение опыта и проектов из резюме", "max_questions": max_questions_per_topic},
-                {"name": "Problem Solving", "description": "Подходы к решению задач и анализу требований", "max_questions": max_questions_per_topic},
-                {"name": "Tools and Practices", "description": "Инструменты, процессы и практики качества", "max_questions": max_questions_per_topic},
-                {"name": "Data Handling", "description": "Работа с данными, форматами и проверками", "max_questions": max_questions_per_topic},
-                {"name": "Collaboration", "description": "Взаимодействие, коммуникация, договоренности", "max_questions": max_questions_per_topic},
-                {"name": "Reliability & Testing", "description": "Надежность, тестирование и контроль изменений", "max_questions": max_questions_per_topic},
-                {"name": "Delivery", "description": "Планирование, сроки, итерации и выпуск", "max_questions": max_questions_per_topic},
-                {"name": "Learning & Growth", "description": "Самообучение, обратная связь и развитие", "max_questions": max_questions_per_topic},
-            ],
+        logger.warning("Используется нейтральный план по умолчанию: 8 тем")
+        record_fallback("planner", "parse_error")
+        return {"interview_plan": _neutral_plan(max_total_questions, max_questions_per_topic)}
+
+
+def template_version(role: str, job_description: str) -> str:
+    """Версия шаблона плана: хэш входных данных вакансии, от которых он построен."""
+    raw = json.dumps([role or "", job_description or ""], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _vacancy_plan_messages(role: str, job_description: str, alignment: str) -> List[Any]:
+    return render_prompt(
+        vacancy_plan_prompt(),
+        {
+            "alignment": alignment,
+            "role": (role or "")[:100],
+            "job_description": (job_description or "")[:1500],
+        },
+    )
+
+
+def _parse_vacancy_template(response: Any, *, role: str, job_description: str) -> Dict[str, Any]:
+    data = parse_llm_json(response_text(response))
+    topics = [
+        {"name": str(topic["name"]), "description": str(topic.get("description", ""))}
+        for topic in data.get("topics") or []
+        if isinstance(topic, dict) and topic.get("name")
+    ]
+    if not topics:
+        raise ValueError("Шаблон плана не содержит тем")
+
+    template: Dict[str, Any] = {
+        "version": template_version(role, job_description),
+        "topics": topics,
+        "interview_style": data.get("interview_style", "conversational"),
+    }
+    opening = data.get("opening_question")
+    if isinstance(opening, dict) and isinstance(opening.get("question"), str) and opening["question"].strip():
+        question = opening["question"].strip()
+        template["opening_question"] = {
+            "content": question,
+            "optimal_time": clamp_optimal_time(opening.get("optimal_time")) or heuristic_optimal_time(question),
+        }
+    logger.info(f"Шаблон плана вакансии создан: {len(topics)} тем")
+    return template
+
+
+def build_vacancy_plan_template(role: str, job_description: str, *, llm: Any, alignment: str) -> Dict[str, Any]:
+    """Строит шаблон плана интервью для вакансии (без резюме кандидата).
+
+    Шаблон хранится на документе вакансии; при старте интервью план берётся
+    из него через `plan_from_template` без обращения к LLM.
+
+    Raises:
+        ValueError: Ответ модели не удалось разобрать.
+    """
+    response = invoke_llm(llm, _vacancy_plan_messages(role, job_description, alignment), agent="vacancy_planner")
+    return _parse_vacancy_template(response, role=role, job_description=job_description)
+
+
+async def abuild_vacancy_plan_template(role: str, job_description: str, *, llm: Any, alignment: str) -> Dict[str, Any]:
+    """Асинхронная версия `build_vacancy_plan_template`."""
+    response = await ainvoke_llm(llm, _vacancy_plan_messages(role, job_description, alignment), agent="vacancy_planner")
+    return _parse_vacancy_template(response, role=role, job_description=job_description)
+
+
+def plan_from_template(
+    template: Dict[str, Any], *, max_total_questions: int, max_questions_per_topic: int
+) -> Dict[str, Any]:
+    """Персонализирует шаблон вакансии под интервью без вызова LLM.
+
+    Гарантирует, что план начинается с Resume Discussion, и применяет лимиты
+    вопросов из конфигурации. Из шаблона берутся только темы: вопросы
+    Resume Discussion, включая первый, селектор строит по резюме кандидата.
+    """
+    topics = copy.deepcopy(template.get("topics") or [])
+    resume_topics = [topic for topic in topics if topic.get("name") == "Resume Discussion"]
+    if resume_topics:
+        topics = resume_topics[:1] + [topic for topic in topics if topic.get("name") != "Resume Discussion"]
+    else:
+        topics.insert(0, {"name": "Resume Discussion", "description": "Обсуждение опыта и проектов из резюме"})
+    for topic in topics:
+        topic["max_questions"] = max_questions_per_topic
+
+    logger.info(f"План взят из шаблона вакансии: {len(topics)} тем")
+    return {
+        "interview_plan": {
+            "topics": topics,
             "max_total_questions": max_total_questions,
-            "interview_style": "conversational",
+            "interview_style": template.get("interview_style", "conversational"),
+            "source": "vacancy_template",
         }
-        logger.warning("Используется нейтральный план по умолчанию: 8 тем")
-        return {"interview_plan": fallback_plan}
+    }
+
+
+def plan_interview(
+    state: Dict[str, Any],
+    *,
+    llm: Any,
+    alignment: str,
+    max_total_questions: int,
+    max_questions_per_topic: int,
+) -> Dict[str, Any]:
+    """Планировщик интервью: формирует interview_plan.
+    Возвращает словарь {"interview_plan": plan}.
+    Если в состоянии есть шаблон плана вакансии (`plan_template`), LLM не вызывается.
+    """
+    logger.debug("--- Агент: Планировщик ---")
+
+    if state.get("plan_template"):
+        return plan_from_template(
+            state["plan_template"],
+            max_total_questions=max_total_questions,
+            max_questions_per_topic=max_questions_per_topic,
+        )
+
+    try:
+        response = invoke_llm(llm, _planner_messages(state, alignment), agent="planner")
+    except Exception as e:
+        return _llm_error_plan(e, max_total_questions)
+
+    return _parse_plan(
+        response,
+        max_total_questions=max_total_questions,
+        max_questions_per_topic=max_questions_per_topic,
+    )
+
+
+async def aplan_interview(
+    state: Dict[str, Any],
+    *,
+    llm: Any,
+    alignment: str,
+    max_total_questions: int,
+    max_questions_per_topic: int,
+) -> Dict[str, Any]:
+    """Асинхронная версия `plan_interview`."""
+    logger.debug("--- Агент: Планировщик (async) ---")
+
+    if state.get("plan_template"):
+        return plan_from_template(
+            state["plan_template"],
+            max_total_questions=max_total_questions,
+            max_questions_per_topic=max_questions_per_topic,
+        )
+
+    try:
+        response = await ainvoke_llm(llm, _planner_messages(state, alignment), agent="planner")
+    except Exception as e:
+        return _llm_error_plan(e, max_total_questions)
+
+    return _parse_plan(
+        response,
+        max_total_questions=max_total_questions,
+        max_questions_per_topic=max_questions_per_topic,
+    )
@@ -1,8 +1,11 @@
+import asyncio
 import logging
-import random
-from typing import Any, Dict, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from ..src.llm import ainvoke_llm, invoke_llm, render_prompt, response_text
+from ..src.metrics import record_fallback
 from ..src.prompts import resume_question_prompt
+from ..src.timing import cached_optimal_time, heuristic_optimal_time, parse_question_payload
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +41,120 @@ def get_fallback_question(
     }
 
 
+def _resume_limit_reached(state: Dict[str, Any], max_questions_per_topic: int, current_index: int) -> Optional[Dict[str, Any]]:
+    if state.get("questions_in_current_topic", 0) >= max_questions_per_topic:
+        return {
+            "skip_topic": True,
+            "current_topic_index": current_index + 1,
+            "questions_in_current_topic": 0,
+            "deepening_questions_count": 0,
+            "hints_given_count": 0,
+        }
+    return None
+
+
+def _opening_question_result(
+    state: Dict[str, Any], *, topic: str, asked_questions: Set[str]
+) -> Optional[Dict[str, Any]]:
+    """Запасной первый вопрос по резюме из шаблона плана вакансии.
+
+    Шаблон общий для всех кандидатов, поэтому вопрос используется, только
+    если LLM не смогла построить вопрос по резюме кандидата.
+    """
+    opening = (state.get("plan_template") or {}).get("opening_question")
+    if not opening or state.get("questions_in_current_topic", 0) != 0 or "resume_opening" in asked_questions:
+        return None
+    asked_questions.add("resume_opening")
+    return {
+        "current_topic": topic,
+        "current_question": {
+            "id": "resume_opening",
+            "content": opening["content"],
+            "optimal_time": opening.get("optimal_time") or heuristic_optimal_time(opening["content"]),
+        },
+        "asked_question_ids": asked_questions,
+        "questions_in_current_topic": 0,
+    }
+
+
+def _resume_question_messages(state: Dict[str, Any], alignment: str) -> List[Any]:
+    return render_prompt(
+        resume_question_prompt(),
+        {
+            "alignment": alignment,
+            "role": state.get("role", "").strip(),
+            "resume": state.get("resume", "")[:600],
+            "job_description": state.get("job_description", "")[:600],
+            "q_index": state.get("questions_in_current_topic", 0) + 1,
+        },
+    )
+
+
+def _resume_question_result(
+    state: Dict[str, Any], response: Any, *, topic: str, asked_questions: Set[str]
+) -> Dict[str, Any]:
+    questions_in_topic = state.get("questions_in_current_topic", 0)
+    question_content, optimal_time = parse_question_payload(response_text(response))
+    question_content = question_content.strip()
+    if not question_content:
+        raise ValueError("LLM вернул пустой вопрос")
+
+    base_id = f"resume_q_{questions_in_topic}"
+    question_id = base_id
+    suffix = 1
+    while question_id in asked_questions:
+        question_id = f"{base_id}_{suffix}"
+        suffix += 1
+
+    asked_questions.add(question_id)
+    logger.info(f"Вопрос по резюме (LLM): '{question_content[:80]}...'")
+    return {
+        "current_topic": topic,
+        "current_question": {
+            "id": question_id,
+            "content": question_content,
+            "optimal_time": optimal_time or heuristic_optimal_time(question_content),
+        },
+        "asked_question_ids": asked_questions,
+        "questions_in_current_topic": questions_in_topic,
+    }
+
+
+def _resume_question_fallback(
+    state: Dict[str, Any], error: Exception, *, topic: str, asked_questions: Set[str]
+) -> Dict[str, Any]:
+    logger.exception(f"Ошибка генерации резюме-вопроса LLM: {error}")
+    record_fallback("resume_question", "llm_error")
+    opening_result = _opening_question_result(state, topic=topic, asked_questions=asked_questions)
+    if opening_result is not None:
+        return opening_result
+    role = state.get("role", "").strip()
+    questions_in_topic = state.get("questions_in_current_topic", 0)
+    if role.lower() in [
+        "ux/ui designer",
+        "ux designer",
+        "ui/ux designer",
+        "дизайнер",
+        "ux",
+        "ui",
+    ]:
+        question_content = (
+            "Кратко опишите один проект из портфолио: цель, процесс, ваша роль и результат."
+        )
+    else:
+        question_content = (
+            "Расскажите о самом важном проекте из резюме и вашей роли в нём."
+        )
+    question_id = f"resume_q_{questions_in_topic}"
+    asked_questions.add(question_id)
+    return {
+        "current_topic": topic,
+        "current_question": {"id": question_id, "content": question_content},
+        "asked_question_ids": asked_questions,
+        "questions_in_current_topic": questions_in_topic,
+    }
+
+
 def get_resume_question(
     state: Dict[str, Any],
     *,
@@ -48,95 +165,115 @@ def get_resume_question(
     current_index: int,
     asked_questions: Set[str],
 ) -> Dict[str, Any]:
-    resume = state.get("resume", "")
-    job_description = state.get("job_description", "")
-    role = state.get("role", "").strip()
-    questions_in_topic = state.get("questions_in_current_topic", 0)
+    limit_result = _resume_limit_reached(state, max_questions_per_topic, current_index)
+    if limit_result is not None:
+        return limit_result
 
-    if questions_in_topic >= max_questions_per_topic:
-        return {
-            "skip_topic": True,
-            "current_topic_index": current_index + 1,
-            "questions_in_current_topic": 0,
-            "deepening_questions_count": 0,
-            "hints_given_count": 0,
-        }
-
-    prompt = resume_question_prompt()
-    chain = prompt | llm
     try:
-        resp = chain.invoke(
-            {
-                "alignment": alignment,
-                "role": role if role else "",
-                "resume": resume[:600],
-                "job_description": job_description[:600],
-                "q_index": questions_in_topic + 1,
-            }
-        )
-        question_content = (resp.content or "").strip()
-        if not question_content:
-            raise ValueError("LLM вернул пустой вопрос")
-
-        base_id = f"resume_q_{questions_in_topic}"
-        question_id = base_id
-        suffix = 1
-        while question_id in asked_questions:
-            question_id = f"{base_id}_{suffix}"
-            suffix += 1
-
-        asked_questions.add(question_id)
-        logger.info(f"Вопрос по резюме (LLM): '{question_content[:80]}...'")
-        return {
-            "current_topic": topic,
-            "current_question": {"id": question_id, "content": question_content},
-            "asked_question_ids": asked_questions,
-            "questions_in_current_topic": questions_in_topic,
-        }
+        response = invoke_llm(llm, _resume_question_messages(state, alignment), agent="resume_question")
+        return _resume_question_result(state, response, topic=topic, asked_questions=asked_questions)
     except Exception as e:
-        logger.exception(f"Ошибка генерации резюме-вопроса LLM: {e}")
-        if role.lower() in [
-            "ux/ui designer",
-            "ux designer",
-            "ui/ux designer",
-            "дизайнер",
-            "ux",
-            "ui",
-        ]:
-            question_content = (
-                "Кратко опишите один проект из портфолио: цель, процесс, ваша роль и результат."
-            )
-        else:
-            question_content = (
-                "Расскажите о самом важном проекте из резюме и вашей роли в нём."
-            )
-        question_id = f"resume_q_{questions_in_topic}"
-        asked_questions.add(question_id)
-        return {
-            "current_topic": topic,
-            "current_question": {"id": question_id, "content": question_content},
-            "asked_question_ids": asked_questions,
-            "questions_in_current_topic": questions_in_topic,
-        }
+        return _resume_question_fallback(state, e, topic=topic, asked_questions=asked_questions)
 
 
-def select_next_question(
-    state: Dict[str, Any], *, assistant: Any, llm: Any, alignment: str, max_questions_per_topic: int
+async def aget_resume_question(
+    state: Dict[str, Any],
+    *,
+    llm: Any,
+    alignment: str,
+    max_questions_per_topic: int,
+    topic: str,
+    current_index: int,
+    asked_questions: Set[str],
 ) -> Dict[str, Any]:
+    """Асинхронная версия `get_resume_question`."""
+    limit_result = _resume_limit_reached(state, max_questions_per_topic, current_index)
+    if limit_result is not None:
+        return limit_result
+
+    try:
+        response = await ainvoke_llm(llm, _resume_question_messages(state, alignment), agent="resume_question")
+        return _resume_question_result(state, response, topic=topic, asked_questions=asked_questions)
+    except Exception as e:
+        return _resume_question_fallback(state, e, topic=topic, asked_questions=asked_questions)
+
+
+def to_shortlist(questions: List[Any]) -> List[Dict[str, Any]]:
+    """Приводит результаты RAG-поиска к компактному ранжированному шорт-листу.
+
+    Элемент шорт-листа: {"id", "content", "section"}; порядок сохраняет ранжирование
+    поиска, слишком короткие и повторяющиеся вопросы отбрасываются.
+    """
+    shortlist: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+    for q in questions or []:
+        if isinstance(q, list) and q:
+            q = q[0]
+        if not isinstance(q, dict):
+            continue
+
+        metadata = q.get("metadata") or {}
+        question_content = metadata.get("question")
+        if not question_content and q.get("content"):
+            question_content = q["content"]
+            if "Вопрос:" in question_content:
+                question_content = question_content.split("Вопрос:")[1].split("\n")[0].strip()
+        if not question_content or len(question_content.strip()) <= 15 or question_content in seen:
+            continue
+
+        seen.add(question_content)
+        shortlist.append({
+            "id": question_content,
+            "content": question_content,
+            "section": metadata.get("section"),
+        })
+    return shortlist
+
+
+def build_topic_shortlists(
+    topics: List[Dict[str, Any]], *, assistant: Any, count: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Формирует шорт-листы вопросов для всех тем плана одним пакетным поиском.
+
+    Тема "Resume Discussion" пропускается: вопросы по резюме генерирует LLM.
+    """
+    names = [t.get("name") for t in topics or [] if t.get("name") and t.get("name") != "Resume Discussion"]
+    if not names:
+        return {}
+    try:
+        found = assistant.get_questions_for_topics(names, count=count)
+    except Exception as e:
+        logger.warning(f"Не удалось построить шорт-листы вопросов ({e}), селектор будет искать по темам")
+        return {}
+    shortlists = {name: to_shortlist(found.get(name, [])) for name in names}
+    logger.info(f"Шорт-листы вопросов построены для {len(shortlists)} тем")
+    return shortlists
+
+
+def pop_shortlisted_question(shortlist: List[Dict[str, Any]], asked_questions: Set[str]) -> Optional[Dict[str, Any]]:
+    """Извлекает из шорт-листа первый ещё не заданный вопрос (заданные отбрасываются)."""
+    while shortlist:
+        candidate = shortlist.pop(0)
+        if candidate.get("id") not in asked_questions:
+            return candidate
+    return None
+
+
+def _selector_context(state: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """Проверяет лимиты плана; возвращает (готовый результат либо None, контекст текущей темы)."""
     interview_plan = state.get("interview_plan", {})
     topics = interview_plan.get("topics", [])
     current_topic_index = state.get("current_topic_index", 0)
-    asked_questions = state.get("asked_question_ids", set())
     max_total_questions = interview_plan.get("max_total_questions", 20)
     questions_asked = state.get("questions_asked_count", 0)
 
     if questions_asked >= max_total_questions:
         logger.info(f"Достигнут общий лимит вопросов: {max_total_questions}")
-        return {}
+        return {}, {}
 
     if current_topic_index >= len(topics):
         logger.info(f"Все темы завершены: {current_topic_index}/{len(topics)}")
-        return {}
+        return {}, {}
 
     next_topic = topics[current_topic_index]["name"]
     topic_max_questions = topics[current_topic_index].get("max_questions", 3)
@@ -153,80 +290,122 @@ def select_next_question(
             "current_topic_index": current_topic_index + 1,
             "questions_in_current_topic": 0,
             "deepening_questions_count": 0,
-        }
+        }, {}
+
+    return None, {
+        "topic": next_topic,
+        "current_index": current_topic_index,
+        "asked_questions": state.get("asked_question_ids", set()),
+        "questions_in_topic": questions_in_topic,
+    }
+
 
+def _select_rag_question(
+    state: Dict[str, Any], *, assistant: Any, shortlist_size: int, context: Dict[str, Any]
+) -> Dict[str, Any]:
+    next_topic = context["topic"]
+    asked_questions = context["asked_questions"]
+    questions_in_topic = context["questions_in_topic"]
     try:
-        if next_topic == "Resume Discussion":
-            return get_resume_question(
-                state,
-                llm=llm,
-                alignment=alignment,
-                max_questions_per_topic=max_questions_per_topic,
-                topic=next_topic,
-                current_index=current_topic_index,
-                asked_questions=asked_questions,
+        shortlists = state.get("topic_shortlists")
+        if shortlists is None:
+            shortlists = {}
+        shortlist = shortlists.get(next_topic) or []
+
+        candidate = pop_shortlisted_question(shortlist, asked_questions)
+        if candidate is None:
+            logger.debug(f"Шорт-лист темы '{next_topic}' исчерпан, повторный поиск")
+            found = to_shortlist(
+                assistant.get_questions_for_topic(topic=next_topic, count=shortlist_size + len(asked_questions))
             )
-
-        questions = assistant.get_questions_for_topic(topic=next_topic, count=5)
-        logger.debug(f"Найдено {len(questions)} потенциальных вопросов")
-
-        filtered_questions = []
-        for q in questions:
-            if isinstance(q, list) and q:
-                q = q[0]
-
-            if isinstance(q, dict):
-                question_id = None
-                question_content = None
-
-                if "metadata" in q and q["metadata"]:
-                    question_id = q["metadata"].get("question")
-                    question_content = q["metadata"].get("question")
-                elif "content" in q:
-                    question_content = q["content"]
-                    question_id = question_content[:50]
-
-                if question_id and question_id not in asked_questions:
-                    filtered_questions.append(q)
-
-        if not filtered_questions:
-            logger.warning("Все вопросы уже заданы, разрешаем повтор")
-            filtered_questions = questions
-
-        if filtered_questions:
-            first_result = random.choice(filtered_questions)
-
-            question_content = None
-            question_id = f"rag_q_{current_topic_index}"
-
-            if isinstance(first_result, dict):
-                if "metadata" in first_result and first_result["metadata"]:
-                    question_content = first_result["metadata"].get("question")
-                    question_id = question_content or question_id
-                elif "content" in first_result:
-                    question_content = first_result["content"]
-                    if "Вопрос:" in question_content:
-                        question_content = (
-                            question_content.split("Вопрос:")[1].split("\n")[0].strip()
-                        )
-
-            if question_content and len(question_content.strip()) > 15:
-                asked_questions.add(question_id)
-                logger.info(f"Новый вопрос выбран: '{question_content[:60]}...'")
-                return {
-                    "current_topic": next_topic,
-                    "current_question": {
-                        "id": question_id,
-                        "content": question_content,
-                    },
-                    "asked_question_ids": asked_questions,
-                    "questions_in_current_topic": questions_in_topic,
-                }
+            shortlist = [q for q in found if q["id"] not in asked_questions]
+            if shortlist:
+                candidate = shortlist.pop(0)
+            elif found:
+                logger.warning("Все вопросы уже заданы, разрешаем повтор")
+                candidate = found[0]
+        shortlists[next_topic] = shortlist
+
+        if candidate is not None:
+            question_id = candidate["id"]
+            question_content = candidate["content"]
+            asked_questions.add(question_id)
+            logger.info(f"Новый вопрос выбран: '{question_content[:60]}...'")
+            return {
+                "current_topic": next_topic,
+                "current_question": {
+                    "id": question_id,
+                    "content": question_content,
+                    "optimal_time": cached_optimal_time(question_id, state.get("role"), question_content),
+                },
+                "asked_question_ids": asked_questions,
+                "questions_in_current_topic": questions_in_topic,
+                "topic_shortlists": shortlists,
+            }
 
         raise ValueError("Не удалось найти подходящий вопрос")
 
     except Exception as e:
         logger.warning(f"RAG не сработал ({e}), используем fallback")
+        record_fallback("selector", "rag_error")
         return get_fallback_question(
-            next_topic, current_topic_index, asked_questions, questions_in_topic
+            next_topic, context["current_index"], asked_questions, questions_in_topic
         )
+
+
+def select_next_question(
+    state: Dict[str, Any],
+    *,
+    assistant: Any,
+    llm: Any,
+    alignment: str,
+    max_questions_per_topic: int,
+    shortlist_size: int = 5,
+) -> Dict[str, Any]:
+    result, context = _selector_context(state)
+    if result is not None:
+        return result
+
+    if context["topic"] == "Resume Discussion":
+        return get_resume_question(
+            state,
+            llm=llm,
+            alignment=alignment,
+            max_questions_per_topic=max_questions_per_topic,
+            topic=context["topic"],
+            current_index=context["current_index"],
+            asked_questions=context["asked_questions"],
+        )
+
+    return _select_rag_question(state, assistant=assistant, shortlist_size=shortlist_size, context=context)
+
+
+async def aselect_next_question(
+    state: Dict[str, Any],
+    *,
+    assistant: Any,
+    llm: Any,
+    alignment: str,
+    max_questions_per_topic: int,
+    shortlist_size: int = 5,
+) -> Dict[str, Any]:
+    """Асинхронная версия `select_next_question`: LLM вызывается через `ainvoke`,
+    возможный векторный поиск выполняется в пуле потоков."""
+    result, context = _selector_context(state)
+    if result is not None:
+        return result
+
+    if context["topic"] == "Resume Discussion":
+        return await aget_resume_question(
+            state,
+            llm=llm,
+            alignment=alignment,
+            max_questions_per_topic=max_questions_per_topic,
+            topic=context["topic"],
+            current_index=context["current_index"],
+            asked_questions=context["asked_questions"],
+        )
+
+    return await asyncio.to_thread(
+        _select_rag_question, state, assistant=assistant, shortlist_size=shortlist_size, context=context
+    )
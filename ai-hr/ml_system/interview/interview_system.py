@@ -2,8 +2,9 @@
 Агентная система для проведения технических интервью
 Переписана в виде класса для лучшей организации кода
 """
-from langchain_openai import ChatOpenAI
+import asyncio
 import os
+import copy
 import json
 import logging
 from typing import Dict, Optional, Set, Any
@@ -11,11 +12,21 @@ from ml_system.retrieva import InterviewKnowledgeSystemHF, InterviewAssistantHF
 from ml_system.interview.state import InterviewState
 from ml_system.interview.agents.controller import AdaptiveInterviewControllerAgent
 from ml_system.interview.src.config import InterviewConfig
-from ml_system.interview.agents.planner import plan_interview
-from ml_system.interview.agents.selector import get_fallback_question, get_resume_question, select_next_question
+from ml_system.interview.agents.planner import aplan_interview, plan_interview
+from ml_system.interview.agents.selector import (
+    aselect_next_question,
+    build_topic_shortlists,
+    get_fallback_question,
+    get_resume_question,
+    select_next_question,
+)
 from ml_system.interview.agents.conversation import conversation_turn
-from ml_system.interview.agents.evaluator import evaluate_answer
+from ml_system.interview.agents.evaluator import aevaluate_answer, evaluate_answer
+from ml_system.interview.src.llm import ainvoke_llm, create_chat_llm, invoke_llm, render_prompt
+from ml_system.interview.src.metrics import record_fallback
 from ml_system.interview.src.prompts import get_report_prompt
+from ml_system.interview.src.timing import aprecompute_optimal_times, precompute_optimal_times, seed_optimal_times
+from ml_system.interview.turn_log import average_score, get_all_topic_stats, report_notes, summarize_topics
 from ml_system.interview.workflow import build_graph
 
 logger = logging.getLogger(__name__)
@@ -29,7 +40,8 @@ class InterviewSystem:
                  max_total_questions: int = 2,
                  max_questions_per_topic: int = 1,
                  collection_name: str = "interview_questions_hf",
-                 config: InterviewConfig | None = None):
+                 config: InterviewConfig | None = None,
+                 knowledge_system: InterviewKnowledgeSystemHF | None = None):
         """
         Инициализация системы интервью
         
@@ -38,6 +50,7 @@ class InterviewSystem:
             model: Модель LLM для использования
             max_total_questions: Максимальное общее количество вопросов
             max_questions_per_topic: Максимальное количество вопросов в одной теме
+            knowledge_system: Готовая (общая) база знаний; если не задана — создаётся своя коллекция
         """
         if not api_key or "your" in api_key.lower() or len(api_key) < 10:
             raise ValueError("❌ Неверный API ключ. Пожалуйста, укажите корректный API ключ OpenRouter.")
@@ -72,27 +85,14 @@ class InterviewSystem:
         logger.info(f"Используем коллекцию: {self.collection_name}")
         
         try:
-            self.llm = ChatOpenAI(
-                model=self.config.model,
-                temperature=self.config.temperature,
-                api_key=api_key,
-                base_url=self.config.base_url,
-                timeout=self.config.request_timeout_seconds,
-                max_retries=self.config.llm_max_retries,
-                model_kwargs={
-                    "extra_headers": {
-                        "HTTP-Referer": "http://localhost",
-                        "X-Title": "AI-HR Interview System"
-                    }
-                }
-            )
+            self.llm = create_chat_llm(self.config, api_key)
             logger.info("LLM успешно инициализирован")
         except Exception as e:
             logger.exception(f"Ошибка инициализации LLM: {e}")
             logger.debug("Попробуйте проверить API ключ или использовать другую модель")
             raise
         
-        self.knowledge_system = InterviewKnowledgeSystemHF(collection_name=self.collection_name)
+        self.knowledge_system = knowledge_system or InterviewKnowledgeSystemHF(collection_name=self.collection_name)
         self.assistant = InterviewAssistantHF(knowledge_system=self.knowledge_system)
         
         self.alignment = self.config.alignment
@@ -111,16 +111,68 @@ class InterviewSystem:
         
         logger.info("Система интервью инициализирована")
     
+    def with_knowledge(self, knowledge_system: InterviewKnowledgeSystemHF) -> "InterviewSystem":
+        """Возвращает лёгкую копию системы с другой базой знаний.
+
+        LLM-клиент, контроллер и конфигурация разделяются с исходной системой,
+        поэтому копия не загружает модели и не создаёт соединений.
+        """
+        system = copy.copy(self)
+        system.knowledge_system = knowledge_system
+        system.assistant = InterviewAssistantHF(knowledge_system=knowledge_system)
+        system.app = None
+        return system
+
     def _interview_planner(self, state: InterviewState) -> Dict[str, Any]:
-        """Планировщик интервью (обёртка)."""
-        return plan_interview(
+        """Планировщик интервью (обёртка).
+
+        Вместе с планом формирует ранжированные шорт-листы вопросов по темам,
+        из которых селектор берёт вопросы без повторного векторного поиска, и
+        одним запросом оценивает время на ответ для ещё не закэшированных вопросов.
+        При наличии шаблона плана вакансии (`plan_template`) план и время на ответ
+        берутся из него без обращения к LLM.
+        """
+        result = plan_interview(
             state,
             llm=self.llm,
             alignment=self.alignment,
             max_total_questions=self.max_total_questions,
             max_questions_per_topic=self.max_questions_per_topic,
         )
+        plan = result.get("interview_plan") or {}
+        result["topic_shortlists"] = build_topic_shortlists(
+            plan.get("topics", []),
+            assistant=self.assistant,
+            count=self.config.shortlist_size,
+        )
+        seed_optimal_times(state.get("role"), (state.get("plan_template") or {}).get("optimal_times"))
+        precompute_optimal_times(self.llm, state.get("role"), self._shortlisted_questions(result["topic_shortlists"]))
+        return result
+
+    @staticmethod
+    def _shortlisted_questions(shortlists: Dict[str, Any]) -> list:
+        return [question for questions in shortlists.values() for question in questions]
     
+    async def _ainterview_planner(self, state: InterviewState) -> Dict[str, Any]:
+        """Асинхронный планировщик интервью; шорт-листы строятся в пуле потоков."""
+        result = await aplan_interview(
+            state,
+            llm=self.llm,
+            alignment=self.alignment,
+            max_total_questions=self.max_total_questions,
+            max_questions_per_topic=self.max_questions_per_topic,
+        )
+        plan = result.get("interview_plan") or {}
+        result["topic_shortlists"] = await asyncio.to_thread(
+            build_topic_shortlists,
+            plan.get("topics", []),
+            assistant=self.assistant,
+            count=self.config.shortlist_size,
+        )
+        seed_optimal_times(state.get("role"), (state.get("plan_template") or {}).get("optimal_times"))
+        await aprecompute_optimal_times(self.llm, state.get("role"), self._shortlisted_questions(result["topic_shortlists"]))
+        return result
+
     def _question_selector(self, state: InterviewState) -> Dict[str, Any]:
         """Селектор вопросов (обёртка)."""
         return select_next_question(
@@ -129,6 +181,18 @@ class InterviewSystem:
             llm=self.llm,
             alignment=self.alignment,
             max_questions_per_topic=self.max_questions_per_topic,
+            shortlist_size=self.config.shortlist_size,
+        )
+    
+    async def _aquestion_selector(self, state: InterviewState) -> Dict[str, Any]:
+        """Асинхронный селектор вопросов."""
+        return await aselect_next_question(
+            state,
+            assistant=self.assistant,
+            llm=self.llm,
+            alignment=self.alignment,
+            max_questions_per_topic=self.max_questions_per_topic,
+            shortlist_size=self.config.shortlist_size,
         )
     
     def _get_resume_questions(self, state: Dict[str, Any], topic: str, current_index: int, asked_questions: Set[str]) -> Dict[str, Any]:
@@ -155,80 +219,53 @@ class InterviewSystem:
         """Оценщик ответов (обёртка)."""
         return evaluate_answer(state, llm=self.llm, alignment=self.alignment)
 
-    def _report_generator(self, state: InterviewState) -> Dict[str, Any]:
-        """Генератор отчётов. Формирует финальный отчёт по интервью на основе оценок."""
-        logger.debug("--- Агент: Генератор отчетов ---")
+    async def _aanswer_evaluator(self, state: InterviewState) -> Dict[str, Any]:
+        """Асинхронный оценщик ответов."""
+        return await aevaluate_answer(state, llm=self.llm, alignment=self.alignment)
 
-        evaluations = state.get("answer_evaluations", [])
-        if not evaluations:
-            return {"report": "Отчет не может быть создан: нет оценок."}
+    def _report_inputs(self, state: InterviewState) -> Optional[Dict[str, Any]]:
+        """Собирает агрегаты оценок и переменные промпта отчёта; None, если оценок нет."""
+        avg_score = average_score(state)
+        if avg_score is None:
+            return None
 
-        interview_data = {
-            "resume": state.get("resume", "Не указано"),
-            "job_description": state.get("job_description", "Не указана"),
-            "evaluations": evaluations,
-        }
-
-        topics_summary = ""
-        total_score = 0
-        all_inconsistencies = []
-        all_red_flags = []
-        all_strengths = []
-        all_weaknesses = []
-
-        for eval_item in evaluations:
-            topic = eval_item.get('topic', 'Unknown')
-            score = eval_item.get('score_percent', 0)
-            detailed_scores = eval_item.get('detailed_scores', {})
-            analysis = eval_item.get('analysis', {})
-
-            topics_summary += f"\n• Тема: {topic}\n"
-            topics_summary += f"  - Итоговая оценка: {score:.1f}%\n"
-
-            if detailed_scores:
-                topics_summary += f"  - Техническая точность: {detailed_scores.get('technical_accuracy', 'N/A')}/10\n"
-                topics_summary += f"  - Глубина знаний: {detailed_scores.get('depth_of_knowledge', 'N/A')}/10\n"
-                topics_summary += f"  - Практический опыт: {detailed_scores.get('practical_experience', 'N/A')}/10\n"
-                topics_summary += f"  - Коммуникация: {detailed_scores.get('communication_clarity', 'N/A')}/10\n"
-
-            all_inconsistencies.extend(analysis.get('inconsistencies', []))
-            all_red_flags.extend(analysis.get('red_flags', []))
-            all_strengths.extend(analysis.get('strengths', []))
-            all_weaknesses.extend(analysis.get('weaknesses', []))
-
-            total_score += score
+        resume = state.get("resume", "Не указано")
+        job_description = state.get("job_description", "Не указана")
 
-        avg_score = total_score / len(evaluations)
+        topics_summary = summarize_topics(get_all_topic_stats(state))
+        notes = report_notes(state)
 
-        report_prompt = get_report_prompt()
-
-        try:
-            report_chain = report_prompt | self.llm
-            response = report_chain.invoke({
-                "resume": interview_data["resume"][:500] + "..." if len(interview_data["resume"]) > 500 else interview_data["resume"],
-                "job_description": interview_data["job_description"][:300] + "..." if len(interview_data["job_description"]) > 300 else interview_data["job_description"],
+        return {
+            "avg_score": avg_score,
+            "topics_summary": topics_summary,
+            "messages": render_prompt(get_report_prompt(), {
+                "resume": resume[:500] + "..." if len(resume) > 500 else resume,
+                "job_description": job_description[:300] + "..." if len(job_description) > 300 else job_description,
                 "topics_summary": topics_summary,
                 "avg_score": avg_score,
-                "inconsistencies": all_inconsistencies[:10],
-                "red_flags": all_red_flags[:10],
-                "strengths": list(set(all_strengths))[:10],
-                "weaknesses": list(set(all_weaknesses))[:10]
-            })
-        except Exception as e:
-            logger.exception(f"Ошибка LLM в генераторе отчетов: {e}")
-            logger.warning("Используем базовый отчет")
-            recommendation = "HIRE" if avg_score >= 80 else "MAYBE" if avg_score >= 65 else "REJECT"
-            llm_analysis = {
-                "overall_assessment": f"Кандидат показал результат {avg_score:.1f}% по итогам интервью.",
-                "strong_points": ["Участвовал в интервью", "Ответил на вопросы"],
-                "weak_points": ["Требуется дополнительная оценка"],
-                "hire_decision": recommendation,
-                "hire_reasoning": f"Решение основано на средней оценке {avg_score:.1f}%",
-                "development_recommendations": ["Продолжить обучение по профильным темам"],
-                "next_steps": "Рассмотреть дополнительное собеседование"
-            }
+                "inconsistencies": notes.get("inconsistencies", []),
+                "red_flags": notes.get("red_flags", []),
+                "strengths": notes.get("strengths", []),
+                "weaknesses": notes.get("weaknesses", [])
+            }),
+        }
 
-            final_report = f"""
+    @staticmethod
+    def _basic_llm_analysis(avg_score: float) -> Dict[str, Any]:
+        recommendation = "HIRE" if avg_score >= 80 else "MAYBE" if avg_score >= 65 else "REJECT"
+        return {
+            "overall_assessment": f"Кандидат показал результат {avg_score:.1f}% по итогам интервью.",
+            "strong_points": ["Участвовал в интервью", "Ответил на вопросы"],
+            "weak_points": ["Требуется дополнительная оценка"],
+            "hire_decision": recommendation,
+            "hire_reasoning": f"Решение основано на средней оценке {avg_score:.1f}%",
+            "development_recommendations": ["Продолжить обучение по профильным темам"],
+            "next_steps": "Рассмотреть дополнительное собеседование"
+        }
+
+    @staticmethod
+    def _format_report(llm_analysis: Dict[str, Any], avg_score: float, topics_summary: str) -> str:
+        return f"""
 ОТЧЕТ ПО ИНТЕРВЬЮ
 
 
@@ -279,10 +316,19 @@ class InterviewSystem:
 {topics_summary}
 """.strip()
 
-            logger.info(f"Создан базовый отчет с решением: {llm_analysis.get('hire_decision', 'UNKNOWN')}")
+    def _report_result(self, inputs: Dict[str, Any], response: Any = None, error: Optional[Exception] = None) -> Dict[str, Any]:
+        """Формирует итог генератора отчётов по ответу LLM (или по ошибке вызова)."""
+        avg_score = inputs["avg_score"]
+        topics_summary = inputs["topics_summary"]
 
+        if error is not None:
+            logger.exception(f"Ошибка LLM в генераторе отчетов: {error}")
+            logger.warning("Используем базовый отчет")
+            record_fallback("report", "llm_error")
+            llm_analysis = self._basic_llm_analysis(avg_score)
+            logger.info(f"Создан базовый отчет с решением: {llm_analysis.get('hire_decision', 'UNKNOWN')}")
             return {
-                "report": final_report,
+                "report": self._format_report(llm_analysis, avg_score, topics_summary),
                 "final_recommendation": llm_analysis.get('hire_decision', 'UNKNOWN'),
                 "llm_analysis": llm_analysis,
             }
@@ -301,75 +347,43 @@ class InterviewSystem:
 
         except (json.JSONDecodeError, IndexError) as e:
             logger.exception(f"Ошибка парсинга LLM-отчета ({e}). Используется базовый отчет.")
-            recommendation = "HIRE" if avg_score >= 80 else "MAYBE" if avg_score >= 65 else "REJECT"
-            llm_analysis = {
-                "overall_assessment": f"Кандидат показал результат {avg_score:.1f}% по итогам интервью.",
-                "strong_points": ["Участвовал в интервью", "Ответил на вопросы"],
-                "weak_points": ["Требуется дополнительная оценка"],
-                "hire_decision": recommendation,
-                "hire_reasoning": f"Решение основано на средней оценке {avg_score:.1f}%",
-                "development_recommendations": ["Продолжить обучение по профильным темам"],
-                "next_steps": "Рассмотреть дополнительное собеседование"
-            }
-
-        final_report = f"""
-ОТЧЕТ ПО ИНТЕРВЬЮ
-
-
-🎯 ОБЩАЯ ОЦЕНКА: {avg_score:.1f}%
-📋 РЕШЕНИЕ: {llm_analysis.get('hire_decision', 'UNKNOWN')}
-
-
-📄 ОБЩАЯ ХАРАКТЕРИСТИКА:{llm_analysis.get('overall_assessment', 'Не указана')}
-
-
-✅ СИЛЬНЫЕ СТОРОНЫ:
-{chr(10).join(f"  -  {point}" for point in llm_analysis.get('strong_points', ['Не указаны']))}
-
-
-⚠️  ОБЛАСТИ ДЛЯ РАЗВИТИЯ:
-{chr(10).join(f"  -  {point}" for point in llm_analysis.get('weak_points', ['Не указаны']))}
-
-
-🔧 ТЕХНИЧЕСКАЯ КОМПЕТЕНТНОСТЬ:
-{llm_analysis.get('technical_competence', 'Не указана')}
-
-
-🔍 АНАЛИЗ НЕСОСТЫКОВОК:
-{llm_analysis.get('inconsistencies_analysis', 'Не найдены')}
-
-
-🚨 АНАЛИЗ КРАСНЫХ ФЛАГОВ:
-{llm_analysis.get('red_flags_analysis', 'Не обнаружены')}
-
-
-📚 РЕКОМЕНДАЦИИ ПО РАЗВИТИЮ:
-{chr(10).join(f"  -  {rec}" for rec in llm_analysis.get('development_recommendations', ['Не указаны']))}
-
-
-💼 ОБОСНОВАНИЕ РЕШЕНИЯ:
-{llm_analysis.get('hire_reasoning', 'Не указано')}
+            llm_analysis = self._basic_llm_analysis(avg_score)
 
+        logger.info(f"Создан детальный отчет с решением: {llm_analysis.get('hire_decision', 'UNKNOWN')}")
 
-⚠️  ОЦЕНКА РИСКОВ:
-{llm_analysis.get('risk_assessment', 'Не указана')}
+        return {
+            "report": self._format_report(llm_analysis, avg_score, topics_summary),
+            "final_recommendation": llm_analysis.get('hire_decision', 'UNKNOWN'),
+            "llm_analysis": llm_analysis,
+        }
 
+    def _report_generator(self, state: InterviewState) -> Dict[str, Any]:
+        """Генератор отчётов. Формирует финальный отчёт по интервью на основе оценок."""
+        logger.debug("--- Агент: Генератор отчетов ---")
 
-🚀 СЛЕДУЮЩИЕ ШАГИ:
-{llm_analysis.get('next_steps', 'Не указаны')}
+        inputs = self._report_inputs(state)
+        if inputs is None:
+            return {"report": "Отчет не может быть создан: нет оценок."}
 
+        try:
+            response = invoke_llm(self.llm, inputs["messages"], agent="report")
+        except Exception as e:
+            return self._report_result(inputs, error=e)
+        return self._report_result(inputs, response)
 
-ДЕТАЛИЗАЦИЯ ПО ТЕМАМ
-{topics_summary}
-""".strip()
+    async def _areport_generator(self, state: InterviewState) -> Dict[str, Any]:
+        """Асинхронная версия `_report_generator`."""
+        logger.debug("--- Агент: Генератор отчетов (async) ---")
 
-        logger.info(f"Создан детальный отчет с решением: {llm_analysis.get('hire_decision', 'UNKNOWN')}")
+        inputs = self._report_inputs(state)
+        if inputs is None:
+            return {"report": "Отчет не может быть создан: нет оценок."}
 
-        return {
-            "report": final_report,
-            "final_recommendation": llm_analysis.get('hire_decision', 'UNKNOWN'),
-            "llm_analysis": llm_analysis,
-        }
+        try:
+            response = await ainvoke_llm(self.llm, inputs["messages"], agent="report")
+        except Exception as e:
+            return self._report_result(inputs, error=e)
+        return self._report_result(inputs, response)
     
     def _router(self, state: InterviewState) -> str:
         """Роутер шага графа: выбирает следующий узел на основании состояния."""
@@ -432,6 +446,10 @@ class InterviewSystem:
     def _adaptive_controller_node(self, state: InterviewState) -> Dict[str, Any]:
         """Обёртка для вызова адаптивного контроллера."""
         return self.adaptive_controller.execute(state)
+
+    async def _aadaptive_controller_node(self, state: InterviewState) -> Dict[str, Any]:
+        """Асинхронный вызов адаптивного контроллера."""
+        return await self.adaptive_controller.aexecute(state)
     
     def build_workflow(self) -> None:
         """Построение графа интервью (через workflow.build_graph)."""
@@ -497,7 +515,12 @@ class InterviewSystem:
             "hints_given_count": 0,
             "current_topic_index": 0,
             "answer_evaluations": [],
+            "turn_log": [],
+            "report_notes": {},
+            "topic_stats": {},
             "asked_question_ids": set(),
+            "topic_shortlists": {},
+            "plan_template": None,
             "interview_plan": None,
             "current_topic": None,
             "current_question": None,
@@ -0,0 +1,68 @@
+"""
+Пакетная генерация финальных отчётов по завершённым интервью.
+
+Отчёты нескольких интервью строятся одним проходом: интервью с одинаковым
+отрендеренным промптом (те же агрегаты оценок, резюме и вакансия) разделяют
+один вызов LLM, а число одновременных вызовов ограничено семафором.
+Статическая инструкция промпта отчёта стоит в его начале, поэтому у провайдера
+срабатывает кэширование общего префикса.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Any, Dict, List, Tuple
+
+from ml_system.interview.src.llm import ainvoke_llm
+from ml_system.interview.src.llm_cache import messages_text
+
+logger = logging.getLogger(__name__)
+
+REPORT_CONCURRENCY = int(os.getenv("AI_HR_REPORT_CONCURRENCY", "4"))
+EMPTY_REPORT = {"report": "Отчет не может быть создан: нет оценок."}
+
+
+def report_prompt_key(messages: List[Any]) -> str:
+    return hashlib.sha256(messages_text(messages).encode("utf-8")).hexdigest()
+
+
+async def agenerate_reports(
+    system: Any, states: Dict[str, Dict[str, Any]], concurrency: int = REPORT_CONCURRENCY
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+    """Генерирует отчёты для набора интервью.
+
+    Args:
+        system: `InterviewSystem`, чья модель и шаблоны отчёта используются.
+        states: Состояния интервью по их ID.
+        concurrency: Максимум одновременных вызовов LLM.
+
+    Returns:
+        Кортеж (результаты генератора отчётов по ID интервью, счётчики
+        `interviews`/`llm_calls`).
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    inputs: Dict[str, Dict[str, Any]] = {}
+    groups: Dict[str, List[str]] = {}
+    for interview_id, state in states.items():
+        report_inputs = system._report_inputs(state)
+        if report_inputs is None:
+            results[interview_id] = dict(EMPTY_REPORT)
+            continue
+        inputs[interview_id] = report_inputs
+        groups.setdefault(report_prompt_key(report_inputs["messages"]), []).append(interview_id)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(interview_ids: List[str]) -> None:
+        response, error = None, None
+        async with semaphore:
+            try:
+                response = await ainvoke_llm(system.llm, inputs[interview_ids[0]]["messages"], agent="report")
+            except Exception as e:
+                error = e
+        for interview_id in interview_ids:
+            results[interview_id] = system._report_result(inputs[interview_id], response, error=error)
+
+    await asyncio.gather(*(run(interview_ids) for interview_ids in groups.values()))
+    logger.info(f"Пакет отчётов: {len(states)} интервью, {len(groups)} вызовов LLM")
+    return results, {"interviews": len(states), "llm_calls": len(groups)}
@@ -22,8 +22,13 @@ class InterviewConfig:
     max_deepening_questions: int = 1
     max_hints: int = 1
 
+    # Pipelining: генерация вероятных следующих вопросов параллельно с оценкой ответа
+    pipelined_submit: bool = False
+    speculative_actions: tuple = ("deepen_topic", "same_level_question")
+
     # RAG
     collection_name: str = "interview_questions_hf"
+    shortlist_size: int = 5
 
     # Alignment/policy
     alignment: str = (
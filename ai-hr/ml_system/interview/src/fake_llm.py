@@ -0,0 +1,193 @@
+"""
+Локальная детерминированная чат-модель для офлайн-прогонов и бенчмарков.
+
+`FakeChatModel` не обращается к сети: по маркерам промпта определяет агента
+(планировщик, план вакансии, генерация вопроса, оценщик, отчёт, пакетная
+оценка времени, оценка резюме) и возвращает JSON той схемы, которую ждёт парсер агента.
+Ответ и задержка зависят только от текста промпта, поэтому прогоны
+воспроизводимы. Включается через `AI_HR_LLM_BACKEND=fake` (см. `llm.create_chat_llm`).
+"""
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+FAKE_TOPICS = [
+    {"name": "Resume Discussion", "description": "Обсуждение опыта и проектов из резюме"},
+    {"name": "Core Skills", "description": "Ключевые навыки для роли"},
+    {"name": "Tools & Workflow", "description": "Инструменты, процессы и взаимодействие"},
+    {"name": "Problem Solving", "description": "Подход к решению задач"},
+    {"name": "Quality", "description": "Проверка качества и метрики"},
+    {"name": "Communication", "description": "Коммуникация и командная работа"},
+]
+
+FAKE_QUESTIONS = [
+    "Расскажите о проекте, где вы отвечали за результат целиком: цель, ваш вклад, итог.",
+    "Как вы проверяете качество своей работы перед тем, как отдать её дальше?",
+    "Опишите задачу, в которой пришлось выбирать между несколькими подходами. Что решили и почему?",
+    "Какие метрики вы используете, чтобы понять, что решение работает?",
+    "Приведите пример, когда вы ускорили процесс или сократили ручную работу.",
+    "Как вы разбираете нечёткие требования перед началом работы?",
+    "Расскажите о случае, когда результат не совпал с ожиданиями. Что изменили?",
+    "Какие инструменты помогают вам в повседневной работе и как вы их выбирали?",
+    "Как вы договариваетесь с коллегами, если мнения о решении расходятся?",
+    "Опишите самый сложный баг или инцидент, который вы разбирали.",
+    "Как вы оцениваете сроки задачи и что делаете, если не укладываетесь?",
+    "Что бы вы улучшили в последнем проекте, если бы начинали его заново?",
+]
+
+_AVG_SCORE = re.compile(r"Средняя оценка:\*\*\s*([\d.]+)")
+_NUMBERED = re.compile(r"^\s*\d+\.\s", re.MULTILINE)
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+def fake_response(prompt: str) -> str:
+    """Детерминированный ответ на промпт одного из агентов интервью."""
+    seed = _digest(prompt)
+    if '"total_score_percent"' in prompt:
+        score = 20 + seed % 71
+        return json.dumps({
+            "total_score_percent": score,
+            "details": {
+                "experience": {"candidate_has_years": float(seed % 6), "score": score},
+                "education": {"candidate_has": "высшее", "score": 100},
+                "required_skills": {"map": {}, "score": score},
+                "optional_skills": {"map": {}, "score": score},
+            },
+        }, ensure_ascii=False)
+    if '"opening_question"' in prompt:
+        return json.dumps({
+            "topics": FAKE_TOPICS,
+            "opening_question": {"optimal_time": 180, "question": FAKE_QUESTIONS[0]},
+        }, ensure_ascii=False)
+    if '"times"' in prompt:
+        count = len(_NUMBERED.findall(prompt.split("Вопросы:", 1)[-1]))
+        return json.dumps({"times": [120 + 30 * ((seed >> i) % 8) for i in range(count)]})
+    if '"technical_accuracy"' in prompt:
+        scores = {
+            key: 3 + (seed >> (4 * i)) % 7
+            for i, key in enumerate((
+                "technical_accuracy", "depth_of_knowledge", "practical_experience",
+                "communication_clarity", "problem_solving_approach", "examples_and_use_cases",
+            ))
+        }
+        return json.dumps({
+            **scores,
+            "inconsistencies": [],
+            "red_flags": [],
+            "strengths": ["Структурированный ответ"],
+            "weaknesses": ["Мало количественных результатов"],
+            "follow_up_suggestions": ["Уточнить метрики"],
+        }, ensure_ascii=False)
+    if '"hire_decision"' in prompt:
+        match = _AVG_SCORE.search(prompt)
+        avg_score = float(match.group(1)) if match else 0.0
+        decision = "HIRE" if avg_score >= 80 else "MAYBE" if avg_score >= 45 else "REJECT"
+        return json.dumps({
+            "overall_assessment": "Кандидат последовательно описывает опыт и подход к задачам.",
+            "strong_points": ["[HARD] Уверенное владение основными инструментами", "[SOFT] Ясная коммуникация"],
+            "weak_points": ["[HARD] Мало количественных результатов", "[SOFT] Нет данных о работе в конфликтах"],
+            "technical_competence": "Базовые навыки подтверждены примерами.",
+            "soft_skills_assessment": "Коммуникация структурированная, нет данных о стрессоустойчивости.",
+            "inconsistencies_analysis": "Несостыковок не найдено.",
+            "red_flags_analysis": "Красных флагов нет.",
+            "development_recommendations": ["[HARD] Измерять результат метриками", "[SOFT] Готовить примеры командной работы"],
+            "hire_decision": decision,
+            "hire_reasoning": f"Средняя оценка {avg_score:.1f}%.",
+            "next_steps": "Техническое интервью с командой.",
+            "risk_assessment": "Риски умеренные.",
+        }, ensure_ascii=False)
+    if '"optimal_time"' in prompt:
+        return json.dumps({
+            "optimal_time": 120 + 30 * (seed % 9),
+            "question": FAKE_QUESTIONS[seed % len(FAKE_QUESTIONS)],
+        }, ensure_ascii=False)
+    if '"topics"' in prompt:
+        return json.dumps({"topics": FAKE_TOPICS}, ensure_ascii=False)
+    return FAKE_QUESTIONS[seed % len(FAKE_QUESTIONS)]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Офлайн-модель с имитацией задержки сети.
+
+    Attributes:
+        model_name: Имя модели в метриках и ключах кэша ответов.
+        temperature: Температура (только для ключей кэша).
+        latency_ms: Базовая задержка ответа.
+        jitter_ms: Максимальная добавка к задержке (детерминирована по промпту).
+        chunk_size: Размер фрагмента при потоковой выдаче.
+    """
+
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    chunk_size: int = 16
+
+    @property
+    def _llm_type(self) -> str:
+        return "ai-hr-fake-chat"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "latency_ms": self.latency_ms}
+
+    def _delay(self, prompt: str) -> float:
+        jitter = random.Random(_digest(prompt)).uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        return (self.latency_ms + jitter) / 1000.0
+
+    @staticmethod
+    def _message(prompt: str, text: str) -> AIMessage:
+        input_tokens, output_tokens = max(1, len(prompt) // 4), max(1, len(text) // 4)
+        return AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        prompt = _prompt_text(messages)
+        time.sleep(self._delay(prompt))
+        return ChatResult(generations=[ChatGeneration(message=self._message(prompt, fake_response(prompt)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        prompt = _prompt_text(messages)
+        await asyncio.sleep(self._delay(prompt))
+        return ChatResult(generations=[ChatGeneration(message=self._message(prompt, fake_response(prompt)))])
+
+    def _chunks(self, prompt: str) -> Iterator[ChatGenerationChunk]:
+        text = fake_response(prompt)
+        usage = self._message(prompt, text).usage_metadata
+        pieces = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        for i, piece in enumerate(pieces):
+            last = i == len(pieces) - 1
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=usage if last else None))
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        prompt = _prompt_text(messages)
+        time.sleep(self._delay(prompt))
+        yield from self._chunks(prompt)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        prompt = _prompt_text(messages)
+        await asyncio.sleep(self._delay(prompt))
+        for chunk in self._chunks(prompt):
+            yield chunk
@@ -0,0 +1,268 @@
+"""
+Общий слой доступа к LLM: пул HTTP-соединений и единые точки вызова модели.
+
+Все агенты рендерят промпт в сообщения и вызывают модель через `invoke_llm`
+(синхронно) или `ainvoke_llm` (в async-обработчиках API), поэтому соединения
+с OpenRouter переиспользуются, а event loop не блокируется. Ответы агентов
+из `LLM_CACHE_AGENTS` берутся из кэша (`LLMResponseCache`), если промпт уже встречался.
+Если к контексту привязан поток вопроса (`streaming.bind_question_stream`), ответы
+агентов генерации вопросов читаются через `astream` и передаются в него по фрагментам.
+Каждый вызов записывается в метрики (`metrics.record_llm_call`): задержка, токены,
+число HTTP-попыток (считается хуками общих клиентов) и исход.
+При `AI_HR_LLM_BACKEND=fake` вместо OpenRouter используется офлайн-модель `FakeChatModel`.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from langchain_core.messages import AIMessage
+
+from .config import InterviewConfig
+from .llm_cache import LLMResponseCache
+from .metrics import record_llm_call
+from .streaming import STREAM_AGENTS, current_question_stream
+
+logger = logging.getLogger(__name__)
+
+LLM_BACKEND = os.getenv("AI_HR_LLM_BACKEND", "openrouter").lower()
+FAKE_LLM_LATENCY_MS = float(os.getenv("AI_HR_FAKE_LLM_LATENCY_MS", "0"))
+FAKE_LLM_JITTER_MS = float(os.getenv("AI_HR_FAKE_LLM_JITTER_MS", "0"))
+
+LLM_MAX_CONNECTIONS = int(os.getenv("AI_HR_LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AI_HR_LLM_MAX_KEEPALIVE", "20"))
+
+LLM_CACHE_AGENTS = tuple(a for a in os.getenv("AI_HR_LLM_CACHE_AGENTS", "planner,question,hint,optimal_time").split(",") if a)
+LLM_CACHE_SIMILAR_AGENTS = tuple(a for a in os.getenv("AI_HR_LLM_CACHE_SIMILAR_AGENTS", "planner").split(",") if a)
+LLM_CACHE_SIMILARITY = float(os.getenv("AI_HR_LLM_CACHE_SIMILARITY", "0.97"))
+LLM_CACHE_SIZE = int(os.getenv("AI_HR_LLM_CACHE_SIZE", "2000"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("AI_HR_LLM_CACHE_TTL_SECONDS", "86400"))
+
+_clients_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_llm_cache: Optional[LLMResponseCache] = None
+_call_attempts: ContextVar[Optional[List[int]]] = ContextVar("llm_call_attempts", default=None)
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=30.0,
+    )
+
+
+def _count_attempt() -> None:
+    attempts = _call_attempts.get()
+    if attempts is not None:
+        attempts[0] += 1
+
+
+def _on_request(request: httpx.Request) -> None:
+    _count_attempt()
+
+
+async def _aon_request(request: httpx.Request) -> None:
+    _count_attempt()
+
+
+def get_http_client(timeout: float = 30.0) -> httpx.Client:
+    """Возвращает общий для процесса синхронный HTTP-клиент с пулом соединений."""
+    global _http_client
+    with _clients_lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(
+                limits=_pool_limits(), timeout=timeout, event_hooks={"request": [_on_request]}
+            )
+        return _http_client
+
+
+def get_async_http_client(timeout: float = 30.0) -> httpx.AsyncClient:
+    """Возвращает общий для процесса асинхронный HTTP-клиент с пулом соединений."""
+    global _async_http_client
+    with _clients_lock:
+        if _async_http_client is None or _async_http_client.is_closed:
+            _async_http_client = httpx.AsyncClient(
+                limits=_pool_limits(), timeout=timeout, event_hooks={"request": [_aon_request]}
+            )
+        return _async_http_client
+
+
+async def aclose_http_clients() -> None:
+    """Закрывает общие HTTP-клиенты (вызывается при остановке сервиса)."""
+    global _http_client, _async_http_client
+    with _clients_lock:
+        sync_client, async_client = _http_client, _async_http_client
+        _http_client, _async_http_client = None, None
+    if async_client is not None:
+        await async_client.aclose()
+    if sync_client is not None:
+        sync_client.close()
+
+
+def create_chat_llm(config: InterviewConfig, api_key: str) -> Any:
+    """Создаёт чат-модель OpenRouter, работающую через общие пулы соединений.
+
+    При `AI_HR_LLM_BACKEND=fake` возвращает офлайн-модель `FakeChatModel`
+    с задержкой `AI_HR_FAKE_LLM_LATENCY_MS` (+ до `AI_HR_FAKE_LLM_JITTER_MS`).
+
+    Args:
+        config: Конфигурация интервью (модель, температура, таймауты).
+        api_key: Ключ OpenRouter.
+    """
+    if LLM_BACKEND == "fake":
+        from .fake_llm import FakeChatModel
+
+        logger.info(f"Используется офлайн-модель FakeChatModel (задержка {FAKE_LLM_LATENCY_MS:.0f} мс)")
+        return FakeChatModel(
+            temperature=config.temperature, latency_ms=FAKE_LLM_LATENCY_MS, jitter_ms=FAKE_LLM_JITTER_MS
+        )
+    timeout = float(config.request_timeout_seconds)
+    return ChatOpenAI(
+        model=config.model,
+        temperature=config.temperature,
+        api_key=api_key,
+        base_url=config.base_url,
+        timeout=timeout,
+        max_retries=config.llm_max_retries,
+        stream_usage=True,
+        http_client=get_http_client(timeout),
+        http_async_client=get_async_http_client(timeout),
+        model_kwargs={
+            "extra_headers": {
+                "HTTP-Referer": "http://localhost",
+                "X-Title": "AI-HR Interview System"
+            }
+        }
+    )
+
+
+def _prompt_embedding(text: str) -> List[float]:
+    from ml_system.retrieva import get_shared_embeddings
+
+    return get_shared_embeddings().embed_query(text)
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Возвращает процессный кэш ответов LLM."""
+    global _llm_cache
+    with _clients_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache(
+                max_size=LLM_CACHE_SIZE,
+                ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                similarity_threshold=LLM_CACHE_SIMILARITY,
+                similarity_agents=LLM_CACHE_SIMILAR_AGENTS,
+                embed=_prompt_embedding if LLM_CACHE_SIMILAR_AGENTS else None,
+            )
+        return _llm_cache
+
+
+def _model_id(llm: Any) -> tuple:
+    return getattr(llm, "model_name", None) or type(llm).__name__, getattr(llm, "temperature", None)
+
+
+def render_prompt(prompt: Any, variables: Dict[str, Any]) -> List[Any]:
+    """Рендерит `ChatPromptTemplate` в список сообщений для модели."""
+    return prompt.format_messages(**variables)
+
+
+def invoke_llm(llm: Any, messages: List[Any], *, agent: str) -> Any:
+    """Синхронный вызов модели.
+
+    Args:
+        llm: Чат-модель LangChain.
+        messages: Готовые сообщения (см. `render_prompt`).
+        agent: Имя агента-инициатора (для логов, метрик и кэша ответов).
+    """
+    model, temperature = _model_id(llm)
+    started = time.perf_counter()
+    if agent in LLM_CACHE_AGENTS:
+        cache = get_llm_cache()
+        cached, key, vector = cache.lookup(agent, model, temperature, messages)
+        if cached is not None:
+            record_llm_call(agent, model, time.perf_counter() - started, "cache_hit")
+            return AIMessage(content=cached)
+    attempts = [0]
+    token = _call_attempts.set(attempts)
+    started = time.perf_counter()
+    try:
+        response = llm.invoke(messages)
+    except Exception:
+        record_llm_call(agent, model, time.perf_counter() - started, "error", attempts=attempts[0])
+        raise
+    finally:
+        _call_attempts.reset(token)
+    elapsed = time.perf_counter() - started
+    record_llm_call(agent, model, elapsed, "ok", response, attempts[0])
+    logger.debug(f"LLM [{agent}]: {elapsed:.2f}s")
+    if agent in LLM_CACHE_AGENTS:
+        cache.store(agent, model, key, response_text(response), vector)
+    return response
+
+
+async def ainvoke_llm(llm: Any, messages: List[Any], *, agent: str) -> Any:
+    """Асинхронный вызов модели (не блокирует event loop)."""
+    model, temperature = _model_id(llm)
+    started = time.perf_counter()
+    if agent in LLM_CACHE_AGENTS:
+        cache = get_llm_cache()
+        if agent in cache.similarity_agents:
+            cached, key, vector = await asyncio.to_thread(cache.lookup, agent, model, temperature, messages)
+        else:
+            cached, key, vector = cache.lookup(agent, model, temperature, messages)
+        if cached is not None:
+            record_llm_call(agent, model, time.perf_counter() - started, "cache_hit")
+            return AIMessage(content=cached)
+    attempts = [0]
+    token = _call_attempts.set(attempts)
+    started = time.perf_counter()
+    try:
+        stream = current_question_stream()
+        if stream is not None and stream.accepts_tokens and agent in STREAM_AGENTS:
+            response = await _astream_llm(llm, messages, stream)
+        else:
+            response = await llm.ainvoke(messages)
+    except Exception:
+        record_llm_call(agent, model, time.perf_counter() - started, "error", attempts=attempts[0])
+        raise
+    finally:
+        _call_attempts.reset(token)
+    elapsed = time.perf_counter() - started
+    record_llm_call(agent, model, elapsed, "ok", response, attempts[0])
+    logger.debug(f"LLM [{agent}]: {elapsed:.2f}s")
+    if agent in LLM_CACHE_AGENTS:
+        cache.store(agent, model, key, response_text(response), vector)
+    return response
+
+
+async def _astream_llm(llm: Any, messages: List[Any], stream: Any) -> AIMessage:
+    """Читает ответ модели по фрагментам, передавая их в поток вопроса."""
+    parts = []
+    usage = None
+    try:
+        async for chunk in llm.astream(messages):
+            if getattr(chunk, "usage_metadata", None):
+                usage = chunk.usage_metadata
+            text = response_text(chunk)
+            if text:
+                parts.append(text)
+                stream.feed(text)
+    finally:
+        stream.finish_generation()
+    return AIMessage(content="".join(parts), usage_metadata=usage)
+
+
+def response_text(response: Any) -> str:
+    """Извлекает текст из ответа модели (content может быть списком фрагментов)."""
+    content = getattr(response, "content", response)
+    if isinstance(content, list):
+        content = "".join(str(item) for item in content)
+    return content if isinstance(content, str) else str(content or "")
@@ -0,0 +1,144 @@
+"""
+Кэш ответов LLM.
+
+Точный слой адресуется хэшем (агент, модель, температура, отрендеренные
+сообщения). Для агентов с включённым семантическим слоем дополнительно
+хранится эмбеддинг промпта: при промахе точного слоя берётся ответ на самый
+похожий промпт того же агента и модели, если косинусная близость не ниже порога.
+Записи вытесняются по LRU и TTL; счётчики попаданий ведутся по агентам.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def messages_text(messages: List[Any]) -> str:
+    """Текст сообщений промпта в виде, используемом для ключа и эмбеддинга."""
+    return "\n".join(
+        f"{getattr(message, 'type', '')}: {getattr(message, 'content', message)}" for message in messages
+    )
+
+
+class LLMResponseCache:
+    """
+    Процессный кэш ответов LLM с точным и семантическим слоями.
+
+    Attributes:
+        max_size: Максимальное число записей.
+        ttl_seconds: Время жизни записи.
+        similarity_threshold: Порог косинусной близости для семантического слоя.
+        similarity_agents: Агенты, для которых включён семантический слой.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2000,
+        ttl_seconds: int = 86400,
+        similarity_threshold: float = 0.97,
+        similarity_agents: Tuple[str, ...] = (),
+        embed: Optional[Callable[[str], List[float]]] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.similarity_agents = tuple(similarity_agents) if embed is not None else ()
+        self.embed = embed
+        self._entries: "OrderedDict[str, Tuple[str, float, Tuple[str, str]]]" = OrderedDict()
+        self._vectors: Dict[Tuple[str, str], "OrderedDict[str, np.ndarray]"] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(agent: str, model: str, temperature: Any, text: str) -> str:
+        raw = json.dumps([agent, model, temperature, text], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, agent: str, field: str) -> None:
+        counters = self._stats.setdefault(agent, {"exact_hits": 0, "similar_hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            vectors = self._vectors.get(entry[2])
+            if vectors is not None:
+                vectors.pop(key, None)
+
+    def _embed(self, agent: str, text: str) -> Optional[np.ndarray]:
+        if agent not in self.similarity_agents:
+            return None
+        try:
+            vector = np.asarray(self.embed(text), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Не удалось получить эмбеддинг промпта для кэша LLM: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def lookup(self, agent: str, model: str, temperature: Any, messages: List[Any]) -> Tuple[Optional[str], str, Optional[np.ndarray]]:
+        """Ищет ответ в кэше.
+
+        Returns:
+            Кортеж (текст ответа или None, ключ записи, эмбеддинг промпта для `store`).
+        """
+        text = messages_text(messages)
+        key = self.key(agent, model, temperature, text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self._count(agent, "exact_hits")
+                return entry[0], key, None
+            if entry is not None:
+                self._drop(key)
+
+        vector = self._embed(agent, text)
+        if vector is not None:
+            scope = (agent, model)
+            with self._lock:
+                vectors = self._vectors.get(scope)
+                if vectors:
+                    keys = list(vectors.keys())
+                    scores = np.stack(list(vectors.values())) @ vector
+                    best = int(np.argmax(scores))
+                    entry = self._entries.get(keys[best])
+                    if scores[best] >= self.similarity_threshold and entry is not None and entry[1] > now:
+                        self._entries.move_to_end(keys[best])
+                        self._count(agent, "similar_hits")
+                        return entry[0], key, vector
+
+        with self._lock:
+            self._count(agent, "misses")
+        return None, key, vector
+
+    def store(self, agent: str, model: str, key: str, response: str, vector: Optional[np.ndarray] = None) -> None:
+        """Сохраняет ответ модели (пустые ответы не кэшируются)."""
+        if not response:
+            return
+        scope = (agent, model)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (response, time.time() + self.ttl_seconds, scope)
+            if vector is not None:
+                self._vectors.setdefault(scope, OrderedDict())[key] = vector
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Счётчики попаданий по агентам и размер кэша."""
+        with self._lock:
+            agents = {}
+            for agent, counters in self._stats.items():
+                total = sum(counters.values())
+                hits = counters["exact_hits"] + counters["similar_hits"]
+                agents[agent] = {**counters, "hit_rate": round(hits / total, 4) if total else 0.0}
+            return {"size": len(self._entries), "max_size": self.max_size, "agents": agents}
@@ -0,0 +1,175 @@
+"""
+Метрики вызовов LLM в формате Prometheus.
+
+`invoke_llm`/`ainvoke_llm` записывают для каждого вызова агента задержку,
+токены промпта и ответа, число повторных HTTP-попыток и исход (ok, error,
+cache_hit); агенты отмечают резервные ветки через `record_fallback`.
+Метрики процессные: при нескольких воркерах каждый отдаёт свои значения.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+RETRY_BUCKETS = (0, 1, 2, 3, 5)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Счётчик Prometheus с метками."""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Гистограмма Prometheus с метками (накопительные бакеты, _sum и _count)."""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {_format_value(count)}")
+                labels = _format_labels(self.label_names, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {_format_value(series[-1])}")
+                plain = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{plain} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{plain} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Набор метрик процесса, отдаваемый endpoint `/metrics`."""
+
+    def __init__(self) -> None:
+        self._metrics: List[object] = []
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, label_names: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+LLM_LATENCY = REGISTRY.histogram(
+    "ai_hr_llm_request_duration_seconds", "Длительность вызова LLM агентом", ("agent", "model", "outcome")
+)
+LLM_PROMPT_TOKENS = REGISTRY.histogram(
+    "ai_hr_llm_prompt_tokens", "Токены промпта на вызов LLM", ("agent", "model"), TOKEN_BUCKETS
+)
+LLM_COMPLETION_TOKENS = REGISTRY.histogram(
+    "ai_hr_llm_completion_tokens", "Токены ответа на вызов LLM", ("agent", "model"), TOKEN_BUCKETS
+)
+LLM_RETRIES = REGISTRY.histogram(
+    "ai_hr_llm_retries", "Повторные HTTP-попытки на вызов LLM", ("agent", "model"), RETRY_BUCKETS
+)
+LLM_FALLBACKS = REGISTRY.counter(
+    "ai_hr_llm_fallbacks_total", "Срабатывания резервных веток агентов", ("agent", "reason")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "ai_hr_http_request_duration_seconds", "Длительность обработки HTTP-запроса API", ("method", "route", "status")
+)
+
+
+def _usage_tokens(response: object) -> Tuple[Optional[int], Optional[int]]:
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage:
+        return usage.get("input_tokens"), usage.get("output_tokens")
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens"), token_usage.get("completion_tokens")
+
+
+def record_llm_call(agent: str, model: str, seconds: float, outcome: str, response: object = None, attempts: int = 1) -> None:
+    """Записывает метрики одного вызова LLM.
+
+    Args:
+        agent: Имя агента.
+        model: Имя модели.
+        seconds: Длительность вызова.
+        outcome: `ok`, `error` или `cache_hit`.
+        response: Ответ модели (для подсчёта токенов).
+        attempts: Число HTTP-запросов, выполненных клиентом за вызов.
+    """
+    LLM_LATENCY.observe(seconds, agent=agent, model=model, outcome=outcome)
+    if outcome == "cache_hit":
+        return
+    LLM_RETRIES.observe(max(0, attempts - 1), agent=agent, model=model)
+    prompt_tokens, completion_tokens = _usage_tokens(response)
+    if prompt_tokens is not None:
+        LLM_PROMPT_TOKENS.observe(prompt_tokens, agent=agent, model=model)
+    if completion_tokens is not None:
+        LLM_COMPLETION_TOKENS.observe(completion_tokens, agent=agent, model=model)
+
+
+def record_fallback(agent: str, reason: str) -> None:
+    """Отмечает срабатывание резервной ветки агента (ошибка LLM, неразборчивый ответ и т.п.)."""
+    LLM_FALLBACKS.inc(agent=agent, reason=reason)
+
+
+def render_metrics() -> str:
+    """Текст метрик в формате Prometheus exposition."""
+    return REGISTRY.render()
@@ -64,13 +64,16 @@ def resume_question_prompt() -> ChatPromptTemplate:
         - Вопрос должен опираться на конкретику из резюме/JD (например, технологии, метрики, домен).
         - Формулировка нейтральна (без упоминания уровня/должности), профессиональная, на русском.
         - Допустимо затрагивать HARD и SOFT аспекты, если это логично из контекста.
-        - Никаких преамбул/пояснений/списков/ответов — только текст вопроса одной строкой без кавычек вокруг всего вопроса.
+        - Никаких преамбул/пояснений/списков/ответов — в поле question только текст вопроса одной строкой без кавычек вокруг всего вопроса.
         - Не используй термины нерелевантных доменов, если это явно не следует из роли или резюме/JD.
 
         ПРОВЕРЬ ПЕРЕД ГЕНЕРАЦИЕЙ:
         - Опирается ли вопрос на факты из резюме/JD, конкретен ли он?
         - Нейтральен ли (без уровней/должностей) и уместен ли для контекста роли?
         - Строго одна строка, без преамбул, на русском и профессионально.
+
+        ФОРМАТ ОТВЕТА — строго валидный JSON без Markdown, ключи именно в этом порядке:
+        {{"optimal_time": <целое число секунд на подробный, развёрнутый ответ с примерами с учётом роли/грейда, обычно от 120 до 600>, "question": "<текст вопроса одной строкой>"}}
         """
     )
 
@@ -84,6 +87,7 @@ def llm_question_prompt() -> ChatPromptTemplate:
         {alignment}
 
         КОНТЕКСТ:
+        - Роль: {role}
         - Предыдущий вопрос: {current_question}
         - Ответ кандидата: {last_answer}
         - Номер вопроса: {question_number}
@@ -96,7 +100,7 @@ def llm_question_prompt() -> ChatPromptTemplate:
         5. Если тема Python - спрашивай про разные области: структуры данных, алгоритмы, библиотеки, паттерны
         6. Если тема ML - чередуй теорию, алгоритмы, метрики, практические задачи
         7. Не упоминай уровень или должность кандидата. Не добавляй преамбулы, подсказки, ответы или списки.
-        8. ВОЗВРАЩАЙ ТОЛЬКО ОДИН краткий вопрос одной строкой без лишнего текста.
+        8. В поле question — ТОЛЬКО ОДИН краткий вопрос одной строкой без лишнего текста.
         9. Избегай общих вопросов.
         10. Разбавляй формулировки словами, чтобы симулировать живое общение.
 
@@ -115,6 +119,9 @@ def llm_question_prompt() -> ChatPromptTemplate:
         - Достаточно ли он конкретен (без общих фраз) и разнообразен по типу формулировки?
         - Соблюден ли формат: одна строка, без преамбул/пояснений/списков/ответов?
         - Нейтрален ли он (без упоминания уровня/должности), на русском и профессионально сформулирован?
+
+        ФОРМАТ ОТВЕТА — строго валидный JSON без Markdown, ключи именно в этом порядке:
+        {{"optimal_time": <целое число секунд на подробный, развёрнутый ответ с примерами с учётом роли/грейда, обычно от 120 до 600>, "question": "<текст вопроса одной строкой>"}}
         """
     )
 
@@ -254,6 +261,7 @@ def get_hint_promt() -> ChatPromptTemplate:
         {alignment}
 
         Контекст:
+        - Роль: {role}
         - Тема: {topic}
         - Предыдущий вопрос: {prev_question}
         - Ответ кандидата: {last_answer}
@@ -261,7 +269,7 @@ def get_hint_promt() -> ChatPromptTemplate:
         - Номер вопроса: {question_number}
 
         Требования:
-        1) Верни ТОЛЬКО ОДИН краткий вопрос одной строкой.
+        1) В поле question — ТОЛЬКО ОДИН краткий вопрос одной строкой.
         2) Не используй явные подсказки типа "обратите внимание", "подумайте о" и т.п.
         3) Сформулируй вопрос так, чтобы он мягко подталкивал осветить упущенный аспект через конкретику.
         4) Не повторяй дословно предыдущий вопрос — измени угол, уточни формулировку, добавь критерий или ограничение.
@@ -271,5 +279,58 @@ def get_hint_promt() -> ChatPromptTemplate:
         - Вопрос ненавязчивый (без прямых подсказок) и адресует указанный пробел.
         - Формулировка отличается от предыдущей и стимулирует конкретику.
         - Строго одна строка, без пояснений, на русском, нейтральным тоном.
+
+        ФОРМАТ ОТВЕТА — строго валидный JSON без Markdown, ключи именно в этом порядке:
+        {{"optimal_time": <целое число секунд на подробный, развёрнутый ответ с примерами с учётом роли/грейда, обычно от 120 до 600>, "question": "<текст вопроса одной строкой>"}}
+        """
+        )
+
+
+def optimal_time_batch_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_template(
+        """
+        Ты ассистент интервьюера. Оцени оптимальное время ответа на каждый из вопросов с учётом роли/грейда.
+        Времени должно хватить на подробный, развёрнутый ответ с примерами и пояснениями, обычно от 120 до 600 секунд.
+
+        Роль/грейд: {role}
+
+        Вопросы:
+        {questions}
+
+        Верни ТОЛЬКО валидный JSON без Markdown: {{"times": [<целое число секунд для вопроса 1>, <для вопроса 2>, ...]}}
+        Количество и порядок чисел строго совпадают с вопросами.
+        """
+    )
+
+def vacancy_plan_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_template(
         """
-        )
\ No newline at end of file
+        Ты — опытный технический интервьюер. Сформируй шаблон плана собеседования для вакансии.
+        Шаблон используется для всех кандидатов этой вакансии, поэтому опирайся только на описание вакансии.
+
+        Политика выравнивания:\n
+        {alignment}
+
+        Роль: {role}
+        Описание вакансии: {job_description}
+
+        Требования к плану:
+        1. Первая тема — обсуждение резюме и прошлого опыта (Resume Discussion - так и назови этот топик).
+        2. Остальные темы строго релевантны описанию вакансии и идут от общих к более специфическим.
+        3. Покрыть как HARD-навыки (технологии, инструменты, методологии), так и SOFT-навыки.
+        4. Формулировки тем нейтральные: не указывай уровень или должность кандидата напрямую.
+        5. Темы не повторяются, обычно их 4-7.
+        6. opening_question — первый вопрос секции Resume Discussion: короткий, приглашает рассказать
+           об опыте, наиболее близком к задачам вакансии, и подходит любому кандидату.
+
+        Верни ТОЛЬКО валидный JSON вида (строго без Markdown, без комментариев, без лишнего текста и хвостовых запятых):
+        {{
+            "topics": [
+            {{"name": "Resume Discussion", "description": "Обсуждение опыта и проектов из резюме"}},
+            {{"name": "Core Skills", "description": "Ключевые HARD-навыки для роли"}}
+            ],
+            "interview_style": "conversational",
+            "opening_question": {{"optimal_time": <целое число секунд на развёрнутый ответ, обычно от 120 до 600>, "question": "<текст вопроса одной строкой>"}}
+        }}
+        """
+    )
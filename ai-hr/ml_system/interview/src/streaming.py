@@ -0,0 +1,147 @@
+"""
+Потоковая выдача генерируемого вопроса (SSE).
+
+Обработчик API привязывает к текущему контексту `QuestionStream`
+(`bind_question_stream`); `ainvoke_llm` для агентов генерации вопросов читает
+ответ модели через `astream` и передаёт фрагменты в поток. Модель отвечает JSON
+вида {"optimal_time": ..., "question": "..."}, поэтому `QuestionTextExtractor`
+выделяет из фрагментов только текст вопроса, и TTS может начинать озвучку
+до окончания генерации.
+"""
+import asyncio
+import json
+import re
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+# Только из utils: llm.py импортирует этот модуль, а timing.py — llm.py
+from .utils import clamp_optimal_time
+
+STREAM_AGENTS = ("question", "hint", "resume_question")
+
+_QUESTION_START = re.compile(r'"question"\s*:\s*"')
+_OPTIMAL_TIME = re.compile(r'"optimal_time"\s*:\s*(\d+)\s*[,}]')
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+_current_stream: ContextVar[Optional["QuestionStream"]] = ContextVar("question_stream", default=None)
+
+
+class QuestionTextExtractor:
+    """Инкрементально извлекает значение поля `question` из потока JSON-фрагментов."""
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.emitted = ""
+        self.optimal_time: Optional[int] = None
+        self.closed = False
+        self._start: Optional[int] = None
+
+    def _decode(self) -> str:
+        text = self.buffer[self._start:]
+        chars = []
+        i = 0
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                self.closed = True
+                break
+            if char == "\\":
+                if i + 1 >= len(text):
+                    break
+                code = text[i + 1]
+                if code == "u":
+                    if i + 6 > len(text):
+                        break
+                    try:
+                        chars.append(chr(int(text[i + 2:i + 6], 16)))
+                    except ValueError:
+                        pass
+                    i += 6
+                    continue
+                chars.append(_ESCAPES.get(code, code))
+                i += 2
+                continue
+            chars.append(char)
+            i += 1
+        return "".join(chars)
+
+    def feed(self, chunk: str) -> Tuple[str, Optional[int]]:
+        """Добавляет фрагмент ответа модели.
+
+        Returns:
+            Кортеж (новый текст вопроса, время на ответ — если оно только что стало известно).
+        """
+        if self.closed:
+            return "", None
+        self.buffer += chunk
+
+        new_time = None
+        if self.optimal_time is None:
+            match = _OPTIMAL_TIME.search(self.buffer)
+            if match:
+                self.optimal_time = new_time = clamp_optimal_time(match.group(1))
+
+        if self._start is None:
+            match = _QUESTION_START.search(self.buffer)
+            if not match:
+                return "", new_time
+            self._start = match.end()
+
+        decoded = self._decode()
+        delta = decoded[len(self.emitted):]
+        self.emitted = decoded
+        return delta, new_time
+
+
+class QuestionStream:
+    """Очередь событий потоковой выдачи одного хода интервью.
+
+    Потоково выдаётся только первая генерация вопроса за ход; финальный текст
+    вопроса приходит в событии `done` и является основным (после постобработки).
+    """
+
+    def __init__(self) -> None:
+        self.queue: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = asyncio.Queue()
+        self.generation_done = False
+        self._extractor = QuestionTextExtractor()
+
+    @property
+    def accepts_tokens(self) -> bool:
+        return not self.generation_done
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        self.queue.put_nowait((event, data))
+
+    def feed(self, chunk: str) -> None:
+        delta, optimal_time = self._extractor.feed(chunk)
+        if optimal_time is not None:
+            self.emit("meta", {"optimal_time": optimal_time})
+        if delta:
+            self.emit("token", {"text": delta})
+
+    def finish_generation(self) -> None:
+        self.generation_done = True
+
+    def close(self) -> None:
+        self.queue.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            yield item
+
+
+def bind_question_stream(stream: Optional[QuestionStream]) -> None:
+    """Привязывает поток к текущему контексту (задаче asyncio); None отключает потоковую выдачу."""
+    _current_stream.set(stream)
+
+
+def current_question_stream() -> Optional[QuestionStream]:
+    return _current_stream.get()
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Форматирует событие Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
@@ -0,0 +1,154 @@
+"""
+Время на ответ (optimal_time) для вопросов интервью.
+
+Для генерируемых вопросов время приходит полем `optimal_time` в том же
+JSON-ответе модели, что и сам вопрос. Для вопросов из базы знаний (RAG) текст
+статичен, поэтому время оценивается один раз пакетным запросом и кэшируется
+по (id вопроса, роль).
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .llm import ainvoke_llm, invoke_llm, render_prompt, response_text
+from .prompts import optimal_time_batch_prompt
+from .utils import clamp_optimal_time, parse_llm_json
+
+logger = logging.getLogger(__name__)
+
+def heuristic_optimal_time(question_text: str) -> int:
+    """Резервная оценка времени на ответ по длине вопроса (без обращения к LLM)."""
+    return max(45, min(240, 60 + len((question_text or "").split()) // 3))
+
+
+def parse_question_payload(raw: str) -> Tuple[str, Optional[int]]:
+    """Разбирает ответ генерации вопроса вида {"optimal_time": ..., "question": ...}.
+
+    Если модель вернула не JSON, весь текст считается вопросом, а время — неизвестным.
+    """
+    try:
+        payload = parse_llm_json(raw)
+    except Exception:
+        return raw, None
+    if not isinstance(payload, dict) or not isinstance(payload.get("question"), str):
+        return raw, None
+    return payload["question"], clamp_optimal_time(payload.get("optimal_time"))
+
+
+class OptimalTimeCache:
+    """Процессный LRU-кэш времени на ответ для статичных вопросов: (id вопроса, роль) -> секунды."""
+
+    def __init__(self, max_size: int = 10000) -> None:
+        self.max_size = max_size
+        self._items: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(question_id: str, role: Optional[str]) -> Tuple[str, str]:
+        return str(question_id), (role or "").strip().lower()
+
+    def get(self, question_id: str, role: Optional[str]) -> Optional[int]:
+        key = self._key(question_id, role)
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, question_id: str, role: Optional[str], seconds: int) -> None:
+        key = self._key(question_id, role)
+        with self._lock:
+            self._items[key] = seconds
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def missing(self, questions: List[Dict[str, Any]], role: Optional[str]) -> List[Dict[str, Any]]:
+        """Возвращает вопросы (без повторов), для которых время ещё не закэшировано."""
+        seen = set()
+        result = []
+        for question in questions:
+            question_id = question.get("id")
+            if not question_id or question_id in seen or self.get(question_id, role) is not None:
+                continue
+            seen.add(question_id)
+            result.append(question)
+        return result
+
+
+_optimal_time_cache = OptimalTimeCache()
+
+
+def get_optimal_time_cache() -> OptimalTimeCache:
+    """Возвращает процессный кэш времени на ответ для вопросов базы знаний."""
+    return _optimal_time_cache
+
+
+def _batch_messages(role: Optional[str], questions: List[Dict[str, Any]]) -> List[Any]:
+    numbered = "\n".join(f"{i + 1}. {q.get('content', '')}" for i, q in enumerate(questions))
+    return render_prompt(optimal_time_batch_prompt(), {"role": role or "не указан", "questions": numbered})
+
+
+def _store_batch(role: Optional[str], questions: List[Dict[str, Any]], response: Any) -> None:
+    cache = get_optimal_time_cache()
+    try:
+        times = parse_llm_json(response_text(response)).get("times", [])
+    except Exception as e:
+        logger.warning(f"Не удалось разобрать пакетную оценку времени ({e}), используется эвристика")
+        times = []
+    for i, question in enumerate(questions):
+        seconds = clamp_optimal_time(times[i]) if i < len(times) else None
+        cache.put(question["id"], role, seconds or heuristic_optimal_time(question.get("content", "")))
+
+
+def precompute_optimal_times(llm: Any, role: Optional[str], questions: List[Dict[str, Any]]) -> int:
+    """Оценивает одним запросом время для ещё не закэшированных вопросов.
+
+    Args:
+        llm: Чат-модель LangChain.
+        role: Роль кандидата (время зависит от роли/грейда).
+        questions: Вопросы с ключами `id` и `content` (например, шорт-листы тем).
+
+    Returns:
+        Количество вопросов, для которых время было вычислено.
+    """
+    pending = get_optimal_time_cache().missing(questions, role)
+    if not pending:
+        return 0
+    try:
+        response = invoke_llm(llm, _batch_messages(role, pending), agent="optimal_time")
+    except Exception as e:
+        logger.warning(f"Ошибка пакетной оценки времени ({e}), используется эвристика")
+        response = None
+    _store_batch(role, pending, response)
+    return len(pending)
+
+
+async def aprecompute_optimal_times(llm: Any, role: Optional[str], questions: List[Dict[str, Any]]) -> int:
+    """Асинхронная версия `precompute_optimal_times`."""
+    pending = get_optimal_time_cache().missing(questions, role)
+    if not pending:
+        return 0
+    try:
+        response = await ainvoke_llm(llm, _batch_messages(role, pending), agent="optimal_time")
+    except Exception as e:
+        logger.warning(f"Ошибка пакетной оценки времени ({e}), используется эвристика")
+        response = None
+    _store_batch(role, pending, response)
+    return len(pending)
+
+
+def seed_optimal_times(role: Optional[str], pairs: Optional[List[List[Any]]]) -> None:
+    """Загружает в кэш заранее посчитанные пары (id вопроса, секунды), например из шаблона плана вакансии."""
+    cache = get_optimal_time_cache()
+    for question_id, seconds in pairs or []:
+        seconds = clamp_optimal_time(seconds)
+        if question_id and seconds is not None:
+            cache.put(question_id, role, seconds)
+
+
+def cached_optimal_time(question_id: str, role: Optional[str], question_text: str) -> int:
+    """Время на ответ для статичного вопроса: из кэша либо эвристика (без вызова LLM)."""
+    seconds = get_optimal_time_cache().get(question_id, role)
+    return seconds if seconds is not None else heuristic_optimal_time(question_text)
@@ -1,6 +1,9 @@
 import json
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+MIN_OPTIMAL_TIME = 15
+MAX_OPTIMAL_TIME = 600
 
 
 def strip_md_fences(text: str) -> str:
@@ -27,3 +30,12 @@ def parse_llm_json(raw: str) -> Dict[str, Any]:
         e = text.rfind("}") + 1
         text = text[s:e]
     return json.loads(text)
+
+
+def clamp_optimal_time(value: Any) -> Optional[int]:
+    """Приводит значение к целому числу секунд в допустимых границах; None, если это не число."""
+    try:
+        seconds = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return max(MIN_OPTIMAL_TIME, min(MAX_OPTIMAL_TIME, seconds))
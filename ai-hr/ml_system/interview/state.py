@@ -1,5 +1,6 @@
 from typing import TypedDict, Annotated, List, Dict, Optional, Set, Any
-from langgraph.graph import add_messages
+
+from ml_system.interview.turn_log import add_recent_messages
 
 class InterviewState(TypedDict):
     """Состояние интервью для LangGraph"""
@@ -13,9 +14,12 @@ class InterviewState(TypedDict):
     current_question: Optional[Dict]
     last_candidate_answer: Optional[str]
 
-    messages: Annotated[list, add_messages]
+    messages: Annotated[list, add_recent_messages]
 
     answer_evaluations: List[Dict]
+    turn_log: List[List[Any]]
+    report_notes: Dict[str, List[str]]
+    topic_stats: Dict[str, Dict[str, Any]]
 
     questions_asked_count: int
     questions_in_current_topic: int
@@ -23,6 +27,8 @@ class InterviewState(TypedDict):
     hints_given_count: int
     current_topic_index: int
     asked_question_ids: Set[str]
+    topic_shortlists: Optional[Dict[str, List[Dict]]]
+    plan_template: Optional[Dict]
 
     final_recommendation: Optional[str]
     report: Optional[str]
@@ -0,0 +1,295 @@
+"""
+Хранилища состояния интервью для API.
+
+Запись интервью (состояние `InterviewState`, статус, текущий шаг, id вакансии,
+версия базы вопросов вакансии, id собеседования в backend и статус отложенного отчёта)
+сериализуется в компактный JSON: множества становятся списками, сообщения
+LangChain — парами (тип, текст). Объекты `InterviewSystem` в запись не попадают —
+API восстанавливает их по `vacancy_id`, поэтому интервью можно продолжать
+на любом воркере и после перезапуска сервиса.
+
+Каждая запись несёт номер версии: `save` выполняет compare-and-swap и бросает
+`StateConflictError`, если запись успели изменить в другом процессе.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+STATE_STORE_KIND = os.getenv("AI_HR_STATE_STORE", "auto").lower()
+STATE_TTL_SECONDS = int(os.getenv("AI_HR_STATE_TTL_SECONDS", "86400"))
+STATE_COMPLETED_TTL_SECONDS = int(os.getenv("AI_HR_STATE_COMPLETED_TTL_SECONDS", "21600"))
+STATE_MAX_INTERVIEWS = int(os.getenv("AI_HR_STATE_MAX_INTERVIEWS", "1000"))
+STATE_SQLITE_PATH = os.getenv("AI_HR_STATE_SQLITE_PATH", "./cache/interview_state.sqlite3")
+
+SET_FIELDS = ("asked_question_ids", "completed_topics")
+
+_MESSAGE_TYPES = {"ai": AIMessage, "human": HumanMessage, "system": SystemMessage}
+
+
+class StateConflictError(RuntimeError):
+    """Запись интервью изменена другим процессом после чтения."""
+
+
+def serialize_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Приводит `InterviewState` к JSON-совместимому виду."""
+    data = dict(state)
+    for field in SET_FIELDS:
+        if isinstance(data.get(field), (set, frozenset)):
+            data[field] = sorted(data[field], key=str)
+    data["messages"] = [
+        [getattr(message, "type", "human"), getattr(message, "content", str(message))]
+        for message in data.get("messages") or []
+    ]
+    return data
+
+
+def deserialize_state(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Восстанавливает `InterviewState` из результата `serialize_state`."""
+    state = dict(data)
+    for field in SET_FIELDS:
+        state[field] = set(state.get(field) or [])
+    state["messages"] = [
+        _MESSAGE_TYPES.get(kind, HumanMessage)(content=content)
+        for kind, content in state.get("messages") or []
+    ]
+    return state
+
+
+def dumps_record(record: Dict[str, Any]) -> str:
+    """Сериализует запись интервью в компактную JSON-строку (без служебных полей API).
+
+    Raises:
+        TypeError: В состоянии есть значение, не представимое в JSON (оно не
+            подменяется строкой, чтобы не потерять данные молча).
+    """
+    created_at = record.get("created_at")
+    payload = {
+        "state": serialize_state(record["state"]),
+        "status": record.get("status"),
+        "current_step": record.get("current_step"),
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        "vacancy_id": record.get("vacancy_id"),
+        "knowledge_version": record.get("knowledge_version"),
+        "external_id": record.get("external_id"),
+        "report_status": record.get("report_status"),
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads_record(text: str, version: int) -> Dict[str, Any]:
+    """Разбирает запись интервью, сохранённую `dumps_record`."""
+    payload = json.loads(text)
+    created_at = payload.get("created_at")
+    return {
+        "state": deserialize_state(payload["state"]),
+        "status": payload.get("status"),
+        "current_step": payload.get("current_step"),
+        "created_at": datetime.fromisoformat(created_at) if created_at else datetime.now(),
+        "vacancy_id": payload.get("vacancy_id"),
+        "knowledge_version": payload.get("knowledge_version"),
+        "external_id": payload.get("external_id"),
+        "report_status": payload.get("report_status"),
+        "version": version,
+    }
+
+
+class InMemoryStateStore:
+    """
+    Процессное хранилище: LRU с ограничением размера и TTL.
+
+    Хранит записи в сериализованном виде, поэтому не удерживает ссылки на
+    LLM-клиенты и базы знаний. Подходит для одного воркера.
+    """
+
+    def __init__(self, max_size: int = STATE_MAX_INTERVIEWS, ttl_seconds: int = STATE_TTL_SECONDS) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, Tuple[int, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(interview_id)
+            if item is None:
+                return None
+            version, text, expires_at = item
+            if expires_at <= time.time():
+                del self._items[interview_id]
+                return None
+            self._items.move_to_end(interview_id)
+        return loads_record(text, version)
+
+    def save(self, interview_id: str, record: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        text = dumps_record(record)
+        expected = record.get("version", 0)
+        expires_at = time.time() + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            current = self._items.get(interview_id)
+            if current is not None and expected == 0 and current[2] <= time.time():
+                # Новая запись на месте просроченной (как DELETE перед INSERT в SQLite/MongoDB)
+                current = None
+            if (current[0] if current else 0) != expected:
+                raise StateConflictError(interview_id)
+            self._items[interview_id] = (expected + 1, text, expires_at)
+            self._items.move_to_end(interview_id)
+            while len(self._items) > self.max_size:
+                evicted, _ = self._items.popitem(last=False)
+                logger.info(f"Интервью {evicted} вытеснено из памяти (лимит {self.max_size})")
+        record["version"] = expected + 1
+
+    def delete(self, interview_id: str) -> None:
+        with self._lock:
+            self._items.pop(interview_id, None)
+
+
+class SQLiteStateStore:
+    """
+    Хранилище в локальном файле SQLite (режим WAL).
+
+    Разделяется между воркерами одной машины и переживает перезапуск сервиса.
+    Просроченные записи удаляются при сохранении.
+    """
+
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str = STATE_SQLITE_PATH, ttl_seconds: int = STATE_TTL_SECONDS) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS interview_state ("
+                "id TEXT PRIMARY KEY, version INTEGER NOT NULL, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, data FROM interview_state WHERE id = ? AND expires_at > ?",
+                (interview_id, time.time()),
+            ).fetchone()
+        return loads_record(row[1], row[0]) if row else None
+
+    def save(self, interview_id: str, record: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        text = dumps_record(record)
+        expected = record.get("version", 0)
+        now = time.time()
+        expires_at = now + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            if expected == 0:
+                self._conn.execute("DELETE FROM interview_state WHERE id = ? AND expires_at <= ?", (interview_id, now))
+                try:
+                    self._conn.execute(
+                        "INSERT INTO interview_state (id, version, data, expires_at) VALUES (?, 1, ?, ?)",
+                        (interview_id, text, expires_at),
+                    )
+                except sqlite3.IntegrityError:
+                    self._conn.rollback()
+                    raise StateConflictError(interview_id)
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE interview_state SET version = ?, data = ?, expires_at = ? WHERE id = ? AND version = ?",
+                    (expected + 1, text, expires_at, interview_id, expected),
+                )
+                if cursor.rowcount == 0:
+                    self._conn.rollback()
+                    raise StateConflictError(interview_id)
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM interview_state WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+        record["version"] = expected + 1
+
+    def delete(self, interview_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM interview_state WHERE id = ?", (interview_id,))
+            self._conn.commit()
+
+
+class MongoStateStore:
+    """
+    Хранилище в коллекции MongoDB.
+
+    Общее для всех воркеров и экземпляров сервиса; просроченные записи удаляет
+    TTL-индекс по полю `expires_at`.
+    """
+
+    def __init__(self, collection: Any, ttl_seconds: int = STATE_TTL_SECONDS) -> None:
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        try:
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.warning(f"Не удалось создать TTL-индекс для состояний интервью: {e}")
+
+    def get(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        document = self.collection.find_one({"_id": interview_id, "expires_at": {"$gt": datetime.utcnow()}})
+        return loads_record(document["data"], document["version"]) if document else None
+
+    def save(self, interview_id: str, record: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        from pymongo.errors import DuplicateKeyError
+
+        text = dumps_record(record)
+        expected = record.get("version", 0)
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds or self.ttl_seconds)
+        if expected == 0:
+            self.collection.delete_one({"_id": interview_id, "expires_at": {"$lte": now}})
+            try:
+                self.collection.insert_one({"_id": interview_id, "version": 1, "data": text, "expires_at": expires_at})
+            except DuplicateKeyError:
+                raise StateConflictError(interview_id)
+        else:
+            result = self.collection.update_one(
+                {"_id": interview_id, "version": expected},
+                {"$set": {"version": expected + 1, "data": text, "expires_at": expires_at}},
+            )
+            if result.matched_count == 0:
+                raise StateConflictError(interview_id)
+        record["version"] = expected + 1
+
+    def delete(self, interview_id: str) -> None:
+        self.collection.delete_one({"_id": interview_id})
+
+
+def create_state_store(kind: str = STATE_STORE_KIND, mongo_db: Any = None) -> Any:
+    """Создаёт хранилище состояния интервью.
+
+    Args:
+        kind: `memory`, `sqlite`, `mongo` или `auto` (MongoDB, если передана база, иначе память).
+        mongo_db: База MongoDB для `mongo`/`auto`.
+    """
+    if kind == "auto":
+        kind = "mongo" if mongo_db is not None else "memory"
+    if kind == "mongo":
+        if mongo_db is None:
+            raise ValueError("Для AI_HR_STATE_STORE=mongo требуется подключение к MongoDB")
+        store = MongoStateStore(mongo_db.interview_states)
+    elif kind == "sqlite":
+        store = SQLiteStateStore()
+    elif kind == "memory":
+        store = InMemoryStateStore()
+    else:
+        raise ValueError(f"Неизвестное хранилище состояния интервью: {kind}")
+    logger.info(f"Хранилище состояния интервью: {kind}")
+    return store
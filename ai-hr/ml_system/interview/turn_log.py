@@ -0,0 +1,192 @@
+"""
+Компактный журнал ходов интервью.
+
+Каждый оценённый ответ добавляет в `turn_log` одну запись фиксированной
+структуры (список значений в порядке `TURN_SLOTS`) без текстов вопроса и ответа.
+Полные оценки (с вопросом, ответом и анализом) хранятся только для последних
+`TURN_WINDOW` ходов в `answer_evaluations`, а пункты анализа для отчёта
+накапливаются в `report_notes` с ограничением по числу. Для каждой темы
+в `topic_stats` ведутся накопительные агрегаты (число ответов, суммы оценок,
+серии плохих/средних/хороших ответов), по которым контроллер принимает решения,
+а отчёт строит сводку без повторного прохода по ответам. Стоимость хода и
+размер состояния не зависят от длины интервью.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+from langgraph.graph import add_messages
+
+TURN_WINDOW = int(os.getenv("AI_HR_TURN_WINDOW", "4"))
+REPORT_NOTES_LIMIT = 10
+RECENT_SCORES_LIMIT = 5
+
+POOR_SCORE = 40
+GOOD_SCORE = 80
+
+SCORE_SLOTS = (
+    "technical_accuracy",
+    "depth_of_knowledge",
+    "practical_experience",
+    "communication_clarity",
+    "problem_solving_approach",
+    "examples_and_use_cases",
+)
+TURN_SLOTS = ("topic", "question_id", "score_percent") + SCORE_SLOTS
+NOTE_FIELDS = ("inconsistencies", "red_flags", "strengths", "weaknesses")
+
+_SLOT_INDEX = {name: i for i, name in enumerate(TURN_SLOTS)}
+
+
+def add_recent_messages(left: List[Any], right: List[Any]) -> List[Any]:
+    """Редьюсер `messages`: как `add_messages`, но хранит только реплики последних `TURN_WINDOW` ходов."""
+    return add_messages(left, right)[-2 * TURN_WINDOW:]
+
+
+def make_turn(evaluation: Dict[str, Any], question_id: Optional[str] = None) -> List[Any]:
+    """Сворачивает оценку ответа в запись журнала."""
+    scores = evaluation.get("detailed_scores") or {}
+    return [
+        evaluation.get("topic", "Unknown"),
+        question_id,
+        round(float(evaluation.get("score_percent", 0)), 2),
+    ] + [scores.get(name) for name in SCORE_SLOTS]
+
+
+def turn_value(turn: List[Any], slot: str) -> Any:
+    """Значение поля записи журнала по имени слота."""
+    return turn[_SLOT_INDEX[slot]]
+
+
+def get_turn_log(state: Dict[str, Any]) -> List[List[Any]]:
+    """Журнал ходов состояния.
+
+    Для состояний, сохранённых до появления журнала, он восстанавливается
+    из `answer_evaluations`.
+    """
+    log = state.get("turn_log")
+    if log is None:
+        log = [make_turn(evaluation) for evaluation in state.get("answer_evaluations") or []]
+    return log
+
+
+def _merge_notes(notes: Dict[str, List[str]], analysis: Dict[str, Any]) -> Dict[str, List[str]]:
+    merged = {}
+    for field in NOTE_FIELDS:
+        items = list(notes.get(field) or [])
+        for item in analysis.get(field) or []:
+            if len(items) >= REPORT_NOTES_LIMIT:
+                break
+            if field in ("strengths", "weaknesses") and item in items:
+                continue
+            items.append(item)
+        merged[field] = items
+    return merged
+
+
+def new_topic_stats() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "score_sum": 0.0,
+        "criteria_sums": [0.0] * len(SCORE_SLOTS),
+        "recent_scores": [],
+        "poor_streak": 0,
+        "medium_streak": 0,
+        "good_streak": 0,
+    }
+
+
+def update_topic_stats(stats: Optional[Dict[str, Any]], turn: List[Any]) -> Dict[str, Any]:
+    """Новые агрегаты темы с учётом хода (исходный словарь не изменяется)."""
+    stats = stats or new_topic_stats()
+    score = turn_value(turn, "score_percent") or 0
+    poor, good = score < POOR_SCORE, score >= GOOD_SCORE
+    return {
+        "count": stats["count"] + 1,
+        "score_sum": stats["score_sum"] + score,
+        "criteria_sums": [
+            total + (turn_value(turn, name) or 0) for total, name in zip(stats["criteria_sums"], SCORE_SLOTS)
+        ],
+        "recent_scores": (stats["recent_scores"] + [score])[-RECENT_SCORES_LIMIT:],
+        "poor_streak": stats["poor_streak"] + 1 if poor else 0,
+        "medium_streak": stats["medium_streak"] + 1 if not poor and not good else 0,
+        "good_streak": stats["good_streak"] + 1 if good else 0,
+    }
+
+
+def get_all_topic_stats(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Агрегаты всех тем (для старых состояний — по журналу ходов)."""
+    stats = state.get("topic_stats")
+    if stats is None:
+        stats = {}
+        for turn in get_turn_log(state):
+            topic = turn_value(turn, "topic")
+            stats[topic] = update_topic_stats(stats.get(topic), turn)
+    return stats
+
+
+def get_topic_stats(state: Dict[str, Any], topic: Optional[str]) -> Dict[str, Any]:
+    """Агрегаты темы; для темы без ответов — нулевые."""
+    return get_all_topic_stats(state).get(topic) or new_topic_stats()
+
+
+def average_score(state: Dict[str, Any]) -> Optional[float]:
+    """Средняя итоговая оценка по всем ответам; None, если ответов нет."""
+    stats = get_all_topic_stats(state).values()
+    count = sum(item["count"] for item in stats)
+    return sum(item["score_sum"] for item in stats) / count if count else None
+
+
+def record_evaluation(state: Dict[str, Any], evaluation: Dict[str, Any]) -> Dict[str, Any]:
+    """Обновление состояния для новой оценки ответа.
+
+    Запись добавляется в конец журнала (журнал только растёт и не копируется),
+    окно полных оценок и заметки отчёта пересобираются с ограничением размера.
+    """
+    if state.get("turn_log") is None:
+        state["turn_log"] = get_turn_log(state)
+    log = state["turn_log"]
+    question_id = (state.get("current_question") or {}).get("id")
+    turn = make_turn(evaluation, question_id)
+    stats = dict(get_all_topic_stats(state))
+    stats[turn[0]] = update_topic_stats(stats.get(turn[0]), turn)
+    log.append(turn)
+
+    window = list(state.get("answer_evaluations") or [])[-(TURN_WINDOW - 1):] if TURN_WINDOW > 1 else []
+    window.append(evaluation)
+    notes = _merge_notes(state.get("report_notes") or {}, evaluation.get("analysis") or {})
+    return {"answer_evaluations": window, "turn_log": log, "report_notes": notes, "topic_stats": stats}
+
+
+def last_evaluation(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Последняя полная оценка ответа."""
+    evaluations = state.get("answer_evaluations") or []
+    return evaluations[-1] if evaluations else None
+
+
+def report_notes(state: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Пункты анализа для отчёта (для старых состояний — из окна оценок)."""
+    notes = state.get("report_notes")
+    if notes is None:
+        notes = {}
+        for evaluation in state.get("answer_evaluations") or []:
+            notes = _merge_notes(notes, evaluation.get("analysis") or {})
+    return notes
+
+
+def summarize_topics(stats: Dict[str, Dict[str, Any]]) -> str:
+    """Сводка оценок по темам для промпта отчёта: средние значения по каждой теме."""
+    lines = []
+    for topic, item in stats.items():
+        count = item["count"]
+        if not count:
+            continue
+        criteria = [total / count for total in item["criteria_sums"]]
+        lines.extend([
+            f"• Тема: {topic} (ответов: {count})",
+            f"  - Итоговая оценка: {item['score_sum'] / count:.1f}%",
+            f"  - Техническая точность: {criteria[0]:.1f}/10",
+            f"  - Глубина знаний: {criteria[1]:.1f}/10",
+            f"  - Практический опыт: {criteria[2]:.1f}/10",
+            f"  - Коммуникация: {criteria[3]:.1f}/10",
+        ])
+    return "\n" + "\n".join(lines) + "\n" if lines else ""
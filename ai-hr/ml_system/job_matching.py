@@ -1,10 +1,102 @@
 """Модуль сопоставления резюме с требованиями вакансии."""
 
+import asyncio
 import re
 import os
 import json
-from openai import OpenAI
-from typing import Any, Dict, List, Optional
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from ml_system.interview.src.config import InterviewConfig
+from ml_system.interview.src.llm import LLM_BACKEND, ainvoke_llm, create_chat_llm, invoke_llm, response_text
+from ml_system.semantic_skills import get_semantic_skill_matcher
+from ml_system.skill_matcher import SkillMatcher, get_skill_matcher
+
+logger = logging.getLogger(__name__)
+
+MATCH_LLM_MODEL = os.getenv("AI_HR_LLM_MODEL", "mistralai/mistral-7b-instruct")
+# Кандидаты с эвристической оценкой в этом диапазоне (%) в пакетном режиме дооцениваются LLM
+MATCH_LLM_BAND = tuple(float(x) for x in os.getenv("AI_HR_MATCH_LLM_BAND", "35,75").split(","))
+MATCH_LLM_CONCURRENCY = int(os.getenv("AI_HR_MATCH_LLM_CONCURRENCY", "4"))
+
+_EXPERIENCE_PATTERN = re.compile(r'опыт работы\s*---\s*(\d+)\s*(?:лет|год|года)\s*(\d+)?')
+
+MATCH_SYSTEM_PROMPT = """
+Ты — строгий HR-ассессор. Оцени соответствие резюме требованиям вакансии СТРОГО по РУБРИКЕ и верни ТОЛЬКО валидный JSON.
+
+ТРЕБОВАНИЯ К ВЫВОДУ:
+- Верни исключительно JSON без текста вне JSON, без код-блоков и комментариев.
+- Все числовые оценки — целые проценты 0..100 (НЕ доли).
+- Структура и ключи фиксированы: total_score_percent (int 0..100), details: experience, education, required_skills, optional_skills.
+- Не добавляй новых полей и не меняй названия ключей. Без хвостовых запятых.
+
+ПРАВИЛА ИЗВЛЕЧЕНИЯ:
+- Извлеки стаж (в годах, допускается дробное), уровень образования (нормализуй), наличие каждого навыка из списков.
+- Учитывай ТОЛЬКО явно указанные факты из резюме; если факт не указан прямо — считай отсутствующим (false/0).
+- Не интерпретируй смежные формулировки как наличие конкретного обязательного навыка.
+- Карты навыков ("map") должны содержать ВСЕ навыки из соответствующих списков вакансии; значения — строго true/false.
+
+РУБРИКА (оценки в процентах 0..100):
+- required_skills (вес weight_required): доля найденных обязательных навыков (округляй до целого).
+• Если не найден НИ ОДИН обязательный — required_skills.score = 0 и итоговый total_score_percent ≤ 25.
+• Если покрытие < 50% обязательных — итоговый total_score_percent ≤ 60.
+• Если покрытие 50..75% — итоговый total_score_percent ≤ 70.
+- optional_skills (вес weight_optional): доля найденных доп. навыков (округляй до целого). Если список пуст — score = 100, "map" = {}.
+- experience (вес weight_experience):
+• Если опыт не указан или равен 0 → score = 0.
+• Если опыт < min: score ≈ 60 при недостаче ≤ 1 год, линейно снижается до 0 при большей недостаче.
+• Если задан max и опыт > max: штраф до −10 п.п. (нижняя граница 90).
+• Иначе score = 100.
+- education (вес weight_education): 100 при точном соответствии требованию, иначе 0. Если требование не задано — 100.
+
+ФИНАЛЬНЫЙ БАЛЛ:
+- final = required_skills.score * weight_required + optional_skills.score * weight_optional + experience.score * weight_experience + education.score * weight_education.
+- Верни total_score_percent = ceil(final), ограничив 0..100 и применив ограничения по покрытию обязательных навыков (см. выше).
+
+ГРАНИЧНЫЕ СЛУЧАИ:
+- Пустое или крайне короткое резюме → все секции 0, total_score_percent = 0.
+"""
+
+MATCH_USER_PROMPT = """
+<VACANCY>
+<REQUIRED_SKILLS>{required_skills}</REQUIRED_SKILLS>
+<OPTIONAL_SKILLS>{optional_skills}</OPTIONAL_SKILLS>
+<MIN_EXPERIENCE>{min_experience}</MIN_EXPERIENCE>
+<MAX_EXPERIENCE>{max_experience}</MAX_EXPERIENCE>
+<EDUCATION_REQUIRED>{education_required}</EDUCATION_REQUIRED>
+<JOB_DESCRIPTION>{job_description}</JOB_DESCRIPTION>
+<WEIGHTS>required={weights_required};optional={weights_optional};experience={weights_experience};education={weights_education}</WEIGHTS>
+</VACANCY>
+
+<RESUME_RAW>
+{resume}
+</RESUME_RAW>
+
+ФОРМАТ ВЫХОДА (ровно такой JSON, без комментариев и лишнего текста):
+{{
+    "total_score_percent": 0,
+    "details": {{
+        "experience": {{"candidate_has_years": 0.0, "score": 0}},
+        "education": {{"candidate_has": "", "score": 0}},
+        "required_skills": {{"map": {{}}, "score": 0}},
+        "optional_skills": {{"map": {{}}, "score": 0}}
+    }}
+}}
+"""
+
+
+def _skill_hits(skills: List[str], hits: Dict[str, List[Any]]) -> Dict[str, List[List[int]]]:
+    """Позиции найденных навыков для подсветки в резюме: {навык: [[начало, конец], ...]}."""
+    return {skill: [list(span) for span in hits[skill.lower()]] for skill in skills if skill and skill.lower() in hits}
+
+
+def _semantic_only(skills: List[str], hits: Dict[str, List[Any]], semantic: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Навыки, найденные только семантически: {навык: {"phrase", "similarity"}}."""
+    return {skill: semantic[skill] for skill in skills if skill in semantic and skill.lower() not in hits}
 
 
 class FlexibleResumeMatcher:
@@ -40,6 +132,10 @@ class FlexibleResumeMatcher:
         self.max_experience = max_experience
         self.education_required = education_required
         self.job_description = job_description
+        # Один матчер на обязательные и желательные навыки (кэшируется по набору навыков)
+        self.skill_matcher = get_skill_matcher(tuple(required_skills) + tuple(optional_skills))
+        # Семантическое сопоставление навыков (None, если выключено или нет модели эмбеддингов)
+        self.semantic_matcher = get_semantic_skill_matcher(tuple(required_skills) + tuple(optional_skills))
         # Веса критериев с безопасными значениями по умолчанию
         self.weights = weights or {
             "required_skills": 0.5,
@@ -54,12 +150,12 @@ class FlexibleResumeMatcher:
         Ожидает паттерн вида: "опыт работы --- <годы> лет <месяцы>".
 
         Args:
-            text: Текст резюме.
+            text: Текст резюме в нижнем регистре.
 
         Returns:
             Оцененный стаж в годах (с учетом месяцев).
         """
-        match = re.search(r'опыт работы\s*---\s*(\d+)\s*(?:лет|год|года)\s*(\d+)?', text.lower())
+        match = _EXPERIENCE_PATTERN.search(text)
         if match:
             years = int(match.group(1))
             months = int(match.group(2)) if match.group(2) else 0
@@ -70,15 +166,14 @@ class FlexibleResumeMatcher:
         """Извлекает уровень образования из текста резюме.
 
         Args:
-            text: Текст резюме.
+            text: Текст резюме в нижнем регистре.
 
         Returns:
             Нормализованное значение уровня образования.
         """
-        text_lower = text.lower()
-        if "высшее" in text_lower:
+        if "высшее" in text:
             return "высшее"
-        elif "среднее специальное" in text_lower or "колледж" in text_lower:
+        elif "среднее специальное" in text or "колледж" in text:
             return "среднее специальное"
         return "не указано"
 
@@ -92,42 +187,80 @@ class FlexibleResumeMatcher:
         Returns:
             Словарь {навык: найден ли в тексте}.
         """
-        text_lower = text.lower()
-        return {skill: bool(re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower)) for skill in skills}
+        return SkillMatcher.skills_map(skills, self.skill_matcher.find(text))
 
-    def _fallback_rule_based(self, resume_text: str) -> Dict[str, Any]:
-        """Резервная эвристическая оценка соответствия без использования LLM.
+    def extract_features(self, resumes: Sequence[str]) -> Dict[str, Any]:
+        """Признаки пакета резюме за один проход по текстам.
 
         Args:
-            resume_text: Сырой текст резюме.
+            resumes: Сырые тексты резюме.
 
         Returns:
-            Структура с итоговым баллом и деталями по критериям.
+            Словарь массивов: `experience` (стаж, float), `education` (уровень),
+            `required`/`optional` (булевы матрицы «резюме × навык»: точное или
+            семантическое совпадение), `hits` — позиции точных совпадений
+            и `semantic` — обоснования семантических совпадений по каждому резюме.
+        """
+        experience = np.zeros(len(resumes))
+        education = []
+        required = np.zeros((len(resumes), len(self.required_skills)), dtype=bool)
+        optional = np.zeros((len(resumes), len(self.optional_skills)), dtype=bool)
+        hits_list = []
+        for i, resume_text in enumerate(resumes):
+            text_lower = resume_text.lower()
+            experience[i] = self._extract_experience(text_lower)
+            education.append(self._extract_education(text_lower))
+            hits = self.skill_matcher.find(text_lower, lowered=True)
+            hits_list.append(hits)
+            required[i] = [bool(skill) and skill.lower() in hits for skill in self.required_skills]
+            optional[i] = [bool(skill) and skill.lower() in hits for skill in self.optional_skills]
+
+        semantic = [{} for _ in resumes]
+        if self.semantic_matcher is not None and len(resumes):
+            found, semantic = self.semantic_matcher.match(resumes)
+            required |= found[:, :len(self.required_skills)]
+            optional |= found[:, len(self.required_skills):]
+        return {
+            "experience": experience,
+            "education": education,
+            "required": required,
+            "optional": optional,
+            "hits": hits_list,
+            "semantic": semantic,
+        }
+
+    def score_rule_based(self, resumes: Sequence[str]) -> List[Dict[str, Any]]:
+        """Эвристическая оценка пакета резюме без LLM.
+
+        Частные оценки и взвешенная сумма считаются векторно по всему пакету.
+
+        Args:
+            resumes: Сырые тексты резюме.
+
+        Returns:
+            Результаты в порядке `resumes`: итоговый балл и детали по критериям.
         """
-        candidate_exp = self._extract_experience(resume_text)
-        candidate_edu = self._extract_education(resume_text)
-        required_skills_map = self._check_skills(resume_text, self.required_skills)
-        optional_skills_map = self._check_skills(resume_text, self.optional_skills)
-
-        req_found = sum(required_skills_map.values())
-        req_total = len(self.required_skills)
-        required_score = req_found / req_total if req_total > 0 else 1.0
-
-        opt_found = sum(optional_skills_map.values())
-        opt_total = len(self.optional_skills)
-        optional_score = opt_found / opt_total if opt_total > 0 else 1.0
-        
-        experience_score = 1.0
-        if candidate_exp < self.min_experience:
-            penalty = (self.min_experience - candidate_exp) / self.min_experience * 0.3
-            experience_score = 1.0 - penalty
-        elif self.max_experience and candidate_exp > self.max_experience:
-            penalty = (candidate_exp - self.max_experience) / self.max_experience * 0.1
-            experience_score = 1.0 - min(penalty, 0.1)
-
-        education_score = 1.0
-        if self.education_required and candidate_edu != self.education_required:
-            education_score = 0.0
+        features = self.extract_features(resumes)
+        candidate_exp = features["experience"]
+        required, optional = features["required"], features["optional"]
+
+        required_score = required.mean(axis=1) if required.shape[1] else np.ones(len(resumes))
+        optional_score = optional.mean(axis=1) if optional.shape[1] else np.ones(len(resumes))
+
+        experience_score = np.ones(len(resumes))
+        if self.min_experience:
+            lacking = candidate_exp < self.min_experience
+            experience_score[lacking] = 1.0 - (self.min_experience - candidate_exp[lacking]) / self.min_experience * 0.3
+        else:
+            lacking = np.zeros(len(resumes), dtype=bool)
+        if self.max_experience:
+            excess = ~lacking & (candidate_exp > self.max_experience)
+            penalty = (candidate_exp[excess] - self.max_experience) / self.max_experience * 0.1
+            experience_score[excess] = 1.0 - np.minimum(penalty, 0.1)
+
+        education_score = np.ones(len(resumes))
+        if self.education_required:
+            education_score = np.array([float(edu == self.education_required) for edu in features["education"]])
 
         final_score = (
             required_score * float(self.weights.get("required_skills", 0.5)) +
@@ -135,23 +268,60 @@ class FlexibleResumeMatcher:
             experience_score * float(self.weights.get("experience", 0.25)) +
             education_score * float(self.weights.get("education", 0.1))
         )
+        total = np.round(final_score * 100).astype(int)
+
+        results = []
+        for i, (hits, semantic) in enumerate(zip(features["hits"], features["semantic"])):
+            results.append({
+                "total_score_percent": int(total[i]),
+                "details": {
+                    "experience": {"required_years": f"{self.min_experience}-{self.max_experience}", "candidate_has_years": float(candidate_exp[i]), "score": round(float(experience_score[i])*100)},
+                    "education": {"required": self.education_required, "candidate_has": features["education"][i], "score": round(float(education_score[i])*100)},
+                    "required_skills": {"map": dict(zip(self.required_skills, required[i].tolist())), "score": round(float(required_score[i])*100), "hits": _skill_hits(self.required_skills, hits), "semantic": _semantic_only(self.required_skills, hits, semantic)},
+                    "optional_skills": {"map": dict(zip(self.optional_skills, optional[i].tolist())), "score": round(float(optional_score[i])*100), "hits": _skill_hits(self.optional_skills, hits), "semantic": _semantic_only(self.optional_skills, hits, semantic)},
+                }
+            })
+        return results
+
+    def _fallback_rule_based(self, resume_text: str) -> Dict[str, Any]:
+        """Резервная эвристическая оценка соответствия без использования LLM.
+
+        Args:
+            resume_text: Сырой текст резюме.
+
+        Returns:
+            Структура с итоговым баллом и деталями по критериям.
+        """
+        return self.score_rule_based([resume_text])[0]
+
+    def _llm_messages(self, resume_text: str) -> List[Any]:
+        """Сообщения запроса оценки к LLM."""
+        weights = self.weights
+        return [
+            SystemMessage(content=MATCH_SYSTEM_PROMPT),
+            HumanMessage(content=MATCH_USER_PROMPT.format(
+                required_skills=", ".join(self.required_skills),
+                optional_skills=", ".join(self.optional_skills),
+                min_experience=self.min_experience,
+                max_experience=self.max_experience,
+                education_required=self.education_required,
+                job_description=self.job_description,
+                weights_required=weights.get("required_skills", 0.5),
+                weights_optional=weights.get("optional_skills", 0.15),
+                weights_experience=weights.get("experience", 0.25),
+                weights_education=weights.get("education", 0.1),
+                resume=resume_text,
+            )),
+        ]
 
-        return {
-            "total_score_percent": round(final_score * 100),
-            "details": {
-                "experience": {"required_years": f"{self.min_experience}-{self.max_experience}", "candidate_has_years": candidate_exp, "score": round(experience_score*100)},
-                "education": {"required": self.education_required, "candidate_has": candidate_edu, "score": round(education_score*100)},
-                "required_skills": {"map": required_skills_map, "score": round(required_score*100)},
-                "optional_skills": {"map": optional_skills_map, "score": round(optional_score*100)},
-            }
-        }
-        
     def evaluate(self, resume_text: str) -> Dict[str, Any]:
         """Оценивает соответствие резюме требованиям вакансии.
 
         Если задан API-ключ, выполняет запрос к LLM (через OpenRouter) и ожидает
-        строгий JSON-ответ. При любом сбое или отсутствии ключа используется
-        резервная эвристическая оценка.
+        строгий JSON-ответ. При доступном семантическом сопоставлении навыков
+        LLM вызывается только для пограничных резюме (эвристическая оценка
+        внутри `AI_HR_MATCH_LLM_BAND`). При любом сбое или отсутствии ключа
+        используется резервная эвристическая оценка.
 
         Args:
             resume_text: Сырой текст резюме кандидата.
@@ -159,118 +329,102 @@ class FlexibleResumeMatcher:
         Returns:
             Словарь с ключами `total_score_percent` и `details`.
         """
-        api_key = os.getenv("OPENROUTER_API_KEY", "").strip()
-
-        if not api_key:
+        llm = get_match_llm()
+        if llm is None:
             return self._fallback_rule_based(resume_text)
-
+        if self.semantic_matcher is not None:
+            result = self._fallback_rule_based(resume_text)
+            low, high = MATCH_LLM_BAND
+            if not low <= result["total_score_percent"] <= high:
+                return result
         try:
-            client = OpenAI(api_key=api_key, base_url="https://openrouter.ai/api/v1")
-
-            system_prompt = (
-                """
-                Ты — строгий HR-ассессор. Оцени соответствие резюме требованиям вакансии СТРОГО по РУБРИКЕ и верни ТОЛЬКО валидный JSON.
-
-                ТРЕБОВАНИЯ К ВЫВОДУ:
-                - Верни исключительно JSON без текста вне JSON, без код-блоков и комментариев.
-                - Все числовые оценки — целые проценты 0..100 (НЕ доли).
-                - Структура и ключи фиксированы: total_score_percent (int 0..100), details: experience, education, required_skills, optional_skills.
-                - Не добавляй новых полей и не меняй названия ключей. Без хвостовых запятых.
-
-                ПРАВИЛА ИЗВЛЕЧЕНИЯ:
-                - Извлеки стаж (в годах, допускается дробное), уровень образования (нормализуй), наличие каждого навыка из списков.
-                - Учитывай ТОЛЬКО явно указанные факты из резюме; если факт не указан прямо — считай отсутствующим (false/0).
-                - Не интерпретируй смежные формулировки как наличие конкретного обязательного навыка.
-                - Карты навыков ("map") должны содержать ВСЕ навыки из соответствующих списков вакансии; значения — строго true/false.
-
-                РУБРИКА (оценки в процентах 0..100):
-                - required_skills (вес weight_required): доля найденных обязательных навыков (округляй до целого).
-                • Если не найден НИ ОДИН обязательный — required_skills.score = 0 и итоговый total_score_percent ≤ 25.
-                • Если покрытие < 50% обязательных — итоговый total_score_percent ≤ 60.
-                • Если покрытие 50..75% — итоговый total_score_percent ≤ 70.
-                - optional_skills (вес weight_optional): доля найденных доп. навыков (округляй до целого). Если список пуст — score = 100, "map" = {}.
-                - experience (вес weight_experience):
-                • Если опыт не указан или равен 0 → score = 0.
-                • Если опыт < min: score ≈ 60 при недостаче ≤ 1 год, линейно снижается до 0 при большей недостаче.
-                • Если задан max и опыт > max: штраф до −10 п.п. (нижняя граница 90).
-                • Иначе score = 100.
-                - education (вес weight_education): 100 при точном соответствии требованию, иначе 0. Если требование не задано — 100.
-
-                ФИНАЛЬНЫЙ БАЛЛ:
-                - final = required_skills.score * weight_required + optional_skills.score * weight_optional + experience.score * weight_experience + education.score * weight_education.
-                - Верни total_score_percent = ceil(final), ограничив 0..100 и применив ограничения по покрытию обязательных навыков (см. выше).
-
-                ГРАНИЧНЫЕ СЛУЧАИ:
-                - Пустое или крайне короткое резюме → все секции 0, total_score_percent = 0.
-                """
-            )
-
-            vacancy_text_lines = (
-                """
-                <VACANCY>
-                <REQUIRED_SKILLS>{required_skills}</REQUIRED_SKILLS>
-                <OPTIONAL_SKILLS>{optional_skills}</OPTIONAL_SKILLS>
-                <MIN_EXPERIENCE>{min_experience}</MIN_EXPERIENCE>
-                <MAX_EXPERIENCE>{max_experience}</MAX_EXPERIENCE>
-                <EDUCATION_REQUIRED>{education_required}</EDUCATION_REQUIRED>
-                <JOB_DESCRIPTION>{job_description}</JOB_DESCRIPTION>
-                <WEIGHTS>required={weights_required};optional={weights_optional};experience={weights_experience};education={weights_education}</WEIGHTS>
-                </VACANCY>
-
-                <RESUME_RAW>
-                {resume}
-                </RESUME_RAW>
-
-                ФОРМАТ ВЫХОДА (ровно такой JSON, без комментариев и лишнего текста):
-                {
-                    "total_score_percent": 0,
-                    "details": {
-                        "experience": {"candidate_has_years": 0.0, "score": 0},
-                        "education": {"candidate_has": "", "score": 0},
-                        "required_skills": {"map": {}, "score": 0},
-                        "optional_skills": {"map": {}, "score": 0}
-                    }
-                }
-                """
-            )
-            user_prompt_text = "\n".join(vacancy_text_lines)
-
-            model_name = os.getenv("AI_HR_LLM_MODEL", "mistralai/mistral-7b-instruct")
-
-            response = client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt_text},
-                ],
-                temperature=0.1,
-            )
-
-            content = response.choices[0].message.content if response.choices else ""
-            if not content:
-                raise ValueError("Пустой ответ LLM")
-
-            content = content.strip()
-            if content.startswith("```"):
-                content = content.strip('`')
-                if content.lower().startswith("json\n"):
-                    content = content[5:]
-
-            parsed = json.loads(content)
-
-            total = int(parsed.get("total_score_percent", 0))
-            details = parsed.get("details", {})
-            details.setdefault("experience", {})
-            details.setdefault("education", {})
-            details.setdefault("required_skills", {})
-            details.setdefault("optional_skills", {})
-
-            total = max(0, min(100, total))
-
-            return {
-                "total_score_percent": total,
-                "details": details,
-            }
-
+            response = invoke_llm(llm, self._llm_messages(resume_text), agent="resume_match")
+            return _parse_match_response(response_text(response))
         except Exception as e:
+            logger.warning(f"LLM-оценка резюме не удалась, используется эвристика: {e}")
             return self._fallback_rule_based(resume_text)
+
+    async def arefine_borderline(
+        self,
+        resumes: Sequence[str],
+        rule_results: List[Dict[str, Any]],
+        llm_band: Optional[Tuple[float, float]] = MATCH_LLM_BAND,
+        concurrency: int = MATCH_LLM_CONCURRENCY,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Дооценивает LLM пограничных кандидатов пакета.
+
+        LLM получает только резюме, эвристическая оценка которых
+        (`score_rule_based`) попала в `llm_band`, — не более `concurrency`
+        запросов одновременно через общий пул соединений. При ошибке LLM
+        остаётся эвристическая оценка.
+
+        Args:
+            resumes: Тексты резюме.
+            rule_results: Результаты `score_rule_based` для `resumes`.
+            llm_band: Диапазон эвристической оценки (%) для дооценки LLM; None — без LLM.
+            concurrency: Максимум одновременных запросов к LLM.
+
+        Returns:
+            Кортеж (результаты в порядке `resumes` с полем `method`: rules или llm,
+            число вызовов LLM).
+        """
+        results = [dict(result, method="rules") for result in rule_results]
+        llm = get_match_llm() if llm_band else None
+        if llm is None:
+            return results, 0
+
+        low, high = llm_band
+        borderline = [i for i, result in enumerate(results) if low <= result["total_score_percent"] <= high]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(i: int) -> None:
+            async with semaphore:
+                try:
+                    response = await ainvoke_llm(llm, self._llm_messages(resumes[i]), agent="resume_match")
+                    results[i] = dict(_parse_match_response(response_text(response)), method="llm")
+                except Exception as e:
+                    logger.warning(f"LLM-оценка резюме #{i} не удалась, оставлена эвристика: {e}")
+
+        await asyncio.gather(*(run(i) for i in borderline))
+        return results, len(borderline)
+
+
+@lru_cache(maxsize=1)
+def _match_llm(api_key: str) -> Any:
+    return create_chat_llm(InterviewConfig(model=MATCH_LLM_MODEL, temperature=0.1), api_key)
+
+
+def get_match_llm() -> Optional[Any]:
+    """Общая модель оценки резюме (один клиент с пулом соединений); None без API-ключа."""
+    api_key = os.getenv("OPENROUTER_API_KEY", "").strip()
+    if not api_key and LLM_BACKEND == "fake":
+        api_key = "offline-fake-llm"
+    return _match_llm(api_key) if api_key else None
+
+
+def _parse_match_response(content: str) -> Dict[str, Any]:
+    """Разбирает JSON-ответ LLM с оценкой резюме."""
+    if not content:
+        raise ValueError("Пустой ответ LLM")
+
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip('`')
+        if content.lower().startswith("json\n"):
+            content = content[5:]
+
+    parsed = json.loads(content)
+
+    total = int(parsed.get("total_score_percent", 0))
+    details = parsed.get("details", {})
+    details.setdefault("experience", {})
+    details.setdefault("education", {})
+    details.setdefault("required_skills", {})
+    details.setdefault("optional_skills", {})
+
+    total = max(0, min(100, total))
+
+    return {
+        "total_score_percent": total,
+        "details": details,
+    }
@@ -0,0 +1,287 @@
+"""Векторный индекс полного перебора на NumPy для небольших баз вопросов."""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MASK_MAX_VALUES = 256
+
+
+class _IndexSnapshot:
+    """Неизменяемый снимок индекса: запросы читают его без блокировок."""
+
+    __slots__ = ("ids", "documents", "metadatas", "matrix", "positions", "columns", "masks")
+
+    def __init__(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        matrix: np.ndarray,
+    ) -> None:
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.matrix = matrix
+        self.positions = {doc_id: i for i, doc_id in enumerate(ids)}
+        self.columns: Dict[str, np.ndarray] = {}
+        self.masks: Dict[str, Dict[Any, np.ndarray]] = {}
+
+        keys = {key for metadata in metadatas for key in metadata}
+        for key in keys:
+            column = np.empty(len(ids), dtype=object)
+            column[:] = [metadata.get(key) for metadata in metadatas]
+            self.columns[key] = column
+            values = set(column.tolist())
+            if len(values) <= MASK_MAX_VALUES:
+                self.masks[key] = {value: column == value for value in values}
+
+
+class NumpyVectorStore:
+    """
+    Векторное хранилище с полным перебором по матрице эмбеддингов.
+
+    Повторяет интерфейс `ChromaDBVectorStore`. Нормированные эмбеддинги лежат
+    в непрерывной матрице float32 (или float16), фильтры по метаданным
+    применяются через заранее посчитанные булевы маски, top-k выбирается одним
+    матричным умножением и `argpartition`. Рассчитан на базы вопросов вакансий
+    (сотни — единицы тысяч документов), где HNSW избыточен.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "interview_knowledge",
+        embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        dtype: Any = np.float32,
+    ) -> None:
+        if embedding_function is None:
+            raise ValueError("NumpyVectorStore требует embedding_function")
+        self.collection_name = collection_name
+        self.embedding_function = embedding_function
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._snapshot = _IndexSnapshot([], [], [], np.zeros((0, 0), dtype=self.dtype))
+        logger.info(f"NumPy-индекс '{collection_name}' инициализирован ({self.dtype.name})")
+
+    def __len__(self) -> int:
+        return len(self._snapshot.ids)
+
+    def _normalize(self, vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+        """
+        Добавляет документы в индекс.
+
+        Args:
+            documents: Список текстов документов.
+            metadatas: Список словарей с метаданными для каждого документа.
+            ids: Список уникальных идентификаторов документов.
+        """
+        self.upsert_documents(documents, metadatas, ids)
+
+    def upsert_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+        """Добавляет или обновляет документы с указанными идентификаторами."""
+        if not ids:
+            return
+        vectors = self._normalize(self.embedding_function(list(documents))).astype(self.dtype)
+
+        with self._lock:
+            current = self._snapshot
+            new_ids = list(current.ids)
+            new_documents = list(current.documents)
+            new_metadatas = list(current.metadatas)
+            positions = dict(current.positions)
+            rows: List[np.ndarray] = [current.matrix] if current.ids else []
+            replaced: Dict[int, int] = {}
+            appended: List[int] = []
+
+            for i, doc_id in enumerate(ids):
+                position = positions.get(doc_id)
+                if position is None:
+                    positions[doc_id] = len(new_ids)
+                    new_ids.append(doc_id)
+                    new_documents.append(documents[i])
+                    new_metadatas.append(dict(metadatas[i] or {}))
+                    appended.append(i)
+                else:
+                    new_documents[position] = documents[i]
+                    new_metadatas[position] = dict(metadatas[i] or {})
+                    replaced[position] = i
+
+            if appended:
+                rows.append(vectors[appended])
+            matrix = np.ascontiguousarray(np.concatenate(rows, axis=0)) if rows else vectors[:0]
+            for position, i in replaced.items():
+                matrix[position] = vectors[i]
+
+            self._snapshot = _IndexSnapshot(new_ids, new_documents, new_metadatas, matrix)
+        logger.info(f"Обновлено {len(ids)} документов в NumPy-индексе '{self.collection_name}'")
+
+    def delete_documents(self, ids: List[str]) -> None:
+        """Удаляет документы по идентификаторам."""
+        if not ids:
+            return
+        with self._lock:
+            current = self._snapshot
+            drop = {current.positions[doc_id] for doc_id in ids if doc_id in current.positions}
+            if not drop:
+                return
+            keep = [i for i in range(len(current.ids)) if i not in drop]
+            self._snapshot = _IndexSnapshot(
+                [current.ids[i] for i in keep],
+                [current.documents[i] for i in keep],
+                [current.metadatas[i] for i in keep],
+                np.ascontiguousarray(current.matrix[keep]),
+            )
+        logger.info(f"Удалено {len(drop)} документов из NumPy-индекса '{self.collection_name}'")
+
+    def get_ids(self) -> List[str]:
+        """Возвращает идентификаторы всех документов индекса."""
+        return list(self._snapshot.ids)
+
+    def _where_mask(self, snapshot: _IndexSnapshot, where_filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Строит булеву маску строк по фильтру в синтаксисе where ChromaDB.
+
+        Поддерживаются `$and`, `$or` и условия `$eq`, `$ne`, `$in`, `$nin`
+        (а также сокращённая запись `{key: value}`).
+        """
+        if not where_filter:
+            return None
+
+        size = len(snapshot.ids)
+        mask = np.ones(size, dtype=bool)
+        for key, condition in where_filter.items():
+            if key == "$and":
+                for sub in condition:
+                    sub_mask = self._where_mask(snapshot, sub)
+                    if sub_mask is not None:
+                        mask &= sub_mask
+                continue
+            if key == "$or":
+                any_mask = np.zeros(size, dtype=bool)
+                for sub in condition:
+                    sub_mask = self._where_mask(snapshot, sub)
+                    any_mask |= np.ones(size, dtype=bool) if sub_mask is None else sub_mask
+                mask &= any_mask
+                continue
+
+            if isinstance(condition, dict):
+                operator, value = next(iter(condition.items()))
+            else:
+                operator, value = "$eq", condition
+
+            if operator in ("$eq", "$ne"):
+                matched = self._value_mask(snapshot, key, value)
+                mask &= matched if operator == "$eq" else ~matched
+            elif operator in ("$in", "$nin"):
+                matched = np.zeros(size, dtype=bool)
+                for item in value:
+                    matched |= self._value_mask(snapshot, key, item)
+                mask &= matched if operator == "$in" else ~matched
+            else:
+                raise ValueError(f"Оператор фильтра {operator} не поддерживается NumPy-индексом")
+        return mask
+
+    @staticmethod
+    def _value_mask(snapshot: _IndexSnapshot, key: str, value: Any) -> np.ndarray:
+        masks = snapshot.masks.get(key)
+        if masks is not None:
+            mask = masks.get(value)
+            return mask if mask is not None else np.zeros(len(snapshot.ids), dtype=bool)
+        column = snapshot.columns.get(key)
+        if column is None:
+            return np.zeros(len(snapshot.ids), dtype=bool)
+        return column == value
+
+    def query(self, query_text: str, n_results: int = 5, where_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Выполняет семантический поиск по индексу.
+
+        Args:
+            query_text: Текст запроса.
+            n_results: Количество результатов.
+            where_filter: Фильтр по метаданным (опционально).
+
+        Returns:
+            Словарь с полями `documents`, `metadatas`, `distances`.
+        """
+        try:
+            query_embeddings = self.embedding_function([query_text])
+        except Exception as e:
+            logger.exception(f"Ошибка при поиске: {e}")
+            return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
+        return self.query_batch(query_embeddings, n_results=n_results, where_filter=where_filter)
+
+    def query_batch(self, query_embeddings: List[List[float]], n_results: int = 5, where_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Выполняет семантический поиск сразу для нескольких запросов одним матричным умножением.
+
+        Args:
+            query_embeddings: Эмбеддинги запросов.
+            n_results: Количество результатов на запрос.
+            where_filter: Фильтр по метаданным (опционально, общий для всех запросов).
+
+        Returns:
+            Словарь с полями `ids`, `documents`, `metadatas`, `distances` (по списку на запрос);
+            distance — косинусное расстояние, как в ChromaDB.
+        """
+        if query_embeddings is None or len(query_embeddings) == 0:
+            return {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        snapshot = self._snapshot
+        count = len(query_embeddings)
+        empty = {
+            "ids": [[] for _ in range(count)],
+            "documents": [[] for _ in range(count)],
+            "metadatas": [[] for _ in range(count)],
+            "distances": [[] for _ in range(count)],
+        }
+        if not snapshot.ids or n_results <= 0:
+            return empty
+
+        try:
+            mask = self._where_mask(snapshot, where_filter)
+        except Exception as e:
+            logger.exception(f"Ошибка при пакетном поиске: {e}")
+            return empty
+
+        if mask is None:
+            candidates = None
+            matrix = snapshot.matrix
+        else:
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return empty
+            matrix = snapshot.matrix[candidates]
+
+        queries = self._normalize(query_embeddings)
+        scores = queries @ matrix.T.astype(np.float32, copy=False)
+
+        k = min(n_results, scores.shape[1])
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[1]), (count, scores.shape[1]))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        rows = top if candidates is None else candidates[top]
+
+        result: Dict[str, List[List[Any]]] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for row_positions, row_scores in zip(rows.tolist(), top_scores.tolist()):
+            result["ids"].append([snapshot.ids[i] for i in row_positions])
+            result["documents"].append([snapshot.documents[i] for i in row_positions])
+            result["metadatas"].append([snapshot.metadatas[i] for i in row_positions])
+            result["distances"].append([1.0 - score for score in row_scores])
+        return result
@@ -1,8 +1,16 @@
 from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import re
+import threading
+import os
 import chromadb
 from langchain_huggingface import HuggingFaceEmbeddings
 import logging
 
+from ml_system.embedding_cache import CachedEmbeddings, EmbeddingCache
+from ml_system.numpy_index import NumpyVectorStore
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -14,28 +22,142 @@ logging.getLogger("backoff").propagate = False
 logging.getLogger("backoff").handlers.clear()
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+VECTOR_BACKEND = os.getenv("AI_HR_VECTOR_BACKEND", "auto").lower()
+NUMPY_INDEX_MAX_DOCS = int(os.getenv("AI_HR_NUMPY_INDEX_MAX_DOCS", "10000"))
+NUMPY_INDEX_DTYPE = os.getenv("AI_HR_NUMPY_INDEX_DTYPE", "float32")
+
+_shared_lock = threading.Lock()
+_shared_embeddings: Dict[str, HuggingFaceEmbeddings] = {}
+_shared_cached_embeddings: Dict[str, CachedEmbeddings] = {}
+_shared_chroma_client: Optional[Any] = None
+
+
+def get_shared_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL) -> HuggingFaceEmbeddings:
+    """Возвращает процессный экземпляр модели эмбеддингов (загружается один раз на процесс).
+
+    Args:
+        model_name: Имя модели HuggingFace для генерации эмбеддингов.
+
+    Returns:
+        Общий для всех интервью экземпляр `HuggingFaceEmbeddings`.
+    """
+    with _shared_lock:
+        embeddings = _shared_embeddings.get(model_name)
+        if embeddings is None:
+            logger.info(f"Инициализация HuggingFace модели: {model_name}")
+            logger.info("Первый запуск может занять время для загрузки модели...")
+            embeddings = HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={
+                    'device': 'cpu',
+                    'model_kwargs': {
+                        'trust_remote_code': True
+                    }
+                },
+                encode_kwargs={
+                    'normalize_embeddings': True,
+                    'batch_size': 32
+                },
+                show_progress=True
+            )
+            _shared_embeddings[model_name] = embeddings
+        return embeddings
+
+
+def get_cached_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL) -> CachedEmbeddings:
+    """Возвращает процессную модель эмбеддингов с дисковым кэшем векторов.
+
+    Повторная загрузка неизменных вопросов не обращается к энкодеру: векторы
+    берутся из `EmbeddingCache` по хэшу текста.
+    """
+    embeddings = get_shared_embeddings(model_name)
+    with _shared_lock:
+        cached = _shared_cached_embeddings.get(model_name)
+        if cached is None:
+            cached = CachedEmbeddings(embeddings, EmbeddingCache(model_name))
+            _shared_cached_embeddings[model_name] = cached
+        return cached
+
+
+def get_embedding_cache_stats() -> List[Dict[str, Any]]:
+    """Возвращает счётчики попаданий/промахов всех кэшей эмбеддингов процесса."""
+    with _shared_lock:
+        return [cached.cache.stats() for cached in _shared_cached_embeddings.values()]
+
+
+def get_shared_chroma_client() -> Any:
+    """Возвращает общий для процесса in-memory клиент ChromaDB."""
+    global _shared_chroma_client
+    with _shared_lock:
+        if _shared_chroma_client is None:
+            os.environ['CHROMA_CLIENT_TIMEOUT'] = '300'
+            os.environ['HTTPX_TIMEOUT'] = '300'
+            _shared_chroma_client = chromadb.EphemeralClient()
+        return _shared_chroma_client
+
+
+class HFEmbeddingFunction:
+    """Адаптер модели эмбеддингов LangChain к интерфейсу embedding function ChromaDB."""
+
+    def __init__(self, embeddings: Any) -> None:
+        self.embeddings = embeddings
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(list(input))
+
+
+def knowledge_version(chunks: List[Dict[str, Any]]) -> str:
+    """Вычисляет версию набора знаний как хэш от пар (section, question).
+
+    Args:
+        chunks: Элементы базы знаний с ключами section и question.
+
+    Returns:
+        Шестнадцатеричный sha1-хэш содержимого.
+    """
+    payload = [
+        [str(chunk.get('section', '')).strip(), str(chunk.get('question', '')).strip()]
+        for chunk in chunks or []
+        if isinstance(chunk, dict)
+    ]
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def question_doc_id(section: str, question: str) -> str:
+    """Возвращает контентно-адресуемый id документа для пары (section, question)."""
+    digest = hashlib.sha1(f"{section}\n{question}".encode('utf-8')).hexdigest()
+    return f"q_{digest[:20]}"
+
 
 class ChromaDBVectorStore:
     """
     Обёртка над ChromaDB для векторного поиска вопросов.
 
-    Использует временный клиент (in-memory) и коллекцию с косинусной метрикой.
-    Предоставляет методы добавления документов и семантического поиска.
+    Использует общий для процесса in-memory клиент и коллекцию
+    с косинусной метрикой. Предоставляет методы добавления, инкрементального
+    обновления документов и семантического поиска.
     """
     
-    def __init__(self, persist_directory: str = "./chroma_db", collection_name: str = "interview_knowledge") -> None:
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        collection_name: str = "interview_knowledge",
+        embedding_function: Optional[Any] = None,
+    ) -> None:
         self.collection_name = collection_name
         
         logger.info("Инициализация ChromaDB...")
         try:
-            import os
-            os.environ['CHROMA_CLIENT_TIMEOUT'] = '300'
-            os.environ['HTTPX_TIMEOUT'] = '300'
-            
-            self.client = chromadb.EphemeralClient()
+            self.client = get_shared_chroma_client()
+            collection_kwargs: Dict[str, Any] = {}
+            if embedding_function is not None:
+                collection_kwargs["embedding_function"] = embedding_function
             self.collection = self.client.get_or_create_collection(
                 name=collection_name,
-                metadata={"hnsw:space": "cosine"}
+                metadata={"hnsw:space": "cosine"},
+                **collection_kwargs
             )
             logger.info("ChromaDB успешно инициализирован (временная БД в памяти)")
             
@@ -43,6 +165,10 @@ class ChromaDBVectorStore:
             logger.exception(f"Критическая ошибка ChromaDB: {e}")
             raise
     
+    def _max_batch_size(self) -> int:
+        """Максимальный размер пакета записи, допускаемый клиентом ChromaDB."""
+        return int(getattr(self.client, "max_batch_size", 0) or 5000)
+
     def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
         """
         Добавляет документы в коллекцию.
@@ -53,16 +179,50 @@ class ChromaDBVectorStore:
             ids: Список уникальных идентификаторов документов.
         """
         try:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
+            batch_size = self._max_batch_size()
+            for start in range(0, len(ids), batch_size):
+                self.collection.add(
+                    documents=documents[start:start + batch_size],
+                    metadatas=metadatas[start:start + batch_size],
+                    ids=ids[start:start + batch_size]
+                )
             logger.info(f"Добавлено {len(documents)} документов в коллекцию '{self.collection_name}'")
         except Exception as e:
             logger.exception(f"Ошибка при добавлении документов: {e}")
             raise
     
+    def upsert_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+        """Добавляет или обновляет документы с указанными идентификаторами."""
+        if not ids:
+            return
+        try:
+            batch_size = self._max_batch_size()
+            for start in range(0, len(ids), batch_size):
+                self.collection.upsert(
+                    documents=documents[start:start + batch_size],
+                    metadatas=metadatas[start:start + batch_size],
+                    ids=ids[start:start + batch_size]
+                )
+            logger.info(f"Обновлено {len(ids)} документов в коллекции '{self.collection_name}'")
+        except Exception as e:
+            logger.exception(f"Ошибка при обновлении документов: {e}")
+            raise
+
+    def delete_documents(self, ids: List[str]) -> None:
+        """Удаляет документы по идентификаторам."""
+        if not ids:
+            return
+        try:
+            self.collection.delete(ids=ids)
+            logger.info(f"Удалено {len(ids)} документов из коллекции '{self.collection_name}'")
+        except Exception as e:
+            logger.exception(f"Ошибка при удалении документов: {e}")
+            raise
+
+    def get_ids(self) -> List[str]:
+        """Возвращает идентификаторы всех документов коллекции (без векторов и текстов)."""
+        return list(self.collection.get(include=[]).get("ids", []))
+
     def query(self, query_text: str, n_results: int = 5, where_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Выполняет семантический поиск по коллекции.
@@ -86,6 +246,56 @@ class ChromaDBVectorStore:
             logger.exception(f"Ошибка при поиске: {e}")
             return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
 
+    def query_batch(self, query_embeddings: List[List[float]], n_results: int = 5, where_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Выполняет семантический поиск сразу для нескольких запросов одним вызовом.
+
+        Args:
+            query_embeddings: Эмбеддинги запросов.
+            n_results: Количество результатов на запрос.
+            where_filter: Фильтр по метаданным (опционально, общий для всех запросов).
+
+        Returns:
+            Словарь с полями `documents`, `metadatas`, `distances` (по списку на запрос).
+        """
+        if not query_embeddings:
+            return {"documents": [], "metadatas": [], "distances": []}
+        try:
+            return self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=where_filter
+            )
+        except Exception as e:
+            logger.exception(f"Ошибка при пакетном поиске: {e}")
+            empty = [[] for _ in query_embeddings]
+            return {"documents": empty, "metadatas": list(empty), "distances": list(empty)}
+
+
+def build_where_filter(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Приводит словарь фильтров по метаданным к синтаксису where ChromaDB.
+
+    Несколько условий объединяются через `$and`; пустые значения пропускаются.
+    """
+    conditions = [{key: value} for key, value in (filters or {}).items() if value]
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def select_vector_backend(document_count: int) -> str:
+    """Выбирает бэкенд векторного поиска по размеру коллекции.
+
+    Небольшие базы вопросов (до `AI_HR_NUMPY_INDEX_MAX_DOCS`) обслуживает
+    `NumpyVectorStore`, крупные — ChromaDB. `AI_HR_VECTOR_BACKEND` позволяет
+    зафиксировать бэкенд ("numpy" или "chroma").
+    """
+    if VECTOR_BACKEND in ("numpy", "chroma"):
+        return VECTOR_BACKEND
+    return "numpy" if document_count <= NUMPY_INDEX_MAX_DOCS else "chroma"
+
 
 class InterviewKnowledgeSystemHF:
     """
@@ -100,59 +310,56 @@ class InterviewKnowledgeSystemHF:
         persist_directory: str = "./interview_db",
         model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
         collection_name: str = "interview_questions_hf",
+        backend: str = "chroma",
     ) -> None:
         """Инициализирует подсистему знаний на базе HuggingFace и ChromaDB.
 
+        Модель эмбеддингов и клиент ChromaDB общие для процесса: экземпляр
+        владеет только своей коллекцией.
+
         Args:
             persist_directory: Путь к директории хранилища ChromaDB.
             model_name: Имя модели HuggingFace для генерации эмбеддингов.
             collection_name: Название коллекции ChromaDB.
+            backend: Бэкенд векторного поиска: "chroma" или "numpy" (полный перебор в памяти;
+                векторы при рестарте берутся из дискового кэша эмбеддингов).
         """
-        logger.info(f"Инициализация HuggingFace модели: {model_name}")
-        logger.info("Первый запуск может занять время для загрузки модели...")
-        
-        model_kwargs = {
-            'device': 'cpu',
-            'model_kwargs': {
-                'trust_remote_code': True
-            }
-        }
-        
-        encode_kwargs = {
-            'normalize_embeddings': True,
-            'batch_size': 32
-        }
-        
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=model_name,
-            model_kwargs=model_kwargs,
-            encode_kwargs=encode_kwargs,
-            show_progress=True
-        )
+        self.model_name = model_name
+        self.collection_name = collection_name
+        self.backend = backend
+        self.embeddings = get_cached_embeddings(model_name)
         
-        self.vector_store = ChromaDBVectorStore(
-            persist_directory=persist_directory,
-            collection_name=collection_name
-        )
+        if backend == "numpy":
+            self.vector_store = NumpyVectorStore(
+                collection_name=collection_name,
+                embedding_function=HFEmbeddingFunction(self.embeddings),
+                dtype=NUMPY_INDEX_DTYPE
+            )
+        else:
+            self.vector_store = ChromaDBVectorStore(
+                persist_directory=persist_directory,
+                collection_name=collection_name,
+                embedding_function=HFEmbeddingFunction(self.embeddings)
+            )
         
         logger.info("Система инициализирована успешно!")
 
-    def add_knowledge_to_rag(self, chunks: List[Dict[str, Any]]) -> None:
-        """Добавляет фрагменты знаний в векторное хранилище RAG.
-
-        Args:
-            chunks: Элементы с ожидаемыми ключами: section (раздел/тема), question (вопрос).
-        """
+    def _build_documents(self, chunks: List[Dict[str, Any]]) -> tuple:
+        """Готовит тексты, метаданные и контентно-адресуемые id документов (без дубликатов)."""
         documents = []
         metadatas = []
         ids = []
         
-        for i, chunk in enumerate(chunks):
+        for chunk in chunks:
             section = chunk.get('section', '').strip()
             question = chunk.get('question', '').strip()
             if not section or not question:
                 continue
 
+            doc_id = question_doc_id(section, question)
+            if doc_id in ids:
+                continue
+
             doc_text = f"Секция: {section}\nВопрос: {question}"
             
             documents.append(doc_text.strip())
@@ -160,9 +367,54 @@ class InterviewKnowledgeSystemHF:
                 "section": section,
                 "question": question
             })
-            ids.append(f"question_{i}_{section}")
+            ids.append(doc_id)
+
+        return documents, metadatas, ids
+
+    def add_knowledge_to_rag(self, chunks: List[Dict[str, Any]]) -> None:
+        """Добавляет фрагменты знаний в векторное хранилище RAG.
+
+        Args:
+            chunks: Элементы с ожидаемыми ключами: section (раздел/тема), question (вопрос).
+        """
+        documents, metadatas, ids = self._build_documents(chunks)
         
+        if not documents:
+            logger.warning(f"Нет документов для добавления в коллекцию '{self.collection_name}'")
+            return
+
         self.vector_store.add_documents(documents, metadatas, ids)
+        logger.info(f"Кэш эмбеддингов: {self.embeddings.cache.stats()}")
+
+    def sync_knowledge(self, chunks: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Инкрементально приводит коллекцию к заданному набору знаний.
+
+        Эмбеддятся только новые вопросы; удалённые из набора вопросы удаляются
+        из коллекции, неизменные не трогаются.
+
+        Args:
+            chunks: Элементы с ожидаемыми ключами: section (раздел/тема), question (вопрос).
+
+        Returns:
+            Словарь со счётчиками `documents`, `added`, `removed`.
+        """
+        documents, metadatas, ids = self._build_documents(chunks)
+        existing = set(self.vector_store.get_ids())
+        wanted = set(ids)
+
+        new_positions = [i for i, doc_id in enumerate(ids) if doc_id not in existing]
+        stale_ids = [doc_id for doc_id in existing if doc_id not in wanted]
+
+        self.vector_store.upsert_documents(
+            [documents[i] for i in new_positions],
+            [metadatas[i] for i in new_positions],
+            [ids[i] for i in new_positions],
+        )
+        self.vector_store.delete_documents(stale_ids)
+
+        stats = {"documents": len(ids), "added": len(new_positions), "removed": len(stale_ids)}
+        logger.info(f"Синхронизация коллекции '{self.collection_name}': {stats}")
+        return stats
 
     def search_questions(self, query: str, grade: Optional[str] = None, section: Optional[str] = None, k: int = 3) -> List[Dict[str, Any]]:
         """Выполняет семантический поиск релевантных вопросов.
@@ -176,43 +428,179 @@ class InterviewKnowledgeSystemHF:
         Returns:
             Список словарей с полями `content`, `metadata`, `distance`.
         """
-        where_filter: Dict[str, Any] = {}
-        if grade:
-            where_filter["grade"] = grade
-        if section:
-            where_filter["section"] = section
-        
         results = self.vector_store.query(
             query_text=query,
             n_results=k,
-            where_filter=where_filter if where_filter else None
+            where_filter=build_where_filter({"grade": grade, "section": section})
         )
         
         return self._format_search_results(results)
 
-    def _format_search_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def search_questions_batch(self, queries: List[str], k: int = 3, filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """Выполняет семантический поиск сразу по нескольким запросам.
+
+        Все запросы эмбеддятся одним батчем энкодера, поиск выполняется одним
+        векторизованным запросом к хранилищу.
+
+        Args:
+            queries: Тексты запросов (например, все темы плана интервью).
+            k: Количество результатов на каждый запрос.
+            filters: Фильтры по метаданным, например {"section": ..., "grade": ...}.
+
+        Returns:
+            Список результатов (в порядке запросов); элементы — словари с полями `content`, `metadata`, `distance`.
+        """
+        if not queries:
+            return []
+
+        query_embeddings = self.embeddings.embed_documents(list(queries))
+        results = self.vector_store.query_batch(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            where_filter=build_where_filter(filters)
+        )
+        return [self._format_search_results(results, index=i) for i in range(len(queries))]
+
+    def _format_search_results(self, results: Dict[str, Any], index: int = 0) -> List[Dict[str, Any]]:
         """Приводит ответ ChromaDB к унифицированному виду.
 
         Args:
             results: Сырые результаты запроса из ChromaDB.
+            index: Номер запроса в пакетном ответе.
 
         Returns:
             Список словарей с полями: content, metadata, distance.
         """
         formatted_results: List[Dict[str, Any]] = []
         
-        if results['documents'] and results['documents'][0]:
-            for i, doc in enumerate(results['documents'][0]):
+        documents = results.get('documents') or []
+        if len(documents) > index and documents[index]:
+            metadatas = (results.get('metadatas') or [])
+            distances = (results.get('distances') or [])
+            metadatas = metadatas[index] if len(metadatas) > index else None
+            distances = distances[index] if len(distances) > index else None
+            for i, doc in enumerate(documents[index]):
                 result = {
                     'content': doc,
-                    'metadata': results['metadatas'][0][i] if results['metadatas'][0] else {},
-                    'distance': results['distances'][0][i] if 'distances' in results and results['distances'][0] else None
+                    'metadata': metadatas[i] if metadatas else {},
+                    'distance': distances[i] if distances else None
                 }
                 formatted_results.append(result)
         
         return formatted_results
 
 
+class KnowledgeRegistry:
+    """
+    Процессный реестр баз знаний интервью.
+
+    Для каждого ключа (id вакансии или "default") хранит одну коллекцию и версию
+    её содержимого. Интервью получают готовый `InterviewKnowledgeSystemHF` и не
+    пересобирают индекс; при изменении набора вопросов коллекция обновляется
+    инкрементально. Бэкенд поиска выбирается по размеру набора
+    (`select_vector_backend`). Индексы живут только в памяти процесса: после
+    рестарта они пересобираются при первом обращении, а векторы вопросов берутся
+    из дискового кэша эмбеддингов без повторного вызова модели.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        collection_prefix: str = "kb",
+    ) -> None:
+        self.model_name = model_name
+        self.collection_prefix = collection_prefix
+        self._systems: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _collection_name(self, key: str) -> str:
+        safe_key = re.sub(r'[^a-zA-Z0-9_-]', '_', key)[:48] or "default"
+        return f"{self.collection_prefix}_{safe_key}"
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, chunks: List[Dict[str, Any]], key: Optional[str] = None) -> InterviewKnowledgeSystemHF:
+        """Возвращает готовую базу знаний для набора вопросов, создавая/обновляя её при необходимости.
+
+        Args:
+            chunks: Элементы базы знаний с ключами section и question.
+            key: Ключ набора (id вакансии или "default"); без ключа набор адресуется версией.
+
+        Returns:
+            Общий `InterviewKnowledgeSystemHF` для данного ключа и версии содержимого.
+        """
+        return self.sync(chunks, key=key)[0]
+
+    def cached(self, key: str, version: Optional[str] = None) -> Optional[InterviewKnowledgeSystemHF]:
+        """Возвращает уже загруженную базу знаний ключа.
+
+        Args:
+            key: Ключ набора.
+            version: Ожидаемая версия содержимого; при несовпадении возвращается None.
+                Без версии база возвращается без проверки.
+
+        Returns:
+            База знаний или None, если её нет в процессе или её версия устарела.
+        """
+        entry = self._systems.get(key)
+        if entry is None or (version is not None and entry[0] != version):
+            return None
+        return entry[1]
+
+    def sync(self, chunks: List[Dict[str, Any]], key: Optional[str] = None) -> tuple:
+        """Синхронизирует коллекцию ключа с набором вопросов.
+
+        Args:
+            chunks: Элементы базы знаний с ключами section и question.
+            key: Ключ набора (id вакансии или "default").
+
+        Returns:
+            Кортеж (база знаний, версия содержимого, счётчики синхронизации).
+        """
+        version = knowledge_version(chunks)
+        key = key or f"adhoc_{version[:16]}"
+
+        entry = self._systems.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1], version, {"documents": None, "added": 0, "removed": 0}
+
+        with self._key_lock(key):
+            entry = self._systems.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1], version, {"documents": None, "added": 0, "removed": 0}
+
+            backend = select_vector_backend(len(chunks or []))
+            if entry is not None and entry[1].backend == backend:
+                system = entry[1]
+            else:
+                system = InterviewKnowledgeSystemHF(
+                    model_name=self.model_name,
+                    collection_name=self._collection_name(key),
+                    backend=backend,
+                )
+            logger.info(f"Синхронизация базы знаний '{key}' (версия {version[:12]}, бэкенд {backend})")
+            stats = system.sync_knowledge(chunks)
+
+            with self._lock:
+                self._systems[key] = (version, system)
+            return system, version, stats
+
+
+_knowledge_registry: Optional[KnowledgeRegistry] = None
+
+
+def get_knowledge_registry() -> KnowledgeRegistry:
+    """Возвращает процессный реестр баз знаний."""
+    global _knowledge_registry
+    with _shared_lock:
+        if _knowledge_registry is None:
+            _knowledge_registry = KnowledgeRegistry()
+        return _knowledge_registry
+
+
 class InterviewAssistantHF:
     """
     Помощник интервьюера, использующий `InterviewKnowledgeSystemHF` для поиска знаний.
@@ -237,7 +625,28 @@ class InterviewAssistantHF:
             Включаются только элементы, у которых присутствуют и `question`, и `section`.
         """
         raw_results: List[Dict[str, Any]] = self.knowledge_system.search_questions(topic, grade=None, k=max(count * 3, count))
+        return self._filter_question_results(raw_results, count)
+
+    def get_questions_for_topics(self, topics: List[str], count: int = 3) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Возвращает релевантные вопросы сразу для нескольких тем одним пакетным поиском.
+
+        Args:
+            topics: Темы (запросы) для поиска, например все темы плана интервью.
+            count: Максимальное число результатов на тему.
+
+        Returns:
+            Словарь {тема: список вопросов} в формате `get_questions_for_topic`.
+        """
+        unique_topics = list(dict.fromkeys(t for t in topics if t))
+        batch = self.knowledge_system.search_questions_batch(unique_topics, k=max(count * 3, count))
+        return {
+            topic: self._filter_question_results(raw_results, count)
+            for topic, raw_results in zip(unique_topics, batch)
+        }
 
+    def _filter_question_results(self, raw_results: List[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+        """Оставляет только элементы с `question` и `section`, не более `count`."""
         filtered: List[Dict[str, Any]] = []
         for item in raw_results or []:
             meta = item.get("metadata", {}) if isinstance(item, dict) else {}
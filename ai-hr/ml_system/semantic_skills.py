@@ -0,0 +1,196 @@
+"""Семантический поиск навыков вакансии в резюме по близости эмбеддингов."""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Выключено по умолчанию: порог нужно откалибровать под модель и язык резюме
+# (python -m benchmarks.semantic_skills_calibration)
+SEMANTIC_SKILLS_ENABLED = os.getenv("AI_HR_SEMANTIC_SKILLS", "0").lower() in ("1", "true", "yes")
+SEMANTIC_SKILL_MODEL = os.getenv("AI_HR_SEMANTIC_SKILL_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+SEMANTIC_SKILL_THRESHOLD = float(os.getenv("AI_HR_SEMANTIC_SKILL_THRESHOLD", "0.6"))
+RESUME_VECTORS_CACHE_SIZE = int(os.getenv("AI_HR_RESUME_VECTORS_CACHE_SIZE", "2000"))
+PHRASE_MAX_WORDS = 8
+
+_PHRASE_SPLIT = re.compile(r"[\n\r.;:•|/()\[\]]+|,\s|\s[-–—]\s")
+
+
+def resume_phrases(text: str, max_words: int = PHRASE_MAX_WORDS) -> List[str]:
+    """Короткие фразы резюме для сопоставления с навыками.
+
+    Текст режется по знакам препинания и маркерам списков; длинные фразы
+    разбиваются на окна по `max_words` слов с перекрытием в половину окна.
+    """
+    phrases: List[str] = []
+    step = max(1, max_words // 2)
+    for part in _PHRASE_SPLIT.split(text):
+        words = part.split()
+        if not words:
+            continue
+        if len(words) <= max_words:
+            phrases.append(" ".join(words))
+            continue
+        for start in range(0, len(words) - step, step):
+            phrases.append(" ".join(words[start:start + max_words]))
+    return list(dict.fromkeys(phrases))
+
+
+class _ResumeVectors:
+    """LRU-кэш векторов фраз резюме по sha256 текста резюме."""
+
+    def __init__(self, max_items: int) -> None:
+        self.max_items = max_items
+        self._items: "OrderedDict[str, Tuple[List[str], np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: str, item: Tuple[List[str], np.ndarray]) -> None:
+        with self._lock:
+            self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+_resume_vectors = _ResumeVectors(RESUME_VECTORS_CACHE_SIZE)
+
+
+def _normalized(vectors: Any) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2 or not matrix.size:
+        return matrix.reshape(len(matrix), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class SemanticSkillMatcher:
+    """
+    Находит навыки, упомянутые в резюме другими словами («torch» для PyTorch,
+    «машинное обучение» для ML).
+
+    Векторы навыков считаются один раз при создании (матчер кэшируется по набору
+    навыков, навыки — в дисковом кэше эмбеддингов), векторы фраз резюме — один раз
+    на текст резюме и живут только в памяти (LRU по sha256): персональные данные
+    не попадают на диск, а кэш не растёт без ограничений. Навык считается найденным,
+    если косинусная близость хотя бы одной фразы не ниже порога; для пакета
+    резюме сравнение — одно матричное умножение на резюме.
+
+    Attributes:
+        skills: Навыки в исходном написании.
+        threshold: Порог косинусной близости.
+        phrase_embeddings: Модель для фраз резюме (по умолчанию — та же, что для навыков).
+    """
+
+    def __init__(
+        self,
+        skills: Sequence[str],
+        embeddings: Any,
+        threshold: float = SEMANTIC_SKILL_THRESHOLD,
+        phrase_embeddings: Any = None,
+    ) -> None:
+        self.skills = list(skills)
+        self.threshold = threshold
+        self.phrase_embeddings = phrase_embeddings if phrase_embeddings is not None else embeddings
+        texts = [skill or " " for skill in self.skills]
+        self._skill_matrix = _normalized(embeddings.embed_documents(texts)) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    def _resume_vectors(self, resumes: Sequence[str]) -> List[Tuple[List[str], np.ndarray]]:
+        """Фразы и нормированные векторы фраз для каждого резюме; новые фразы кодируются одним батчем."""
+        items: List[Optional[Tuple[List[str], np.ndarray]]] = []
+        pending: Dict[str, List[str]] = {}
+        for text in resumes:
+            key = _resume_vectors.key(text)
+            item = _resume_vectors.get(key)
+            items.append(item)
+            if item is None and key not in pending:
+                pending[key] = resume_phrases(text)
+
+        if pending:
+            unique = list(dict.fromkeys(phrase for phrases in pending.values() for phrase in phrases))
+            vectors = _normalized(self.phrase_embeddings.embed_documents(unique)) if unique else None
+            rows = {phrase: i for i, phrase in enumerate(unique)}
+            computed = {}
+            for key, phrases in pending.items():
+                matrix = vectors[[rows[phrase] for phrase in phrases]] if phrases else np.zeros((0, 0), dtype=np.float32)
+                computed[key] = (phrases, matrix)
+                _resume_vectors.put(key, computed[key])
+            for i, text in enumerate(resumes):
+                if items[i] is None:
+                    items[i] = computed[_resume_vectors.key(text)]
+        return items
+
+    def match(self, resumes: Sequence[str]) -> Tuple[np.ndarray, List[Dict[str, Dict[str, Any]]]]:
+        """Семантические совпадения навыков для пакета резюме.
+
+        Args:
+            resumes: Тексты резюме.
+
+        Returns:
+            Кортеж (булева матрица «резюме × навык», для каждого резюме
+            {навык: {"phrase": фраза-обоснование, "similarity": близость}}
+            по найденным навыкам).
+        """
+        found = np.zeros((len(resumes), len(self.skills)), dtype=bool)
+        evidence: List[Dict[str, Dict[str, Any]]] = [{} for _ in resumes]
+        if not self.skills:
+            return found, evidence
+        for i, (phrases, matrix) in enumerate(self._resume_vectors(resumes)):
+            if not phrases:
+                continue
+            similarity = self._skill_matrix @ matrix.T
+            best = similarity.argmax(axis=1)
+            best_similarity = similarity[np.arange(len(self.skills)), best]
+            found[i] = best_similarity >= self.threshold
+            for j in np.flatnonzero(found[i]):
+                evidence[i][self.skills[j]] = {
+                    "phrase": phrases[best[j]],
+                    "similarity": round(float(best_similarity[j]), 3),
+                }
+        return found, evidence
+
+
+@lru_cache(maxsize=256)
+def _semantic_skill_matcher(skills: Tuple[str, ...]) -> SemanticSkillMatcher:
+    from ml_system.retrieva import get_cached_embeddings, get_shared_embeddings
+
+    return SemanticSkillMatcher(
+        skills,
+        get_cached_embeddings(SEMANTIC_SKILL_MODEL),
+        phrase_embeddings=get_shared_embeddings(SEMANTIC_SKILL_MODEL),
+    )
+
+
+def get_semantic_skill_matcher(skills: Tuple[str, ...]) -> Optional[SemanticSkillMatcher]:
+    """Семантический матчер для набора навыков (кэшируется по набору).
+
+    Возвращает None, если семантическое сопоставление выключено
+    (по умолчанию; включается `AI_HR_SEMANTIC_SKILLS=1`) или модель
+    эмбеддингов недоступна. Резюме в основном на русском, поэтому модель —
+    многоязычная (`AI_HR_SEMANTIC_SKILL_MODEL`), а не англоязычная модель базы вопросов.
+    """
+    if not SEMANTIC_SKILLS_ENABLED or not skills:
+        return None
+    try:
+        return _semantic_skill_matcher(skills)
+    except Exception as e:
+        logger.warning(f"Семантическое сопоставление навыков недоступно: {e}")
+        return None
@@ -0,0 +1,74 @@
+"""Скомпилированный поиск навыков вакансии в тексте резюме за один проход."""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+SKILL_MATCHER_CACHE_SIZE = 256
+
+_BOUNDARY = re.compile(r"\b")
+
+
+class SkillMatcher:
+    """
+    Ищет все навыки списка в тексте одним проходом регулярного выражения.
+
+    Навыки объединяются в одну альтернативу `(?=\\b(...)\\b)` (длинные первыми),
+    поэтому для каждой позиции текста находится самый длинный навык с границами
+    слова. Более короткие навыки, начинающиеся в той же позиции (например,
+    «sql» внутри «sql server»), — это префиксы найденного навыка: они
+    проверяются по заранее посчитанному списку префиксов. Результат совпадает
+    с отдельным `re.search(r'\\b<навык>\\b')` для каждого навыка.
+
+    Attributes:
+        skills: Навыки в нижнем регистре без дубликатов (пустые отброшены).
+    """
+
+    def __init__(self, skills: Sequence[str]) -> None:
+        self.skills: List[str] = list(dict.fromkeys(skill.lower() for skill in skills if skill))
+        ordered = sorted(self.skills, key=len, reverse=True)
+        self._pattern = (
+            re.compile(r"(?=\b(" + "|".join(re.escape(skill) for skill in ordered) + r")\b)")
+            if ordered else None
+        )
+        self._prefixes: Dict[str, List[str]] = {
+            skill: [other for other in self.skills if other != skill and skill.startswith(other)]
+            for skill in self.skills
+        }
+
+    def find(self, text: str, lowered: bool = False) -> Dict[str, List[Tuple[int, int]]]:
+        """Позиции навыков в тексте.
+
+        Args:
+            text: Текст резюме. Поиск регистронезависимый; позиции указаны
+                в `text.lower()`, что совпадает с исходным текстом, если
+                приведение к нижнему регистру не меняет его длину.
+            lowered: Текст уже приведён к нижнему регистру.
+
+        Returns:
+            Словарь {навык в нижнем регистре: список (начало, конец)} только
+            для найденных навыков.
+        """
+        hits: Dict[str, List[Tuple[int, int]]] = {}
+        if self._pattern is None:
+            return hits
+        text_lower = text if lowered else text.lower()
+        for match in self._pattern.finditer(text_lower):
+            start, skill = match.start(), match.group(1)
+            hits.setdefault(skill, []).append((start, start + len(skill)))
+            for prefix in self._prefixes[skill]:
+                end = start + len(prefix)
+                if _BOUNDARY.match(text_lower, end):
+                    hits.setdefault(prefix, []).append((start, end))
+        return hits
+
+    @staticmethod
+    def skills_map(skills: Sequence[str], hits: Dict[str, List[Tuple[int, int]]]) -> Dict[str, bool]:
+        """Словарь {навык: найден ли в тексте} в исходном написании навыков."""
+        return {skill: bool(skill) and skill.lower() in hits for skill in skills}
+
+
+@lru_cache(maxsize=SKILL_MATCHER_CACHE_SIZE)
+def get_skill_matcher(skills: Tuple[str, ...]) -> SkillMatcher:
+    """Матчер для набора навыков; строится один раз на набор (вакансию) и кэшируется."""
+    return SkillMatcher(skills)
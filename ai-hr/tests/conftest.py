@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модули сервиса импортируются так же, как при запуске api.py из каталога ai-hr
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
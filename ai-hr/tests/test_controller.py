@@ -0,0 +1,21 @@
+"""Снимок состояния для упреждающей генерации вопроса в конвейерном submit_answer."""
+
+from ml_system.interview.agents.controller import QUESTION_STATE_FIELDS, AdaptiveInterviewControllerAgent
+
+
+def test_question_state_snapshot_does_not_share_objects():
+    state = {
+        "current_topic": "SQL",
+        "current_question": {"id": "q1", "content": "Что такое индекс?"},
+        "last_candidate_answer": "ответ",
+        "questions_asked_count": 3,
+        "turn_log": [{"score": 5}],
+    }
+    snapshot = AdaptiveInterviewControllerAgent.question_state_snapshot(state)
+
+    state["current_question"]["content"] = "изменён оценщиком"
+    state["turn_log"].append({"score": 7})
+
+    assert set(snapshot) <= set(QUESTION_STATE_FIELDS)
+    assert snapshot["current_question"] == {"id": "q1", "content": "Что такое индекс?"}
+    assert "turn_log" not in snapshot
@@ -0,0 +1,16 @@
+"""Модули сервиса импортируются без циклов (как при старте `python api.py`)."""
+
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize("module", [
+    "ml_system.interview.src.streaming",
+    "ml_system.interview.src.llm",
+    "ml_system.interview.src.timing",
+    "ml_system.interview.interview_system",
+    "api",
+])
+def test_module_imports(module):
+    importlib.import_module(module)
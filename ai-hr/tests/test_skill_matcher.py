@@ -0,0 +1,67 @@
+"""Эквивалентность `SkillMatcher` поиску каждого навыка отдельным `re.search(r'\\b…\\b')`."""
+
+import random
+import re
+
+import pytest
+
+from ml_system.skill_matcher import SkillMatcher
+
+
+def reference_check_skills(text, skills):
+    """Прежний `FlexibleResumeMatcher._check_skills`: отдельный поиск по каждому навыку."""
+    text_lower = text.lower()
+    return {skill: bool(re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower)) for skill in skills}
+
+
+def compiled_check_skills(text, skills):
+    return SkillMatcher.skills_map(skills, SkillMatcher(skills).find(text))
+
+
+SKILLS = ["SQL", "SQL Server", "Java", "JavaScript", "C", "C++", "C#", "Python", "ML", "Machine Learning", "Node.js", "CI/CD"]
+
+
+@pytest.mark.parametrize("text", [
+    "Опыт: SQL Server 2019, JavaScript, Python.",
+    "sql, java и javascript",
+    "Писал на C++ и C# под .NET",
+    "Языки: C, C++",
+    "c++/c# разработка",
+    "MySQL и NoSQL, без sql",
+    "SQL Serverless функции",
+    "Java8, JavaScript-разработчик",
+    "Machine Learning и ML-ops",
+    "Node.js; CI/CD в GitLab",
+    "PYTHON3 и python",
+    "",
+])
+def test_matches_reference_on_prefix_and_overlap_cases(text):
+    assert compiled_check_skills(text, SKILLS) == reference_check_skills(text, SKILLS)
+
+
+def test_prefix_skill_found_inside_longer_skill():
+    result = compiled_check_skills("Администрирование SQL Server", ["SQL", "SQL Server"])
+    assert result == {"SQL": True, "SQL Server": True}
+
+
+def test_java_not_found_inside_javascript():
+    result = compiled_check_skills("Frontend на JavaScript", ["Java", "JavaScript"])
+    assert result == {"Java": False, "JavaScript": True}
+
+
+def test_positions_point_at_matches():
+    text = "sql server и sql"
+    hits = SkillMatcher(["sql", "sql server"]).find(text)
+    assert hits["sql server"] == [(0, 10)]
+    assert hits["sql"] == [(0, 3), (13, 16)]
+    for skill, spans in hits.items():
+        assert all(text[start:end] == skill for start, end in spans)
+
+
+def test_matches_reference_on_random_texts():
+    rng = random.Random(0)
+    vocabulary = SKILLS + ["Server", "script", "++", "#", ".", ",", "-", "/", " ", "и", "опыт", "sqlite", "javas"]
+    for _ in range(2000):
+        skills = rng.sample(SKILLS, rng.randint(1, len(SKILLS)))
+        text = "".join(rng.choice(vocabulary) + rng.choice(["", " ", ", ", "-"]) for _ in range(rng.randint(0, 12)))
+        assert compiled_check_skills(text, skills) == reference_check_skills(text, skills), (text, skills)
@@ -0,0 +1,173 @@
+"""Compare-and-swap и TTL хранилищ состояния интервью (память и SQLite)."""
+
+from datetime import datetime
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ml_system.interview import state_store
+from ml_system.interview.state_store import (
+    InMemoryStateStore,
+    SQLiteStateStore,
+    StateConflictError,
+    dumps_record,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(state_store, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    """Фабрика хранилищ; для SQLite каждый вызов — отдельное соединение с тем же файлом (как у разных воркеров)."""
+    path = str(tmp_path / "state.sqlite3")
+
+    def make(ttl_seconds=60):
+        if request.param == "memory":
+            if not hasattr(make, "store"):
+                make.store = InMemoryStateStore(ttl_seconds=ttl_seconds)
+            return make.store
+        return SQLiteStateStore(path=path, ttl_seconds=ttl_seconds)
+
+    return make
+
+
+def make_record(answer="ответ"):
+    return {
+        "state": {
+            "messages": [AIMessage(content="вопрос"), HumanMessage(content=answer)],
+            "asked_question_ids": {"q1", "q2"},
+            "completed_topics": set(),
+            "questions_asked_count": 1,
+        },
+        "status": "active",
+        "current_step": "evaluator",
+        "created_at": datetime(2024, 1, 1, 12, 0),
+        "vacancy_id": "v1",
+        "knowledge_version": "abc",
+        "external_id": None,
+        "report_status": None,
+    }
+
+
+def test_save_and_get_roundtrip(make_store, clock):
+    store = make_store()
+    record = make_record()
+    store.save("i1", record)
+    assert record["version"] == 1
+
+    loaded = store.get("i1")
+    assert loaded["version"] == 1
+    assert loaded["state"]["asked_question_ids"] == {"q1", "q2"}
+    assert [type(m) for m in loaded["state"]["messages"]] == [AIMessage, HumanMessage]
+    assert loaded["state"]["messages"][1].content == "ответ"
+    assert loaded["created_at"] == datetime(2024, 1, 1, 12, 0)
+    assert loaded["knowledge_version"] == "abc"
+
+
+def test_stale_version_conflicts(make_store, clock):
+    store_a, store_b = make_store(), make_store()
+    store_a.save("i1", make_record())
+
+    first, second = store_a.get("i1"), store_b.get("i1")
+    first["state"]["questions_asked_count"] = 2
+    store_a.save("i1", first)
+    assert first["version"] == 2
+
+    second["state"]["questions_asked_count"] = 99
+    with pytest.raises(StateConflictError):
+        store_b.save("i1", second)
+    assert second["version"] == 1
+    assert store_b.get("i1")["state"]["questions_asked_count"] == 2
+
+
+def test_concurrent_insert_conflicts(make_store, clock):
+    store_a, store_b = make_store(), make_store()
+    store_a.save("i1", make_record("первый"))
+    with pytest.raises(StateConflictError):
+        store_b.save("i1", make_record("второй"))
+    assert store_a.get("i1")["state"]["messages"][1].content == "первый"
+
+
+def test_expired_record_is_gone_and_can_be_reinserted(make_store, clock):
+    store = make_store(ttl_seconds=10)
+    store.save("i1", make_record("старый"))
+
+    clock.now += 11
+    assert store.get("i1") is None
+
+    store.save("i1", make_record("новый"))
+    loaded = store.get("i1")
+    assert loaded["version"] == 1
+    assert loaded["state"]["messages"][1].content == "новый"
+
+
+def test_reinsert_over_expired_record_without_reading_it(make_store, clock):
+    store = make_store(ttl_seconds=10)
+    store.save("i1", make_record("старый"))
+
+    clock.now += 11
+    store.save("i1", make_record("новый"))
+    assert store.get("i1")["state"]["messages"][1].content == "новый"
+
+
+def test_save_ttl_override(make_store, clock):
+    store = make_store(ttl_seconds=10)
+    record = make_record()
+    store.save("i1", record, ttl_seconds=100)
+
+    clock.now += 50
+    assert store.get("i1") is not None
+    clock.now += 51
+    assert store.get("i1") is None
+
+
+def test_save_extends_ttl(make_store, clock):
+    store = make_store(ttl_seconds=10)
+    record = make_record()
+    store.save("i1", record)
+
+    clock.now += 8
+    store.save("i1", record)
+    clock.now += 8
+    assert store.get("i1")["version"] == 2
+
+
+def test_delete(make_store, clock):
+    store = make_store()
+    store.save("i1", make_record())
+    store.delete("i1")
+    assert store.get("i1") is None
+    store.save("i1", make_record())
+    assert store.get("i1")["version"] == 1
+
+
+def test_memory_store_evicts_least_recently_used(clock):
+    store = InMemoryStateStore(max_size=2, ttl_seconds=60)
+    for interview_id in ("i1", "i2"):
+        store.save(interview_id, make_record())
+    store.get("i1")
+    store.save("i3", make_record())
+
+    assert len(store) == 2
+    assert store.get("i2") is None
+    assert store.get("i1") is not None
+
+
+def test_dumps_record_rejects_unserializable_values():
+    record = make_record()
+    record["state"]["unexpected"] = object()
+    with pytest.raises(TypeError):
+        dumps_record(record)
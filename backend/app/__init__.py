@@ -3,7 +3,7 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 
-def create_app(config_class=Config):
+def create_app(config_class=Config, start_workers=True):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
@@ -19,6 +19,7 @@ def create_app(config_class=Config):
     from .report.routes import reports_bp
     from .video.routes import video_bp
     from .hh_integration.routes import hh_bp
+    from .jobs.routes import jobs_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(users_bp)
@@ -29,5 +30,11 @@ def create_app(config_class=Config):
     app.register_blueprint(reports_bp)
     app.register_blueprint(video_bp,url_prefix = '/video')
     app.register_blueprint(hh_bp)
+    app.register_blueprint(jobs_bp)
+
+    # Воркеры очереди фоновых задач; при BACKEND_JOB_WORKERS=0 задачи выполняет отдельный worker.py
+    if start_workers and app.config['JOB_WORKERS'] > 0:
+        from .services.jobs import start_job_workers
+        start_job_workers(app, app.config['JOB_WORKERS'])
 
     return app
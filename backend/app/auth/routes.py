@@ -8,6 +8,7 @@ from ..core.utils import allowed_file, safe_filename
 from ..services.export_to_yandex_cloud import create_s3_session, upload_file_object_to_s3
 import os
 from ..services.extract_resumeHH import extract_resume_from_HH
+from ..services.resume_ingest import schedule_resume_ingestion
 import logging
 
 auth_bp = Blueprint('auth', __name__)
@@ -111,6 +112,8 @@ def register():
     })
 
     user_id = str(result.inserted_id)
+    if filepath:
+        schedule_resume_ingestion(user_id, filepath)
     token = jwt.encode({
         'account_id': user_id,
         'user': email,
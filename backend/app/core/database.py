@@ -12,3 +12,5 @@ interviews_collection = db.interviews
 interview_answers_collection = db.interview_answers
 status_history_collection = db.status_history
 hh_responses_collection = db.hh_responses
+jobs_collection = db.jobs
+resume_match_cache_collection = db.resume_match_cache
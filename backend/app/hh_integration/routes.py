@@ -7,6 +7,7 @@ import re
 from datetime import datetime, timedelta
 from ..core.database import companies_collection, vacancies_collection, hh_responses_collection
 from ..core.decorators import token_required
+from ..services.hh_response_scoring import schedule_hh_response_scoring
 import logging
 import dotenv
 import bcrypt
@@ -132,7 +133,7 @@ def exchange_code():
 @hh_bp.route('/hh/responses', methods=['GET'])
 @token_required
 def get_hh_responses(caller_identity):
-    """Получение откликов HH.ru для компании с пагинацией"""
+    """Получение откликов HH.ru для компании с пагинацией (`?sort=score` — по оценке резюме)"""
     try:
         company_id = caller_identity['id']
         page = int(request.args.get('page', 1))
@@ -147,9 +148,13 @@ def get_hh_responses(caller_identity):
         })
         print(f"🔍 DEBUG: Найдено откликов в БД: {total_count}")
         
+        if request.args.get('sort') == 'score':
+            sort = [('match_score', -1), ('imported_at', 1)]
+        else:
+            sort = [('imported_at', -1)]
         responses = list(hh_responses_collection.find({
             'our_company_id': company_id
-        }).sort('imported_at', -1).skip(offset).limit(per_page))
+        }).sort(sort).skip(offset).limit(per_page))
 
         for response in responses:
             response['_id'] = str(response['_id'])
@@ -724,7 +729,10 @@ def get_resume_details(access_token, resume_id):
 
 
 def save_hh_responses_to_db(access_token, company_id, our_company_id, our_vacancies):
-    """Сохранение откликов HH.ru в базу данных"""
+    """
+    Сохранение откликов HH.ru в базу данных. Для вакансий с новыми откликами
+    ставится фоновая оценка резюме (services/hh_response_scoring.py).
+    """
     try:
         logging.info(f"Сохранение откликов HH.ru для компании {company_id}")
 
@@ -734,6 +742,7 @@ def save_hh_responses_to_db(access_token, company_id, our_company_id, our_vacanc
             return 0
         
         saved_responses = 0
+        vacancies_to_score = set()
 
         for vacancy in vacancies_data['items']:
             hh_vacancy_id = vacancy['id']
@@ -785,11 +794,14 @@ def save_hh_responses_to_db(access_token, company_id, our_company_id, our_vacanc
                 if not existing:
                     hh_responses_collection.insert_one(response_doc)
                     saved_responses += 1
+                    vacancies_to_score.add(our_vacancy_id)
                     logging.info(f"Сохранен отклик {negotiation.get('id')} для вакансии {vacancy_name}")
                 else:
                     logging.info(f"Отклик {negotiation.get('id')} уже существует, пропускаем")
         
         logging.info(f"Сохранено новых откликов: {saved_responses}")
+        for our_vacancy_id in vacancies_to_score:
+            schedule_hh_response_scoring(our_vacancy_id, our_company_id)
         return saved_responses
         
     except Exception as e:
@@ -1,8 +1,8 @@
-from flask import Blueprint, request, jsonify,Response,current_app
+from flask import Blueprint, request, jsonify,Response,current_app,stream_with_context
+import json
 import requests
 from bson import ObjectId
 from flask_cors import cross_origin
-from ..parser.parser import DocumentParser
 import bcrypt
 import jwt
 from datetime import datetime, timezone, timedelta
@@ -12,7 +12,10 @@ from ..services.export_to_yandex_cloud import create_s3_session, upload_file_obj
 from ..services.delete_from_yandex_cloud import delete_file_from_s3
 import os
 from ..core.decorators import token_required, roles_required
-from ..services.ai_hr import match_resume,start_interview,submit_interview_answer
+from ..services.ai_hr import start_interview,submit_interview_answer,stream_start_interview,stream_interview_answer,AIHRServiceError
+from ..services.jobs import enqueue_job, job_handler
+from ..services.match_cache import match_resume_cached, vacancy_match_version
+from ..services.resume_ingest import resume_ingestion_stalled, schedule_resume_ingestion
 import logging
 
 interviews_bp = Blueprint('interviews', __name__)
@@ -24,6 +27,8 @@ def check_resume_score(caller_identity):
     """
     Проверяет резюме кандидата и возвращает оценку без создания интервью.
     Если оценка < 20%, создается запись с статусом 'rejected'.
+    Оценка выполняется в очереди задач: ответ 202 с `job_id`, результат — в
+    `GET /jobs/<id>`; `?sync=1` — дождаться результата в этом запросе.
     """
     if request.method == 'OPTIONS':
         return '', 200
@@ -64,59 +69,77 @@ def check_resume_score(caller_identity):
 
     parsed_resume_data = user.get('parsed_resume')
     if not parsed_resume_data:
+        # Текст резюме извлекается в фоне после загрузки (services/resume_ingest.py)
+        if user.get('resume_status') == 'failed':
+            return jsonify({'message': 'Не удалось обработать резюме, загрузите его заново', 'resume_status': 'failed'}), 422
+        if user.get('resume_status') != 'processing' or resume_ingestion_stalled(user):
+            schedule_resume_ingestion(user_id, resume_path)
+        return jsonify({'message': 'Резюме ещё обрабатывается, повторите проверку через несколько секунд', 'resume_status': 'processing'}), 409
+
+    payload = {
+        'user_id': user_id,
+        'vacancy_id': vacancy_id,
+        'job_description': vacancy.get('description', ''),
+        'vacancy_version': vacancy_match_version(vacancy),
+        'parsed_resume': parsed_resume_data,
+    }
+    if _sync_requested():
+        body, status_code = _score_resume(payload)
+        return jsonify(body), status_code
+    return _enqueue_response('resume_check', payload, user_id)
 
-        import sys
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'export_to_yandex'))
-        
-        s3_client = create_s3_session()
-        if not s3_client:
-            return jsonify({'message': 'Ошибка подключения к облачному хранилищу'}), 500
-        
-        if resume_path.startswith('https://storage.yandexcloud.net/'):
-            object_name = '/'.join(resume_path.split('/')[4:])
-        else:
-            object_name = f"resumes/{os.path.basename(resume_path)}"
-        
-        try:
-            s3_response = s3_client.get_object(Bucket=current_app.config['YC_STORAGE_BUCKET'], Key=object_name)
-            file_content = s3_response['Body'].read()
-            download_filename = os.path.basename(object_name)
 
-            parser = DocumentParser(source=download_filename)
-            parsed_text = parser.parse_content(file_content)
+def _sync_requested():
+    """
+    Клиент просит выполнить запрос синхронно в обработчике: `?sync=1` или
+    заголовок `Prefer: respond-sync`. По умолчанию долгие вызовы AI-сервиса
+    выполняются в очереди задач.
+    """
+    return request.args.get('sync') in ('1', 'true') or 'respond-sync' in request.headers.get('Prefer', '')
 
-            if not parsed_text:
-                return jsonify({'message': 'Не удалось извлечь текст из резюме'}), 400
-            users_collection.update_one(
-                {'_id': ObjectId(user_id)},
-                {'$set': {'parsed_resume': parsed_text}}
-            )
-            parsed_resume_data = parsed_text
 
-        except Exception as e:
-            return jsonify({'message': f'Ошибка при обработке резюме: {str(e)}'}), 500
+def _enqueue_response(job_type, payload, user_id):
+    """
+    Ставит задачу в очередь и отвечает 202 со ссылкой на статус задачи;
+    результат клиент получает опросом `GET /jobs/<id>`.
+    """
+    job_id = enqueue_job(job_type, payload, owner_id=user_id)
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/jobs/{job_id}',
+    }), 202
+
 
+@job_handler('resume_check')
+def _score_resume(payload):
+    """
+    Оценивает резюме через AI-сервис и создаёт запись интервью.
+    Возвращает (тело ответа, HTTP-код) — как /check-resume.
+    """
+    user_id = payload['user_id']
+    vacancy_id = payload['vacancy_id']
     existing_check = interviews_collection.find_one({
         'user_id': ObjectId(user_id),
         'vacancy_id': ObjectId(vacancy_id)
     })
     
     if existing_check:
-        return jsonify({
+        return {
             'success': True,
             'resume_score': existing_check.get('resume_score', 0),
             'can_proceed': existing_check.get('status') != 'rejected',
             'message': 'Резюме уже было проверено ранее',
             'interview_id': str(existing_check['_id']) if existing_check.get('status') == 'active' else None
-        }), 200
+        }, 200
     try:
         
-        match_result = match_resume(parsed_resume_data, vacancy.get('description', ''), vacancy_id)
+        match_result = match_resume_cached(payload['parsed_resume'], vacancy_id, payload['job_description'], payload.get('vacancy_version'))
         resume_score = match_result.get('total_score_percent', 0)
         
     except Exception as e:
         logging.error(f"Ошибка при обращении к AI-HR сервису: {e}")
-        return jsonify({'message': 'Ошибка оценки резюме'}), 500
+        return {'message': 'Ошибка оценки резюме'}, 500
     try:
         interview_record = {
             'user_id': ObjectId(user_id),
@@ -137,7 +160,7 @@ def check_resume_score(caller_identity):
         
     except Exception as e:
         logging.error(f"Ошибка при сохранении записи интервью: {e}")
-        return jsonify({'message': 'Ошибка при сохранении результатов'}), 500
+        return {'message': 'Ошибка при сохранении результатов'}, 500
 
     response_data = {
         'success': True,
@@ -149,7 +172,7 @@ def check_resume_score(caller_identity):
     if resume_score >= 20:
         response_data['interview_id'] = interview_id
     
-    return jsonify(response_data), 200
+    return response_data, 200
 
 
 @interviews_bp.route('/convert-resume', methods=['POST'])
@@ -202,6 +225,155 @@ def process_and_save_resume(caller_identity):
         logging.error(f"Ошибка в process_and_save_resume: {e}")
         return jsonify({'message': f'Внутренняя ошибка сервера: {str(e)}'}), 500
 
+DEFAULT_FIRST_QUESTION = 'Здравствуйте! Благодарим за интерес к нашей компании. Я — ваш AI-ассистент по подбору персонала. Сегодня мы проведем структурированное интервью, чтобы лучше понять ваш опыт, навыки и мотивацию.Пожалуйста, начните с краткого рассказа о себе. Желаю успешного собеседования!'
+
+
+def _resume_for_ai(user_id):
+    """Возвращает разобранное резюме пользователя (до 2000 символов) для AI-сервиса."""
+    user_document = users_collection.find_one(
+        {"_id": ObjectId(user_id)}, 
+        {"parsed_resume": 1, "_id": 0}  
+    )
+    parsed_resume_data = None  
+    
+    if user_document:
+        parsed_resume_data = user_document.get("parsed_resume")
+        
+        if parsed_resume_data:
+            logging.info("Найденный анализ резюме:")
+            logging.info(parsed_resume_data)
+        else:
+            logging.info("Пользователь найден, но поле 'parsed_resume' отсутствует или пустое.")
+            
+    else:
+        logging.info(f"Пользователь с ID {user_id} не найден.")
+    resume_for_ai = parsed_resume_data[:2000] if parsed_resume_data else "Резюме не найдено"
+    logging.info(f"Отправляем резюме длиной {len(resume_for_ai)} символов в AI-сервис")
+    return resume_for_ai
+
+
+def _vacancy_job_description(vacancy_id):
+    vacancy = vacancies_collection.find_one({'_id': ObjectId(vacancy_id)})
+    return vacancy.get('description', '') if vacancy else ''
+
+
+def _mock_start_response(interview_id):
+    return {
+        'interview_id': f"mock_{interview_id}",
+        'status': 'active',
+        'current_question': DEFAULT_FIRST_QUESTION,
+        'report': None,
+        'recommendation': None
+    }
+
+
+def _save_first_answer(interview_id, response_data, answer_text, analysis, video_id):
+    """Сохраняет первую запись собеседования с первым вопросом AI-сервиса."""
+    first_question = response_data.get('current_question', DEFAULT_FIRST_QUESTION)
+
+    logging.info(f"Сохраняем первый ответ. Статус: {response_data['status']}, Вопрос из AI: '{response_data.get('current_question')}', Итоговый вопрос: '{first_question}'")
+    answer_document = {
+        'interview_id': interview_id,
+        'mlinterview_id': response_data['interview_id'],
+        'question': first_question,
+        'status': response_data['status'],
+        'answer_text': answer_text,
+        'report': response_data.get('report'),
+        'recommendation': response_data.get('recommendation'),
+        'optimal_time': response_data.get('optimal_time', 90),
+        'voice_analysis': analysis,  
+        'created_at': datetime.utcnow(),
+        'video_id': video_id
+
+    }
+    interview_answers_collection.insert_one(answer_document)
+    return answer_document
+
+
+def _save_submitted_answer(interview_id, mlinterview_id, question, response_data, answer_text, analysis, video_id):
+    """Сохраняет ответ кандидата и, если собеседование завершено, его итоговый отчёт."""
+    logging.info(f"AI-HR ответ: {response_data}")
+    question_to_save = response_data.get('current_question') or question
+    logging.info(f"Сохраняем ответ. Статус: {response_data['status']}, Вопрос из AI: '{response_data.get('current_question')}', Переданный вопрос: '{question}', Итоговый вопрос: '{question_to_save}'")
+    optimal_time = response_data.get('optimal_time', 90)
+    if optimal_time is None:
+        optimal_time = 90
+
+    answer_document = {
+        'interview_id': interview_id,
+        'mlinterview_id': mlinterview_id,
+        'question': question_to_save,
+        'status': response_data['status'],
+        'answer_text': answer_text,
+        'recommendation': response_data['recommendation'],
+        'voice_analysis': analysis, 
+        'optimal_time': optimal_time,
+        'video_id': video_id
+    }
+    
+    answer = {
+        'interview_id': interview_id,
+        'mlinterview_id': mlinterview_id,
+        'question': question,
+        'status': response_data['status'],
+        'answer_text': answer_text,
+        'recommendation': response_data['recommendation'],
+        'voice_analysis': analysis, 
+        'created_at': datetime.utcnow(),
+        'video_id': video_id
+    }
+    if response_data['status']== 'completed':
+        answer_document['report'] = response_data['report']
+        answer_document['question'] = question_to_save 
+        if response_data.get('report_status') == 'pending':
+            # Отчёт генерируется AI-сервисом в фоне и записывается в interview_analysis позже
+            interviews_collection.update_one({'_id': ObjectId(interview_id)}, {'$set': {'status': 'completed'}})
+            interviews_collection.update_one({'_id': ObjectId(interview_id), 'report_status': {'$ne': 'ready'}}, {'$set': {'report_status': 'pending'}})
+        else:
+            interviews_collection.update_one({'_id': ObjectId(interview_id)}, {'$set': {'status': 'completed', 'interview_analysis': response_data['report'], 'recommendation': response_data['recommendation']}})
+    interview_answers_collection.insert_one(answer)
+    return answer_document
+
+
+def _answer_response(answer_document):
+    return {
+        'interview_id': answer_document.get('interview_id'),
+        'mlinterview_id': answer_document.get('mlinterview_id'),
+        'question': answer_document.get('question'),
+        'current_question': answer_document.get('question'),  
+        'status': answer_document.get('status'),
+        'answer_text': answer_document.get('answer_text'),
+        'voice_analysis': answer_document.get('voice_analysis'),
+        'optimal_time': answer_document.get('optimal_time'),
+        'message': 'Ответ успешно сохранен'
+    }
+
+
+def _parse_answer_request(data):
+    """Проверяет тело запроса ответа. Возвращает (поля, None) или (None, (ответ, код))."""
+    if not data:
+        return None, (jsonify({'message': 'Нет данных в запросе'}), 400)
+    fields = {
+        'mlinterview_id': data.get('mlinterview_id'),
+        'interview_id': data.get('interview_id'),
+        'question': data.get('question'),
+        'answer_text': data.get('answer_text'),
+        'analysis': data.get('analysis'),
+        'video_id': data.get('video_id'),
+    }
+    if not fields['interview_id']:
+        return None, (jsonify({'message': 'Поле interview_id обязательно'}), 400)
+    mlinterview_id = fields['mlinterview_id']
+    if mlinterview_id and mlinterview_id.strip():
+        if not fields['question'] or not fields['answer_text']:
+            return None, (jsonify({'message': 'Поля question и answer_text обязательны для ответа'}), 400)
+        
+        if not isinstance(fields['answer_text'], str) or not fields['answer_text'].strip():
+            return None, (jsonify({'message': 'Поле answer_text не может быть пустым'}), 400)
+    fields['vacancy_id'] = interviews_collection.find_one({'_id': ObjectId(fields['interview_id'])})['vacancy_id']
+    return fields, None
+
+
 @interviews_bp.route('/interviews/answer', methods=['POST', 'OPTIONS'])
 @cross_origin()
 @token_required
@@ -209,6 +381,8 @@ def process_and_save_resume(caller_identity):
 def save_interview_answer(caller_identity):
     """
     Принимает и сохраняет ответ пользователя на один вопрос собеседования.
+    Обработка выполняется в очереди задач (202 с `job_id`, результат — в
+    `GET /jobs/<id>`); `?sync=1` — дождаться результата в этом запросе.
     """
     logging.info(f"🔍 /interviews/answer вызван, метод: {request.method}")
     if request.method == 'OPTIONS':
@@ -216,154 +390,133 @@ def save_interview_answer(caller_identity):
     data = request.get_json()
     logging.info(f"Получены данные: {data}")
     logging.info(f"Caller identity: {caller_identity}")
-    if not data:
-        return jsonify({'message': 'Нет данных в запросе'}), 400
-    mlinterview_id = data.get('mlinterview_id')
-    interview_id = data.get('interview_id')
-    question = data.get('question') 
-    answer_text = data.get('answer_text')
-    analysis = data.get('analysis') 
-    vacancy_id = interviews_collection.find_one({'_id': ObjectId(interview_id)})['vacancy_id']
-    video_id = data.get('video_id')
-    if not interview_id:
-        return jsonify({'message': 'Поле interview_id обязательно'}), 400
-    if mlinterview_id and mlinterview_id.strip():
-        if not question or not answer_text:
-            return jsonify({'message': 'Поля question и answer_text обязательны для ответа'}), 400
-        
-        if not isinstance(answer_text, str) or not answer_text.strip():
-            return jsonify({'message': 'Поле answer_text не может быть пустым'}), 400
-
+    fields, error = _parse_answer_request(data)
+    if error:
+        return error
     user_id = caller_identity['id']
+    if _sync_requested():
+        body, status_code = _process_interview_answer(dict(fields, user_id=user_id))
+        return jsonify(body), status_code
+    payload = dict(fields, vacancy_id=str(fields['vacancy_id']), user_id=user_id)
+    return _enqueue_response('interview_answer', payload, user_id)
+
+
+@job_handler('interview_answer')
+def _process_interview_answer(fields):
+    """
+    Передаёт ответ AI-сервису и сохраняет его вместе со следующим вопросом.
+    Возвращает (тело ответа, HTTP-код) — как /interviews/answer.
+    """
+    interview_id = fields['interview_id']
+    mlinterview_id = fields['mlinterview_id']
+
+    user_id = fields['user_id']
 
     answer_document = None
 
     if mlinterview_id == '' or not mlinterview_id:
         try:
-            user_document = users_collection.find_one(
-                {"_id": ObjectId(user_id)}, 
-                {"parsed_resume": 1, "_id": 0}  
-            )
-            parsed_resume_data = None  
-            
-            if user_document:
-                parsed_resume_data = user_document.get("parsed_resume")
-                
-                if parsed_resume_data:
-                    logging.info("Найденный анализ резюме:")
-                    logging.info(parsed_resume_data)
-                else:
-                    logging.info("Пользователь найден, но поле 'parsed_resume' отсутствует или пустое.")
-                    
-            else:
-                logging.info(f"Пользователь с ID {user_id} не найден.")
-            resume_for_ai = parsed_resume_data[:2000] if parsed_resume_data else "Резюме не найдено"
-            logging.info(f"Отправляем резюме длиной {len(resume_for_ai)} символов в AI-сервис")
-            
-            
-            vacancy = vacancies_collection.find_one({'_id': ObjectId(vacancy_id)})
-            job_description = vacancy.get('description', '') if vacancy else ''
+            resume_for_ai = _resume_for_ai(user_id)
+            job_description = _vacancy_job_description(fields['vacancy_id'])
             
             try:
-                response_data = start_interview(resume_for_ai, str(vacancy_id), job_description)
+                response_data = start_interview(resume_for_ai, str(fields['vacancy_id']), job_description, interview_id)
             except Exception as e:
                 logging.error(f"Ошибка AI-сервиса: {e}")
-            
-                response_data = {
-                    'interview_id': f"mock_{interview_id}",
-                    'status': 'active',
-                    'current_question': 'Здравствуйте! Благодарим за интерес к нашей компании. Я — ваш AI-ассистент по подбору персонала. Сегодня мы проведем структурированное интервью, чтобы лучше понять ваш опыт, навыки и мотивацию.Пожалуйста, начните с краткого рассказа о себе. Желаю успешного собеседования!',
-                    'report': None,
-                    'recommendation': None
-                }
-            mlinterview_id = response_data['interview_id']
-            
-            first_question = response_data.get('current_question', 'Здравствуйте! Благодарим за интерес к нашей компании. Я — ваш AI-ассистент по подбору персонала. Сегодня мы проведем структурированное интервью, чтобы лучше понять ваш опыт, навыки и мотивацию.Пожалуйста, начните с краткого рассказа о себе. Желаю успешного собеседования!')
-
-            logging.info(f"Сохраняем первый ответ. Статус: {response_data['status']}, Вопрос из AI: '{response_data.get('current_question')}', Итоговый вопрос: '{first_question}'")
-            answer_document = {
-                'interview_id': interview_id,
-                'mlinterview_id': mlinterview_id,
-                'question': first_question,
-                'status': response_data['status'],
-                'answer_text': answer_text,
-                'report': response_data.get('report'),
-                'recommendation': response_data.get('recommendation'),
-                'optimal_time': response_data.get('optimal_time', 90),
-                'voice_analysis': analysis,  
-                'created_at': datetime.utcnow(),
-                'video_id': video_id
-
-            }
+                response_data = _mock_start_response(interview_id)
             try:
-                interview_answers_collection.insert_one(answer_document)
+                answer_document = _save_first_answer(interview_id, response_data, fields['answer_text'], fields['analysis'], fields['video_id'])
             except Exception as e:
-                return jsonify({'message': 'Ошибка при сохранении ответа', 'error': str(e)}), 500
+                return {'message': 'Ошибка при сохранении ответа', 'error': str(e)}, 500
         except requests.exceptions.RequestException as e:
-            return jsonify({'message': 'Ошибка при отправке запроса', 'error': str(e)}), 500
+            return {'message': 'Ошибка при отправке запроса', 'error': str(e)}, 500
     else:
         try:
-            
-
-            response_data = submit_interview_answer(mlinterview_id, answer_text)
-            logging.info(f"AI-HR ответ: {response_data}")
-            question_to_save = response_data.get('current_question') or question
-            logging.info(f"Сохраняем ответ. Статус: {response_data['status']}, Вопрос из AI: '{response_data.get('current_question')}', Переданный вопрос: '{question}', Итоговый вопрос: '{question_to_save}'")
-            optimal_time = response_data.get('optimal_time', 90)
-            if optimal_time is None:
-                optimal_time = 90
-
-            answer_document = {
-                'interview_id': interview_id,
-                'mlinterview_id': mlinterview_id,
-                'question': question_to_save,
-                'status': response_data['status'],
-                'answer_text': answer_text,
-                'recommendation': response_data['recommendation'],
-                'voice_analysis': analysis, 
-                'optimal_time': optimal_time,
-                'video_id': video_id
-            }
-            
-            answer = {
-                'interview_id': interview_id,
-                'mlinterview_id': mlinterview_id,
-                'question': question,
-                'status': response_data['status'],
-                'answer_text': answer_text,
-                'recommendation': response_data['recommendation'],
-                'voice_analysis': analysis, 
-                'created_at': datetime.utcnow(),
-                'video_id': video_id
-            }
-            if response_data['status']== 'completed':
-                answer_document['report'] = response_data['report']
-                answer_document['question'] = question_to_save 
-                interviews_collection.update_one({'_id': ObjectId(interview_id)}, {'$set': {'status': 'completed', 'interview_analysis': response_data['report'], 'recommendation': response_data['recommendation']}})
+            response_data = submit_interview_answer(mlinterview_id, fields['answer_text'])
             try:
-                interview_answers_collection.insert_one(answer)
+                answer_document = _save_submitted_answer(
+                    interview_id, mlinterview_id, fields['question'], response_data,
+                    fields['answer_text'], fields['analysis'], fields['video_id']
+                )
             except Exception as e:
-                return jsonify({'message': 'Ошибка при сохранении ответа', 'error': str(e)}), 500
+                return {'message': 'Ошибка при сохранении ответа', 'error': str(e)}, 500
                 
         except requests.exceptions.RequestException as e:
-            return jsonify({'message': 'Ошибка при отправке запроса', 'error': str(e)}), 500
+            return {'message': 'Ошибка при отправке запроса', 'error': str(e)}, 500
         
     if answer_document:
-        response_data = {
-            'interview_id': answer_document.get('interview_id'),
-            'mlinterview_id': answer_document.get('mlinterview_id'),
-            'question': answer_document.get('question'),
-            'current_question': answer_document.get('question'),  
-            'status': answer_document.get('status'),
-            'answer_text': answer_document.get('answer_text'),
-            'voice_analysis': answer_document.get('voice_analysis'),
-            'optimal_time': answer_document.get('optimal_time'),
-            'message': 'Ответ успешно сохранен'
-        }
+        response_data = _answer_response(answer_document)
         logging.info(f"Отправляем ответ клиенту: {response_data}")
-        return jsonify(response_data), 201
+        return response_data, 201
     else:
-        return jsonify({'message': 'Ошибка при обработке запроса'}), 500
+        return {'message': 'Ошибка при обработке запроса'}, 500
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@interviews_bp.route('/interviews/answer/stream', methods=['POST', 'OPTIONS'])
+@cross_origin()
+@token_required
+@roles_required('user')
+def stream_interview_answer_route(caller_identity):
+    """
+    То же, что /interviews/answer, но следующий вопрос выдаётся потоком SSE.
+    События AI-сервиса (created, meta, token) пересылаются клиенту по мере генерации,
+    чтобы озвучка могла начаться до окончания генерации. Последнее событие `done`
+    содержит тот же ответ, что и /interviews/answer, либо приходит `error`.
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+    fields, error = _parse_answer_request(request.get_json())
+    if error:
+        return error
+    interview_id = fields['interview_id']
+    mlinterview_id = fields['mlinterview_id']
+    user_id = caller_identity['id']
+
+    def generate():
+        try:
+            if not mlinterview_id:
+                resume_for_ai = _resume_for_ai(user_id)
+                job_description = _vacancy_job_description(fields['vacancy_id'])
+                events = stream_start_interview(resume_for_ai, str(fields['vacancy_id']), job_description, interview_id)
+            else:
+                events = stream_interview_answer(mlinterview_id, fields['answer_text'])
+
+            response_data = None
+            for event, data in events:
+                if event == 'done':
+                    response_data = data
+                    break
+                if event == 'error':
+                    raise AIHRServiceError(data.get('detail', 'Ошибка AI-сервиса'), data.get('status_code', 500))
+                yield _sse(event, data)
+            if response_data is None:
+                raise AIHRServiceError("AI-сервис прервал поток до завершения хода")
+        except Exception as e:
+            logging.error(f"Ошибка потока AI-сервиса: {e}")
+            if mlinterview_id:
+                yield _sse('error', {'message': 'Ошибка при отправке запроса', 'error': str(e)})
+                return
+            response_data = _mock_start_response(interview_id)
+
+        try:
+            if not mlinterview_id:
+                answer_document = _save_first_answer(interview_id, response_data, fields['answer_text'], fields['analysis'], fields['video_id'])
+            else:
+                answer_document = _save_submitted_answer(
+                    interview_id, mlinterview_id, fields['question'], response_data,
+                    fields['answer_text'], fields['analysis'], fields['video_id']
+                )
+        except Exception as e:
+            yield _sse('error', {'message': 'Ошибка при сохранении ответа', 'error': str(e)})
+            return
+        yield _sse('done', _answer_response(answer_document))
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=headers)
 
 
 
@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify
+from ..core.decorators import token_required
+from ..services.jobs import get_job, job_view
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+def _own_job(caller_identity, job_id):
+    """Возвращает (задача, None) или (None, (ответ, код)), если задачи нет или она чужая."""
+    job = get_job(job_id)
+    if not job or job.get('owner_id') != caller_identity['id']:
+        return None, (jsonify({'message': 'Задача не найдена'}), 404)
+    return job, None
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_job_status(caller_identity, job_id):
+    """
+    Статус фоновой задачи. После завершения содержит `result` и `status_code` —
+    тело и код ответа, которые вернул бы синхронный endpoint.
+    """
+    job, error = _own_job(caller_identity, job_id)
+    if error:
+        return error
+    return jsonify(job_view(job)), 200
+
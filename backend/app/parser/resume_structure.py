@@ -0,0 +1,102 @@
+"""
+Структурное извлечение из текста резюме: разделы, стаж и навыки.
+
+Рассчитано на выгрузки hh.ru (PDF «Опыт работы — 5 лет 3 месяца», markdown
+из `extract_resume_from_HH` с заголовками `### ...`) и на обычные резюме
+с заголовками разделов на отдельной строке.
+"""
+import re
+from datetime import datetime
+
+SECTION_TITLES = {
+    'experience': ('опыт работы', 'опыт', 'experience', 'work experience'),
+    'education': ('образование', 'education', 'повышение квалификации, курсы', 'курсы'),
+    'skills': ('навыки', 'ключевые навыки', 'ключевые навыки и образование', 'skills', 'технологии', 'стек'),
+    'about': ('о себе', 'обо мне', 'дополнительная информация', 'about', 'summary'),
+    'languages': ('знание языков', 'языки', 'languages'),
+    'contacts': ('контакты', 'контактная информация', 'contacts'),
+    'summary': ('основная информация', 'желаемая должность и зарплата'),
+}
+_TITLE_TO_SECTION = {title: section for section, titles in SECTION_TITLES.items() for title in titles}
+_HEADING = re.compile(r'^\s*(?:#{1,6}\s*)?\**\s*([^\n*:#]{2,60}?)\s*\**\s*:?\s*$')
+
+_TOTAL_EXPERIENCE = re.compile(
+    r'опыт работы\s*[-—–:]*\s*(\d+)\s*(?:лет|год|года)(?:\s*(\d+)\s*мес)?'
+    r'|опыт работы\s*[-—–:]*\s*(\d+)\s*мес',
+    re.IGNORECASE,
+)
+_PERIOD = re.compile(
+    r'(\d{4})-(\d{2})(?:-\d{2})?\s*[-—–]\s*(?:(\d{4})-(\d{2})(?:-\d{2})?|по настоящее время|none|настоящее время)',
+    re.IGNORECASE,
+)
+_SKILLS_LINE = re.compile(r'(?:ключевые\s+)?навыки\**\s*:\**\s*(.+)', re.IGNORECASE)
+_SKILL_SPLIT = re.compile(r'[,;•\n|]+|\s{2,}')
+MAX_SKILL_LENGTH = 40
+
+
+def _section_of(line):
+    match = _HEADING.match(line)
+    if not match:
+        return None
+    return _TITLE_TO_SECTION.get(match.group(1).strip().lower())
+
+
+def split_sections(text):
+    """Текст по разделам: {раздел: текст}. Строки до первого заголовка попадают в `header`."""
+    sections = {}
+    current = 'header'
+    for line in text.splitlines():
+        section = _section_of(line)
+        if section:
+            current = section
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: '\n'.join(lines).strip() for name, lines in sections.items() if ''.join(lines).strip()}
+
+
+def experience_years(text, now=None):
+    """
+    Стаж в годах: итог «Опыт работы — N лет M месяцев», если он есть,
+    иначе сумма периодов работы вида `2019-03 - 2021-05` / `... - по настоящее время`.
+    """
+    match = _TOTAL_EXPERIENCE.search(text)
+    if match:
+        if match.group(3):
+            return round(int(match.group(3)) / 12, 1)
+        years, months = int(match.group(1)), int(match.group(2) or 0)
+        return round(years + months / 12, 1)
+
+    now = now or datetime.utcnow()
+    months = 0
+    for start_year, start_month, end_year, end_month in _PERIOD.findall(text):
+        end = (int(end_year), int(end_month)) if end_year else (now.year, now.month)
+        months += max(0, (end[0] - int(start_year)) * 12 + end[1] - int(start_month))
+    return round(months / 12, 1)
+
+
+def extract_skills(text, sections=None):
+    """
+    Навыки из строк «Навыки: ...», а если таких строк нет — из раздела навыков
+    (без дубликатов, в исходном порядке).
+    """
+    sections = sections if sections is not None else split_sections(text)
+    chunks = [match.group(1) for match in _SKILLS_LINE.finditer(text)]
+    if not chunks and sections.get('skills'):
+        chunks.append(sections['skills'])
+    skills = {}
+    for chunk in chunks:
+        for item in _SKILL_SPLIT.split(chunk):
+            item = item.strip(' *-–—\t.')
+            if item and len(item) <= MAX_SKILL_LENGTH and not _SKILLS_LINE.match(item):
+                skills.setdefault(item.lower(), item)
+    return list(skills.values())
+
+
+def extract_resume_structure(text):
+    """Структура резюме для сохранения рядом с текстом: разделы, стаж и навыки."""
+    sections = split_sections(text or '')
+    return {
+        'sections': sections,
+        'experience_years': experience_years(text or ''),
+        'skills': extract_skills(text or '', sections),
+    }
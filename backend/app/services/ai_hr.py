@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+import threading
 from flask import current_app
 
 class AIHRServiceError(Exception):
@@ -45,11 +46,25 @@ def match_resume(resume_data, job_description, vacancy_id):
     logging.info(f"Отправка запроса на /resume-match для вакансии {vacancy_id}")
     return _make_request('post', '/resume-match', json=payload)
 
-def start_interview(resume_data, vacancy_id, job_description=""):
+def match_resumes_batch(vacancy_id, resumes, use_llm=True):
+    """
+    Оценивает пакет резюме против вакансии. `resumes` — список {'id', 'resume'};
+    результаты приходят отсортированными по убыванию оценки.
+    """
+    payload = {
+        'vacancy_id': str(vacancy_id),
+        'resumes': [{'id': str(item.get('id')) if item.get('id') is not None else None, 'resume': item.get('resume') or ''} for item in resumes],
+        'use_llm': use_llm
+    }
+    logging.info(f"Отправка запроса на /resume-match/batch для вакансии {vacancy_id}: {len(resumes)} резюме")
+    return _make_request('post', '/resume-match/batch', json=payload, timeout=600)
+
+def start_interview(resume_data, vacancy_id, job_description="", interview_id=None):
     payload = {
         "resume": resume_data or "Резюме не найдено",
         "vacancy_id": str(vacancy_id),
-        "job_description": job_description
+        "job_description": job_description,
+        "external_id": str(interview_id) if interview_id else None
     }
     logging.info(f"Отправка запроса на /interviews для старта собеседования по вакансии {vacancy_id}")
     return _make_request('post', '/interviews', json=payload)
@@ -61,3 +76,90 @@ def submit_interview_answer(mlinterview_id, answer_text):
     endpoint = f"/interviews/{mlinterview_id}/answer"
     logging.info(f"Отправка ответа для AI-собеседования {mlinterview_id}")
     return _make_request('post', endpoint, json=payload, timeout=90)
+
+
+def _post_in_background(endpoint, description, timeout=120):
+    """Отправляет POST в AI-сервис в фоновом потоке; ошибки только логируются."""
+    base_url = current_app.config['AI_HR_SERVICE_URL']
+    url = f"{base_url}{endpoint}"
+
+    def _post():
+        try:
+            response = requests.post(url, timeout=timeout)
+            response.raise_for_status()
+            logging.info(f"{description}: {response.json()}")
+        except requests.exceptions.RequestException as e:
+            logging.error(f"{description} — ошибка: {e}")
+
+    threading.Thread(target=_post, daemon=True).start()
+
+
+def _stream_events(endpoint, payload, timeout=180):
+    """
+    Выполняет POST к SSE-endpoint AI-сервиса и отдаёт события по мере поступления.
+    Возвращает генератор пар (event, data).
+    """
+    base_url = current_app.config['AI_HR_SERVICE_URL']
+    url = f"{base_url}{endpoint}"
+    try:
+        response = requests.post(url, json=payload, stream=True, timeout=(10, timeout))
+        response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        logging.error(f"HTTP ошибка при запросе к AI-сервису ({url}): {e.response.status_code} {e.response.text}")
+        raise AIHRServiceError(f"Сервис AI-HR вернул ошибку: {e.response.status_code}", e.response.status_code)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Сетевая ошибка при запросе к AI-сервису ({url}): {e}")
+        raise AIHRServiceError("Не удалось связаться с AI-сервисом.")
+
+    def _events():
+        event, data_lines = "message", []
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                if line == "":
+                    if data_lines:
+                        yield event, json.loads("\n".join(data_lines))
+                    event, data_lines = "message", []
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[len("data:"):].strip())
+
+    return _events()
+
+
+def stream_start_interview(resume_data, vacancy_id, job_description="", interview_id=None):
+    """Старт собеседования с потоковой выдачей первого вопроса (SSE)."""
+    payload = {
+        "resume": resume_data or "Резюме не найдено",
+        "vacancy_id": str(vacancy_id),
+        "job_description": job_description,
+        "external_id": str(interview_id) if interview_id else None
+    }
+    logging.info(f"Отправка запроса на /interviews/stream для старта собеседования по вакансии {vacancy_id}")
+    return _stream_events('/interviews/stream', payload)
+
+
+def stream_interview_answer(mlinterview_id, answer_text):
+    """Отправка ответа с потоковой выдачей следующего вопроса (SSE)."""
+    logging.info(f"Отправка ответа для AI-собеседования {mlinterview_id} (поток)")
+    return _stream_events(f"/interviews/{mlinterview_id}/answer/stream", {"answer": answer_text}, timeout=90)
+
+
+def sync_vacancy_knowledge(vacancy_id):
+    """
+    Запускает в фоне инкрементальное обновление индекса вопросов вакансии в AI-сервисе.
+    Ошибки только логируются: при следующем собеседовании индекс будет обновлён лениво.
+    """
+    logging.info(f"Отправка запроса на обновление индекса вопросов вакансии {vacancy_id}")
+    _post_in_background(f"/vacancies/{vacancy_id}/knowledge", f"Обновление индекса вопросов вакансии {vacancy_id}")
+
+
+def refresh_vacancy_plan(vacancy_id):
+    """
+    Запускает в фоне сборку шаблона плана собеседования вакансии в AI-сервисе.
+    Если шаблон не успел обновиться, AI-сервис построит план для кандидата как раньше.
+    """
+    logging.info(f"Отправка запроса на сборку шаблона плана вакансии {vacancy_id}")
+    _post_in_background(f"/vacancies/{vacancy_id}/plan", f"Шаблон плана вакансии {vacancy_id}", timeout=180)
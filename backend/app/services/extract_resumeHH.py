@@ -78,6 +78,19 @@ def extract_resume_from_HH(resume_url_from_user):
         print("Не удалось получить данные резюме.")
         return None
 
+    byte_io = io.BytesIO(format_hh_resume(resume_data).encode('utf-8'))
+
+    setattr(byte_io, 'filename', f"resume_{resume_id}.txt")
+ 
+    
+    return byte_io
+
+
+def format_hh_resume(resume_data):
+    """
+    Текст резюме hh.ru (ответ API `resumes/{id}`) в markdown с разделами
+    «Основная информация», «Контакты», «Ключевые навыки и образование», «Опыт работы».
+    """
     string_io = io.StringIO()
 
     string_io.write("### Основная информация\n")
@@ -114,12 +127,5 @@ def extract_resume_from_HH(resume_url_from_user):
             string_io.write(f"  * **Должность:** {exp.get('position', 'Не указано')}\n")
             string_io.write(f"  * **Период:** {exp.get('start', '')} - {exp.get('end', 'по настоящее время')}\n")
             string_io.write(f"  * **Описание:** {exp.get('description', 'Нет описания')}\n\n")
-    string_io.seek(0)
-
-    byte_io = io.BytesIO(string_io.read().encode('utf-8'))
-
-    setattr(byte_io, 'filename', f"resume_{resume_id}.txt")
- 
-    
-    return byte_io
+    return string_io.getvalue()
 
@@ -0,0 +1,83 @@
+"""
+Фоновая оценка откликов hh.ru на вакансию.
+
+После импорта откликов (`save_hh_responses_to_db`) на каждую вакансию с новыми
+откликами ставится задача `hh_responses_score`: воркер очереди отправляет ещё не
+оценённые резюме пакетом в `/resume-match/batch` AI-сервиса и сохраняет в отклики
+оценку (`match_score`, `match_details`, `match_method`, `matched_at`), а затем
+пересчитывает место отклика среди всех откликов вакансии (`match_rank`).
+"""
+import logging
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from ..core.database import hh_responses_collection
+from .ai_hr import AIHRServiceError, match_resumes_batch
+from .extract_resumeHH import format_hh_resume
+from .jobs import enqueue_job, job_handler
+
+# Не больше лимита резюме в одном запросе к AI-сервису (AI_HR_MATCH_BATCH_MAX_RESUMES)
+SCORING_CHUNK_SIZE = 500
+
+
+def schedule_hh_response_scoring(vacancy_id, company_id):
+    """Ставит оценку откликов вакансии в очередь. Возвращает ID задачи или None."""
+    try:
+        return enqueue_job('hh_responses_score', {'vacancy_id': str(vacancy_id), 'company_id': str(company_id)}, owner_id=str(company_id))
+    except Exception as e:
+        logging.error(f"Не удалось поставить оценку откликов вакансии {vacancy_id} в очередь: {e}")
+        return None
+
+
+def _update_ranks(vacancy_id, company_id):
+    scored = hh_responses_collection.find(
+        {'our_vacancy_id': vacancy_id, 'our_company_id': company_id, 'match_score': {'$ne': None}},
+        {'_id': 1},
+    ).sort([('match_score', -1), ('imported_at', 1)])
+    operations = [UpdateOne({'_id': doc['_id']}, {'$set': {'match_rank': rank}}) for rank, doc in enumerate(scored, start=1)]
+    if operations:
+        hh_responses_collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+@job_handler('hh_responses_score')
+def score_hh_responses(payload):
+    """Оценивает неоценённые отклики вакансии одним или несколькими пакетами и обновляет их ранжирование."""
+    vacancy_id, company_id = payload['vacancy_id'], payload['company_id']
+    responses = list(hh_responses_collection.find(
+        {'our_vacancy_id': vacancy_id, 'our_company_id': company_id, 'match_score': None, 'resume_data': {'$ne': None}},
+        {'resume_data': 1},
+    ))
+
+    scored = 0
+    for start in range(0, len(responses), SCORING_CHUNK_SIZE):
+        chunk = responses[start:start + SCORING_CHUNK_SIZE]
+        try:
+            result = match_resumes_batch(
+                vacancy_id,
+                [{'id': str(doc['_id']), 'resume': format_hh_resume(doc['resume_data'])} for doc in chunk],
+            )
+        except AIHRServiceError as e:
+            logging.error(f"Ошибка оценки откликов вакансии {vacancy_id}: {e.message}")
+            return {'message': e.message, 'vacancy_id': vacancy_id, 'scored': scored}, 502
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'_id': doc['_id']},
+                {'$set': {
+                    'match_score': item['total_score_percent'],
+                    'match_details': item.get('details'),
+                    'match_method': item.get('method'),
+                    'matched_at': now,
+                }},
+            )
+            for item, doc in ((item, chunk[item['index']]) for item in result.get('results', []))
+        ]
+        if operations:
+            hh_responses_collection.bulk_write(operations, ordered=False)
+        scored += len(operations)
+
+    ranked = _update_ranks(vacancy_id, company_id)
+    logging.info(f"Оценено откликов вакансии {vacancy_id}: {scored}, в рейтинге {ranked}")
+    return {'vacancy_id': vacancy_id, 'scored': scored, 'ranked': ranked}, 200
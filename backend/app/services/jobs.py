@@ -0,0 +1,209 @@
+"""
+Очередь фоновых задач backend на MongoDB (коллекция `jobs`).
+
+HTTP-обработчик ставит задачу через `enqueue_job` и сразу возвращает её ID;
+воркеры (потоки этого процесса и/или отдельный `python worker.py`) атомарно
+забирают задачи через find_one_and_update и выполняют зарегистрированный
+обработчик в контексте приложения. Задача, воркер которой умер, снова
+становится доступной после истечения аренды (`lease_until`).
+Клиент узнаёт результат опросом `GET /jobs/<id>`: обработчик запроса не держит
+соединение до завершения задачи.
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import current_app
+from pymongo import ASCENDING, ReturnDocument
+
+from ..core.database import jobs_collection
+
+FINISHED_STATUSES = ('done', 'failed')
+
+_handlers = {}
+_indexes_ready = False
+
+
+def job_handler(job_type):
+    """
+    Регистрирует обработчик задачи. Обработчик получает payload и возвращает
+    пару (тело ответа, HTTP-код) — как синхронный вариант того же endpoint.
+    """
+    def decorator(func):
+        _handlers[job_type] = func
+        return func
+    return decorator
+
+
+def _ensure_indexes():
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    try:
+        jobs_collection.create_index([('status', ASCENDING), ('created_at', ASCENDING)])
+        jobs_collection.create_index('expires_at', expireAfterSeconds=0)
+        _indexes_ready = True
+    except Exception as e:
+        logging.warning(f"Не удалось создать индексы очереди задач: {e}")
+
+
+def enqueue_job(job_type, payload, owner_id=None):
+    """Ставит задачу в очередь и возвращает её ID."""
+    if job_type not in _handlers:
+        raise ValueError(f"Неизвестный тип задачи: {job_type}")
+    _ensure_indexes()
+    now = datetime.utcnow()
+    result = jobs_collection.insert_one({
+        'type': job_type,
+        'payload': payload,
+        'owner_id': owner_id,
+        'status': 'queued',
+        'attempts': 0,
+        'created_at': now,
+        'updated_at': now,
+    })
+    logging.info(f"Задача {job_type} поставлена в очередь: {result.inserted_id}")
+    return str(result.inserted_id)
+
+
+def get_job(job_id):
+    if not ObjectId.is_valid(job_id):
+        return None
+    return jobs_collection.find_one({'_id': ObjectId(job_id)})
+
+
+def job_view(job):
+    """Представление задачи для клиента."""
+    view = {
+        'job_id': str(job['_id']),
+        'type': job.get('type'),
+        'status': job.get('status'),
+        'created_at': job.get('created_at'),
+        'finished_at': job.get('finished_at'),
+    }
+    if job.get('status') in FINISHED_STATUSES:
+        view['status_code'] = job.get('status_code')
+        view['result'] = job.get('result')
+        if job.get('error'):
+            view['error'] = job['error']
+    return view
+
+
+def claim_job(worker_id, lease_seconds, max_attempts):
+    """
+    Атомарно забирает самую старую доступную задачу или задачу с истёкшей
+    арендой, у которой остались попытки. Задачи с истёкшей арендой без
+    оставшихся попыток помечаются как failed.
+    """
+    now = datetime.utcnow()
+    expired = {'status': 'running', 'lease_until': {'$lt': now}}
+    jobs_collection.update_many(
+        dict(expired, attempts={'$gte': max_attempts}),
+        {
+            '$set': {
+                'status': 'failed',
+                'status_code': 500,
+                'error': 'Воркер не завершил задачу',
+                'finished_at': now,
+                'updated_at': now,
+                'expires_at': now + timedelta(seconds=current_app.config['JOB_RESULT_TTL_SECONDS']),
+            },
+            '$unset': {'lease_until': ''},
+        },
+    )
+    return jobs_collection.find_one_and_update(
+        {
+            'type': {'$in': list(_handlers)},
+            '$or': [{'status': 'queued'}, dict(expired, attempts={'$lt': max_attempts})],
+        },
+        {
+            '$set': {
+                'status': 'running',
+                'worker_id': worker_id,
+                'started_at': now,
+                'updated_at': now,
+                'lease_until': now + timedelta(seconds=lease_seconds),
+            },
+            '$inc': {'attempts': 1},
+        },
+        sort=[('created_at', ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def _finish_job(job, status, result=None, status_code=None, error=None):
+    now = datetime.utcnow()
+    jobs_collection.update_one(
+        {'_id': job['_id'], 'worker_id': job.get('worker_id')},
+        {
+            '$set': {
+                'status': status,
+                'result': result,
+                'status_code': status_code,
+                'error': error,
+                'finished_at': now,
+                'updated_at': now,
+                'expires_at': now + timedelta(seconds=current_app.config['JOB_RESULT_TTL_SECONDS']),
+            },
+            '$unset': {'lease_until': ''},
+        },
+    )
+
+
+def run_job(job):
+    """Выполняет задачу в контексте приложения и сохраняет результат."""
+    handler = _handlers[job['type']]
+    try:
+        body, status_code = handler(job.get('payload') or {})
+    except Exception as e:
+        logging.exception(f"Задача {job['_id']} ({job['type']}) завершилась ошибкой: {e}")
+        if job.get('attempts', 1) < current_app.config['JOB_MAX_ATTEMPTS']:
+            jobs_collection.update_one(
+                {'_id': job['_id'], 'worker_id': job.get('worker_id')},
+                {'$set': {'status': 'queued', 'updated_at': datetime.utcnow(), 'error': str(e)}, '$unset': {'lease_until': ''}},
+            )
+        else:
+            _finish_job(job, 'failed', status_code=500, error=str(e))
+        return
+    _finish_job(job, 'done' if status_code < 500 else 'failed', result=body, status_code=status_code)
+
+
+class JobWorker(threading.Thread):
+    """Поток-воркер очереди задач."""
+
+    def __init__(self, app, index=0):
+        super().__init__(daemon=True, name=f"job-worker-{index}")
+        self.app = app
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}:{uuid.uuid4().hex[:6]}"
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        logging.info(f"Воркер очереди задач {self.worker_id} запущен")
+        while not self._stop_event.is_set():
+            with self.app.app_context():
+                try:
+                    job = claim_job(self.worker_id, self.app.config['JOB_LEASE_SECONDS'], self.app.config['JOB_MAX_ATTEMPTS'])
+                except Exception as e:
+                    logging.error(f"Воркер {self.worker_id}: ошибка чтения очереди: {e}")
+                    job = None
+                if job is not None:
+                    run_job(job)
+            if job is None:
+                self._stop_event.wait(self.app.config['JOB_POLL_INTERVAL'])
+
+
+def start_job_workers(app, count):
+    """Запускает `count` потоков-воркеров для приложения."""
+    _ensure_indexes()
+    workers = [JobWorker(app, i) for i in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
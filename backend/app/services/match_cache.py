@@ -0,0 +1,88 @@
+"""
+Кэш результатов оценки резюме (`/resume-match` AI-сервиса) в MongoDB.
+
+Ключ — хэш (ID вакансии, версия вакансии, хэш разобранного резюме). Версия
+вакансии — хэш полей, влияющих на оценку, поэтому любое их изменение (правка
+вакансии, импорт с HH) делает старые записи недостижимыми, а TTL-индекс
+по `expires_at` удаляет их из коллекции.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from ..core.database import resume_match_cache_collection
+from .ai_hr import match_resume
+
+# Поднимается при изменении методики оценки в AI-сервисе
+MATCH_CACHE_SCHEMA = 1
+VACANCY_MATCH_FIELDS = ('required_skills', 'optional_skills', 'min_experience', 'max_experience', 'education_required', 'description')
+
+_indexes_ready = False
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def vacancy_match_version(vacancy):
+    """Версия вакансии для кэша: хэш полей, от которых зависит оценка резюме."""
+    fields = {field: vacancy.get(field) for field in VACANCY_MATCH_FIELDS}
+    return _sha256(json.dumps([MATCH_CACHE_SCHEMA, fields], ensure_ascii=False, sort_keys=True, default=str))
+
+
+def _cache_key(vacancy_id, vacancy_version, parsed_resume):
+    return _sha256(f"{vacancy_id}:{vacancy_version}:{_sha256(parsed_resume or '')}")
+
+
+def _ensure_indexes():
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    try:
+        resume_match_cache_collection.create_index('expires_at', expireAfterSeconds=0)
+        _indexes_ready = True
+    except Exception as e:
+        logging.warning(f"Не удалось создать TTL-индекс кэша оценок резюме: {e}")
+
+
+def match_resume_cached(parsed_resume, vacancy_id, job_description, vacancy_version):
+    """
+    То же, что `match_resume`, но повторная оценка того же резюме по неизменной
+    вакансии берётся из кэша. Ошибки AI-сервиса не кэшируются; без версии
+    вакансии кэш не используется.
+    """
+    ttl = current_app.config['MATCH_CACHE_TTL_SECONDS']
+    if ttl <= 0 or not vacancy_version:
+        return match_resume(parsed_resume, job_description, vacancy_id)
+
+    key = _cache_key(vacancy_id, vacancy_version, parsed_resume)
+    try:
+        cached = resume_match_cache_collection.find_one({'_id': key}, {'result': 1})
+    except Exception as e:
+        logging.warning(f"Кэш оценок резюме недоступен: {e}")
+        cached = None
+    if cached:
+        logging.info(f"Оценка резюме для вакансии {vacancy_id} взята из кэша")
+        return cached['result']
+
+    result = match_resume(parsed_resume, job_description, vacancy_id)
+    _ensure_indexes()
+    now = datetime.utcnow()
+    try:
+        resume_match_cache_collection.replace_one(
+            {'_id': key},
+            {
+                'vacancy_id': str(vacancy_id),
+                'vacancy_version': vacancy_version,
+                'result': result,
+                'created_at': now,
+                'expires_at': now + timedelta(seconds=ttl),
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logging.warning(f"Не удалось сохранить оценку резюме в кэш: {e}")
+    return result
@@ -0,0 +1,135 @@
+"""
+Фоновая обработка резюме после загрузки.
+
+Загрузка (регистрация, /update-resume, /update-resume-from-hh) только сохраняет
+файл и ставит задачу `resume_ingest`; воркер очереди скачивает файл, извлекает
+текст, считает хэши и структуру (разделы, стаж, навыки) и сохраняет их
+в документ пользователя. Запросы читают уже готовый `parsed_resume` и не
+обращаются к S3 и парсеру документов.
+
+Поля пользователя: `parsed_resume`, `resume_status` (processing/ready/failed),
+`resume_content_hash` (sha256 файла), `resume_text_hash` (sha256 текста),
+`resume_structure`, `resume_version` (растёт при каждой обработке), `resume_parsed_at`,
+`resume_job_id` и `resume_status_at` (задача обработки и время постановки — по ним
+`resume_ingestion_stalled` находит обработку, которая уже не завершится).
+"""
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import current_app
+
+from ..core.database import users_collection
+from ..parser.parser import DocumentParser
+from ..parser.resume_structure import extract_resume_structure
+from .export_to_yandex_cloud import create_s3_session
+from .jobs import FINISHED_STATUSES, enqueue_job, get_job, job_handler
+
+
+def schedule_resume_ingestion(user_id, resume_path):
+    """Сбрасывает разобранное резюме пользователя и ставит задачу его обработки. Возвращает ID задачи."""
+    users_collection.update_one(
+        {'_id': ObjectId(user_id)},
+        {
+            '$set': {
+                'parsed_resume': None,
+                'resume_structure': None,
+                'resume_status': 'processing',
+                'resume_status_at': datetime.utcnow(),
+            },
+            '$unset': {'resume_job_id': ''},
+        }
+    )
+    try:
+        job_id = enqueue_job('resume_ingest', {'user_id': str(user_id), 'resume_path': resume_path}, owner_id=str(user_id))
+    except Exception as e:
+        logging.error(f"Не удалось поставить обработку резюме пользователя {user_id} в очередь: {e}")
+        users_collection.update_one({'_id': ObjectId(user_id)}, {'$set': {'resume_status': 'failed'}})
+        return None
+    users_collection.update_one(
+        {'_id': ObjectId(user_id), 'resume_path': resume_path, 'resume_status': 'processing'},
+        {'$set': {'resume_job_id': job_id}}
+    )
+    return job_id
+
+
+def resume_ingestion_stalled(user):
+    """
+    Обработка резюме в статусе processing уже не завершится: её задача
+    закончилась (воркер умер, истекла аренда, ошибка записи результата) или
+    удалена, либо ID задачи так и не был сохранён дольше срока аренды.
+    """
+    job_id = user.get('resume_job_id')
+    job = get_job(job_id) if job_id else None
+    if job is not None:
+        return job.get('status') in FINISHED_STATUSES
+    started_at = user.get('resume_status_at')
+    if job_id or not started_at:
+        return True
+    return datetime.utcnow() - started_at > timedelta(seconds=current_app.config['JOB_LEASE_SECONDS'])
+
+
+def _load_resume_file(resume_path):
+    """Содержимое файла резюме и его имя (из Yandex Object Storage или локального каталога загрузок)."""
+    if not resume_path.startswith('https://storage.yandexcloud.net/') and os.path.exists(resume_path):
+        with open(resume_path, 'rb') as f:
+            return f.read(), os.path.basename(resume_path)
+
+    if resume_path.startswith('https://storage.yandexcloud.net/'):
+        object_name = '/'.join(resume_path.split('/')[4:])
+    else:
+        object_name = f"resumes/{os.path.basename(resume_path)}"
+    s3_client = create_s3_session()
+    if not s3_client:
+        raise RuntimeError('Ошибка подключения к облачному хранилищу')
+    s3_response = s3_client.get_object(Bucket=current_app.config['YC_STORAGE_BUCKET'], Key=object_name)
+    return s3_response['Body'].read(), os.path.basename(object_name)
+
+
+def _mark_failed(user_id, resume_path, message):
+    users_collection.update_one(
+        {'_id': ObjectId(user_id), 'resume_path': resume_path},
+        {'$set': {'resume_status': 'failed', 'resume_error': message}}
+    )
+    return {'message': message, 'resume_status': 'failed'}
+
+
+@job_handler('resume_ingest')
+def ingest_resume(payload):
+    """
+    Извлекает текст и структуру резюме и сохраняет их пользователю.
+    Результат не записывается, если за время обработки пользователь загрузил другое резюме.
+    """
+    user_id, resume_path = payload['user_id'], payload['resume_path']
+    try:
+        content, filename = _load_resume_file(resume_path)
+        parsed_text = DocumentParser(source=filename).parse_content(content)
+    except Exception as e:
+        logging.error(f"Ошибка при обработке резюме пользователя {user_id}: {e}")
+        return _mark_failed(user_id, resume_path, f'Ошибка при обработке резюме: {str(e)}'), 500
+
+    if not parsed_text:
+        return _mark_failed(user_id, resume_path, 'Не удалось извлечь текст из резюме'), 422
+
+    result = users_collection.update_one(
+        {'_id': ObjectId(user_id), 'resume_path': resume_path},
+        {
+            '$set': {
+                'parsed_resume': parsed_text,
+                'resume_status': 'ready',
+                'resume_content_hash': hashlib.sha256(content).hexdigest(),
+                'resume_text_hash': hashlib.sha256(parsed_text.encode('utf-8')).hexdigest(),
+                'resume_structure': extract_resume_structure(parsed_text),
+                'resume_parsed_at': datetime.utcnow(),
+            },
+            '$unset': {'resume_error': ''},
+            '$inc': {'resume_version': 1},
+        }
+    )
+    if not result.matched_count:
+        logging.info(f"Резюме пользователя {user_id} заменено во время обработки, результат отброшен")
+        return {'message': 'Резюме было заменено во время обработки', 'resume_status': 'superseded'}, 409
+    logging.info(f"Резюме пользователя {user_id} обработано: {len(parsed_text)} символов")
+    return {'message': 'Резюме обработано', 'resume_status': 'ready'}, 200
@@ -11,6 +11,7 @@ import os
 from ..core.decorators import token_required, roles_required
 import logging
 from ..services.extract_resumeHH import extract_resume_from_HH
+from ..services.resume_ingest import schedule_resume_ingestion
 
 users_bp = Blueprint('users', __name__)
 
@@ -28,7 +29,8 @@ def get_profile(caller_identity):
         'name': user.get('name'),
         'surname': user.get('surname'),
         'role': user['role'],
-        'resume_path': user.get('resume_path')
+        'resume_path': user.get('resume_path'),
+        'resume_status': user.get('resume_status')
     })
 
 @users_bp.route('/user/updateprofile', methods=['PUT'])
@@ -186,10 +188,13 @@ def update_resume(caller_identity):
             {"_id": ObjectId(user_id)},
             {"$set": {"resume_path": file_url,'parsed_resume': None}}
         )
+        job_id = schedule_resume_ingestion(user_id, file_url)
 
         return jsonify({
             'message': 'Резюме успешно обновлено',
-            'resume_path': file_url
+            'resume_path': file_url,
+            'resume_status': 'processing',
+            'job_id': job_id
         }), 200
 
     except Exception as e:
@@ -242,10 +247,13 @@ def update_resume_from_hh(caller_identity):
             {"_id": ObjectId(user_id)},
             {"$set": {"resume_path": file_url,'parsed_resume': None}}
         )
+        job_id = schedule_resume_ingestion(user_id, file_url)
 
         return jsonify({
             'message': 'Резюме успешно обновлено',
-            'resume_path': file_url
+            'resume_path': file_url,
+            'resume_status': 'processing',
+            'job_id': job_id
         }), 200
 
     except Exception as e:
@@ -8,12 +8,19 @@ from ..core.utils import allowed_file, safe_filename
 from ..services.export_to_yandex_cloud import create_s3_session, upload_file_object_to_s3
 from ..services.delete_from_yandex_cloud import delete_file_from_s3
 from ..services.video_yc import delete_video_in_yc
+from ..services.ai_hr import sync_vacancy_knowledge, refresh_vacancy_plan
 import os
 from ..core.decorators import token_required, roles_required
 import logging
 
 vacancies_bp = Blueprint('vacancies', __name__)
 
+# Поля вакансии, от которых зависит шаблон плана собеседования в AI-сервисе
+PLAN_FIELDS = (
+    'title', 'grade', 'required_skills', 'min_experience', 'max_experience',
+    'work_field', 'optional_skills', 'questions', 'description'
+)
+
 @vacancies_bp.route('/vacancies/create', methods=['POST'])
 @token_required
 @roles_required('company')
@@ -55,6 +62,9 @@ def create_vacancy(caller_identity):
         inserted_id = result.inserted_id
     except Exception as e:
         return jsonify({'message': 'Ошибка при сохранении вакансии', 'error': str(e)}), 500
+    if new_vacancy.get('questions'):
+        sync_vacancy_knowledge(inserted_id)
+    refresh_vacancy_plan(inserted_id)
     return jsonify({'message': 'Вакансия успешно создана', 'vacancy_id': str(inserted_id)}), 201
 
 @vacancies_bp.route('/vacancies', methods=['GET'])
@@ -133,6 +143,10 @@ def upload_vacancy_questions(caller_identity, vacancy_id):
     except Exception as e:
         return jsonify({'message': 'Ошибка при обновлении вопросов', 'error': str(e)}), 500
 
+    if questions != vacancy.get('questions'):
+        sync_vacancy_knowledge(vacancy_id)
+        refresh_vacancy_plan(vacancy_id)
+
     return jsonify({'message': 'Вопросы для вакансии успешно обновлены'}), 200
 
 @vacancies_bp.route('/vacancies/<vacancy_id>/questions', methods=['GET'])
@@ -199,6 +213,11 @@ def update_vacancy(caller_identity, vacancy_id):
     except Exception as e:
         return jsonify({'message': 'Ошибка при обновлении вакансии', 'error': str(e)}), 500
 
+    if 'questions' in update_fields and update_fields['questions'] != vacancy.get('questions'):
+        sync_vacancy_knowledge(vacancy_id)
+    if any(field in update_fields and update_fields[field] != vacancy.get(field) for field in PLAN_FIELDS):
+        refresh_vacancy_plan(vacancy_id)
+
     return jsonify({'message': 'Вакансия успешно обновлена'}), 200
 
 @vacancies_bp.route('/vacancies/<vacancy_id>', methods=['DELETE'])
@@ -14,5 +14,13 @@ class Config:
     YC_IAM_TOKEN = os.getenv('YC_IAM_TOKEN') 
     YC_FOLDER_ID = os.getenv('YC_FOLDER_ID')
     CHANNEL_ID = os.getenv('CHANNEL_ID')
+    # Очередь фоновых задач (долгие вызовы AI-сервиса)
+    JOB_WORKERS = int(os.getenv('BACKEND_JOB_WORKERS', '4'))
+    JOB_LEASE_SECONDS = int(os.getenv('BACKEND_JOB_LEASE_SECONDS', '300'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('BACKEND_JOB_MAX_ATTEMPTS', '1'))
+    JOB_POLL_INTERVAL = float(os.getenv('BACKEND_JOB_POLL_INTERVAL', '0.5'))
+    JOB_RESULT_TTL_SECONDS = int(os.getenv('BACKEND_JOB_RESULT_TTL_SECONDS', '86400'))
+    # Кэш оценок резюме по (вакансия, версия вакансии, хэш резюме); 0 — без кэша
+    MATCH_CACHE_TTL_SECONDS = int(os.getenv('BACKEND_MATCH_CACHE_TTL_SECONDS', '604800'))
 
 
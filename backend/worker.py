@@ -0,0 +1,33 @@
+"""
+Отдельный процесс воркеров очереди фоновых задач.
+
+Используется, когда веб-процессы запущены с BACKEND_JOB_WORKERS=0:
+
+    python worker.py --workers 8
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from app import create_app
+from app.services.jobs import start_job_workers
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Воркеры очереди фоновых задач backend')
+    parser.add_argument('--workers', type=int, default=None, help='Число потоков (по умолчанию BACKEND_JOB_WORKERS)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(start_workers=False)
+    count = args.workers or app.config['JOB_WORKERS'] or 1
+    workers = start_job_workers(app, count)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    stop.wait()
+    for worker in workers:
+        worker.stop()
+    for worker in workers:
+        worker.join()
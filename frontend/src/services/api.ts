@@ -1174,6 +1174,35 @@ export interface ResumeCheckResult {
   message: string
 }
 
+// Долгие запросы backend выполняет в очереди задач: ответ 202 с job_id,
+// результат (тело и код синхронного ответа) опрашивается через GET /jobs/<id>
+const JOB_POLL_INTERVAL_MS = 1000
+const JOB_POLL_TIMEOUT_MS = 5 * 60 * 1000
+
+const resolveJobResponse = async (response: Response, token: string): Promise<{ ok: boolean; result: any }> => {
+  const result = await response.json()
+  if (response.status !== 202 || !result.job_id) {
+    return { ok: response.ok, result }
+  }
+
+  const deadline = Date.now() + JOB_POLL_TIMEOUT_MS
+  while (Date.now() < deadline) {
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+    const jobResponse = await fetch(`${API_BASE_URL}/jobs/${result.job_id}`, {
+      headers: { 'x-access-token': token },
+    })
+    const job = await jobResponse.json()
+    if (!jobResponse.ok) {
+      return { ok: false, result: job }
+    }
+    if (job.status === 'done' || job.status === 'failed') {
+      const statusCode = job.status_code ?? 500
+      return { ok: statusCode >= 200 && statusCode < 300, result: job.result ?? { message: job.error } }
+    }
+  }
+  return { ok: false, result: { message: 'Превышено время ожидания ответа сервера' } }
+}
+
 // Проверка резюме без создания интервью
 export const checkResume = async (vacancyId: string): Promise<ApiResponse<ResumeCheckResult>> => {
   try {
@@ -1194,9 +1223,9 @@ export const checkResume = async (vacancyId: string): Promise<ApiResponse<Resume
       body: JSON.stringify({ vacancy_id: vacancyId }),
     })
 
-    const result = await response.json()
+    const { ok, result } = await resolveJobResponse(response, token)
 
-    if (response.ok) {
+    if (ok) {
       return {
         success: true,
         data: result
@@ -1295,9 +1324,9 @@ export const saveInterviewAnswer = async (
       }),
     })
 
-    const result = await response.json()
+    const { ok, result } = await resolveJobResponse(response, token)
 
-    if (response.ok) {
+    if (ok) {
       return {
         success: true,
         data: result